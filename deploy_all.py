@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+DataWeb Rollout Orchestrator
+Creates or updates the frontend, backend and ML hub apps on Digital Ocean
+App Platform concurrently from one asyncio event loop, instead of running
+deploy_to_digitalocean.py, deploy_backend.py and deploy_digitalocean.py
+one after another. A component starts as soon as the components it
+depends on are live (the managed database before the backend), so a
+rollout takes about as long as its slowest chain. Progress from all
+components is streamed to one log.
+
+Apps are looked up by name: an existing app gets its spec updated, which
+starts a new deployment; a missing one is created. The apps build from
+GitHub, so push the code first.
+
+Usage: python deploy_all.py
+       python deploy_all.py --components backend ml-hub
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+from deploy_backend import DigitalOceanBackendDeployer, postgres_url
+from deploy_digitalocean import DigitalOceanDeployer
+from deploy_to_digitalocean import DataAfrikDeployer
+from do_client import ACTIVE_PHASES, DigitalOceanClient, poll_interval, wait_for_deployment
+
+# Managed PostgreSQL cluster the backend connects to
+DATABASE = {
+    "name": "dataweb-db",
+    "engine": "pg",
+    "version": "15",
+    "region": "nyc1",
+    "size": "db-s-1vcpu-1gb",
+    "num_nodes": 1,
+}
+
+# name: (components it waits for, timeout in seconds)
+COMPONENTS = {
+    "database": ((), 900),
+    "backend": (("database",), 600),
+    "frontend": ((), 600),
+    "ml-hub": ((), 300),
+}
+
+
+def with_dependencies(names):
+    """``names`` plus everything they depend on, in COMPONENTS order"""
+    needed = set()
+
+    def add(name):
+        if name not in needed:
+            needed.add(name)
+            for dependency in COMPONENTS[name][0]:
+                add(dependency)
+
+    for name in names:
+        add(name)
+    return [name for name in COMPONENTS if name in needed]
+
+
+def with_database(spec, url):
+    """Backend ``spec`` using the managed cluster at ``url`` instead of a dev database"""
+    spec.pop("databases", None)
+    for envs in [spec["envs"]] + [service["envs"] for service in spec["services"]]:
+        for env in envs:
+            if env["key"] == "DATABASE_URL":
+                env["value"] = url
+    return spec
+
+
+def with_service(existing, spec, name):
+    """``existing`` app spec with its ``name`` service taken from ``spec``
+
+    Other services and routes of a shared app stay as they are deployed.
+    """
+    service = next(service for service in spec["services"] if service["name"] == name)
+    services = [s for s in existing.get("services") or [] if s["name"] != name]
+    return {**existing, "services": services + [service]}
+
+
+class Rollout:
+    """One concurrent deployment of several components
+
+    The API client blocks, so its calls run in worker threads; they share
+    the client's connection pool. Progress lines are queued from those
+    threads and printed by a single task.
+    """
+
+    def __init__(self, client):
+        self.client = client
+        self.start = time.monotonic()
+        self.results = {}
+        self.outputs = {}
+        self._queue = None
+        self._loop = None
+
+    def progress(self, component, message):
+        """Queue a progress line; safe to call from worker threads"""
+        line = f"[{time.monotonic() - self.start:6.1f}s] {component:<9} {message}"
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, line)
+
+    async def _print_progress(self):
+        while True:
+            line = await self._queue.get()
+            if line is None:
+                return
+            print(line, flush=True)
+
+    def _check(self, response, expected, action):
+        if response.status_code not in expected:
+            raise RuntimeError(f"{action} failed with {response.status_code}: {response.text[:200]}")
+        return response.json()
+
+    def _database(self, timeout):
+        """Find or create the managed cluster and wait until it is online"""
+        response = self.client.get("/databases")
+        databases = self._check(response, {200}, "Listing databases").get("databases") or []
+        database = next((d for d in databases if d["name"] == DATABASE["name"]), None)
+        if database is None:
+            self.progress("database", f"creating {DATABASE['name']}")
+            database = self._check(self.client.post("/databases", json=DATABASE), {201},
+                                   "Creating the database")["database"]
+
+        deadline = time.monotonic() + timeout
+        status, unchanged = None, 0
+        while True:
+            if database["status"] != status:
+                status, unchanged = database["status"], 0
+                self.progress("database", status)
+            else:
+                unchanged += 1
+            if status == "online":
+                return postgres_url(database["connection"])
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"database still {status} after {timeout}s")
+            time.sleep(poll_interval(unchanged, self.client.rate_limit_remaining))
+            _, body = self.client.get_json(f"/databases/{database['id']}")
+            if body is not None:
+                database = body["database"]
+
+    def _app(self, component, spec, timeout, service=None):
+        """Create or update the app for ``spec`` and wait for its deployment
+
+        With ``service``, an existing app only has that service replaced.
+        """
+        response = self.client.get("/apps", params={"per_page": 200})
+        apps = self._check(response, {200}, "Listing apps").get("apps") or []
+        existing = next((app for app in apps if app["spec"]["name"] == spec["name"]), None)
+        if existing is None:
+            self.progress(component, f"creating app {spec['name']}")
+            app = self._check(self.client.post("/apps", json={"spec": spec}), {200, 201},
+                              "Creating the app")["app"]
+        else:
+            self.progress(component, f"updating app {spec['name']}")
+            if service is not None:
+                spec = with_service(existing["spec"], spec, service)
+            app = self._check(self.client.request("PUT", f"/apps/{existing['id']}", json={"spec": spec}),
+                              {200}, "Updating the app")["app"]
+
+        # Creating or updating an app starts a deployment; older API
+        # responses may not say which, so start one explicitly then
+        deployment_id = (app.get("pending_deployment") or {}).get("id")
+        if deployment_id is None:
+            deployment_id = self._check(self.client.post(f"/apps/{app['id']}/deployments"), {200, 201},
+                                        "Starting a deployment")["deployment"]["id"]
+
+        phase, timings = wait_for_deployment(
+            self.client, app["id"], deployment_id, timeout,
+            on_phase=lambda phase: self.progress(component, phase),
+            component=component,
+        )
+        if phase not in ACTIVE_PHASES:
+            raise RuntimeError(f"deployment ended {timings['result']}")
+        app = self._check(self.client.get(f"/apps/{app['id']}"), {200}, "Reading the app")["app"]
+        return app.get("live_url")
+
+    def _deploy(self, name):
+        timeout = COMPONENTS[name][1]
+        if name == "database":
+            return self._database(timeout)
+        if name == "backend":
+            spec = DigitalOceanBackendDeployer(None, self.client).backend_app_spec()
+            return self._app(name, with_database(spec, self.outputs["database"]), timeout)
+        if name == "frontend":
+            # The platform app also runs the backend service; only the frontend is replaced
+            return self._app(name, DataAfrikDeployer().frontend_app_spec(), timeout, service="frontend")
+        if name == "ml-hub":
+            return self._app(name, DigitalOceanDeployer(None, self.client).app_spec("dataweb-ml-hub"), timeout)
+        raise ValueError(f"Unknown component: {name}")
+
+    async def _component(self, name, tasks):
+        for dependency in COMPONENTS[name][0]:
+            if not await tasks[dependency]:
+                self.results[name] = {"status": "SKIPPED", "seconds": 0.0, "detail": f"{dependency} failed"}
+                self.progress(name, f"⏭️  skipped: {dependency} failed")
+                return False
+
+        start = time.monotonic()
+        self.progress(name, "started")
+        try:
+            output = await asyncio.to_thread(self._deploy, name)
+        except Exception as e:
+            self.results[name] = {"status": "FAILED", "seconds": time.monotonic() - start, "detail": str(e)}
+            self.progress(name, f"❌ {e}")
+            return False
+        self.outputs[name] = output
+        # Never print the database URL: it holds the password
+        detail = "online" if name == "database" else output or ""
+        self.results[name] = {"status": "OK", "seconds": time.monotonic() - start, "detail": detail}
+        self.progress(name, f"✅ done in {self.results[name]['seconds']:.0f}s {detail}")
+        return True
+
+    async def run(self, names):
+        """Deploy ``names`` (and their dependencies); True if all went live"""
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        printer = asyncio.create_task(self._print_progress())
+        tasks = {}
+        for name in with_dependencies(names):
+            tasks[name] = asyncio.create_task(self._component(name, tasks))
+        ok = all(await asyncio.gather(*tasks.values()))
+        self._queue.put_nowait(None)
+        await printer
+        return ok
+
+    def print_summary(self):
+        total = time.monotonic() - self.start
+        print("\n📋 Rollout summary")
+        for name in [name for name in COMPONENTS if name in self.results]:
+            result = self.results[name]
+            print(f"   {name:<9} {result['status']:<8} {result['seconds']:7.1f}s  {result['detail']}")
+        sequential = sum(result["seconds"] for result in self.results.values())
+        print(f"⏱️  Total {total:.1f}s, against {sequential:.1f}s deploying one after another")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Deploy the DataWeb apps to Digital Ocean concurrently")
+    parser.add_argument("--components", nargs="+", choices=list(COMPONENTS), default=list(COMPONENTS),
+                        help="Components to deploy; their dependencies are included")
+    args = parser.parse_args()
+
+    print("🚀 DataWeb - Digital Ocean Rollout")
+    print("=" * 50)
+
+    api_token = os.getenv("DIGITALOCEAN_API_TOKEN")
+    if not api_token:
+        print("❌ DIGITALOCEAN_API_TOKEN environment variable not set")
+        sys.exit(1)
+
+    client = DigitalOceanClient(api_token)
+    rollout = Rollout(client)
+    ok = asyncio.run(rollout.run(args.components))
+    rollout.print_summary()
+    client.print_stats()
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
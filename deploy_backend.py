@@ -6,83 +6,91 @@ Deploys the Node.js backend API to Digital Ocean App Platform
 
 import os
 import json
-import requests
-import time
 from pathlib import Path
-import zipfile
-import tempfile
+
+from do_client import ACTIVE_PHASES, FAILED_PHASES, DigitalOceanClient, wait_for_deployment
+
+PHASE_MESSAGES = {
+    "PENDING_BUILD": "⏳ Deployment is pending...",
+    "BUILDING": "🔨 Building backend application...",
+    "PENDING_DEPLOY": "⏳ Waiting to deploy...",
+    "DEPLOYING": "🚀 Deploying backend application...",
+}
+
+def postgres_url(connection):
+    """DATABASE_URL for a managed database's ``connection`` object"""
+    return (f"postgresql://{connection['user']}:{connection['password']}@{connection['host']}:"
+            f"{connection['port']}/{connection['database']}?sslmode=require")
 
 class DigitalOceanBackendDeployer:
-    def __init__(self, api_token):
+    def __init__(self, api_token, client=None):
         self.api_token = api_token
-        self.base_url = "https://api.digitalocean.com/v2"
-        self.headers = {
-            "Authorization": f"Bearer {api_token}",
-            "Content-Type": "application/json"
+        self.client = client or DigitalOceanClient(api_token)
+
+    def backend_app_spec(self, app_name="dataweb-backend"):
+        """App Platform spec for the backend API"""
+        return {
+            "name": app_name,
+            "services": [
+                {
+                    "name": "api",
+                    "source_dir": "/backend",
+                    "github": {
+                        "repo": "your-username/dataweb",
+                        "branch": "main"
+                    },
+                    "run_command": "npm start",
+                    "environment_slug": "node-js",
+                    "instance_count": 1,
+                    "instance_size_slug": "basic-xxs",
+                    "http_port": 3001,
+                    "envs": [
+                        {"key": "NODE_ENV", "value": "production"},
+                        {"key": "PORT", "value": "3001"},
+                        {"key": "DATABASE_URL", "value": "${DATABASE_URL}", "type": "SECRET"},
+                        {"key": "JWT_SECRET", "value": "${JWT_SECRET}", "type": "SECRET"},
+                        {"key": "SMTP_HOST", "value": "${SMTP_HOST}"},
+                        {"key": "SMTP_PORT", "value": "${SMTP_PORT}"},
+                        {"key": "SMTP_USER", "value": "${SMTP_USER}", "type": "SECRET"},
+                        {"key": "SMTP_PASS", "value": "${SMTP_PASS}", "type": "SECRET"},
+                        {"key": "FRONTEND_URL", "value": "${FRONTEND_URL}"},
+                        {"key": "ADMIN_EMAIL", "value": "${ADMIN_EMAIL}"}
+                    ],
+                    "health_check": {
+                        "http_path": "/health",
+                        "initial_delay_seconds": 10,
+                        "period_seconds": 10,
+                        "timeout_seconds": 5,
+                        "success_threshold": 1,
+                        "failure_threshold": 3
+                    }
+                }
+            ],
+            "databases": [
+                {
+                    "name": "dataweb-db",
+                    "engine": "PG",
+                    "version": "15",
+                    "production": False
+                }
+            ],
+            "envs": [
+                {"key": "DATABASE_URL", "value": "${DATABASE_URL}", "type": "SECRET"},
+                {"key": "JWT_SECRET", "value": "${JWT_SECRET}", "type": "SECRET"},
+                {"key": "SMTP_USER", "value": "${SMTP_USER}", "type": "SECRET"},
+                {"key": "SMTP_PASS", "value": "${SMTP_PASS}", "type": "SECRET"}
+            ],
+            "region": "nyc"
         }
 
     def create_backend_app(self, app_name="dataweb-backend"):
         """Create the backend app on Digital Ocean"""
         try:
-            # Create app spec for backend
-            app_spec = {
-                "name": app_name,
-                "services": [
-                    {
-                        "name": "api",
-                        "source_dir": "/backend",
-                        "github": {
-                            "repo": "your-username/dataweb",
-                            "branch": "main"
-                        },
-                        "run_command": "npm start",
-                        "environment_slug": "node-js",
-                        "instance_count": 1,
-                        "instance_size_slug": "basic-xxs",
-                        "http_port": 3001,
-                        "envs": [
-                            {"key": "NODE_ENV", "value": "production"},
-                            {"key": "PORT", "value": "3001"},
-                            {"key": "DATABASE_URL", "value": "${DATABASE_URL}", "type": "SECRET"},
-                            {"key": "JWT_SECRET", "value": "${JWT_SECRET}", "type": "SECRET"},
-                            {"key": "SMTP_HOST", "value": "${SMTP_HOST}"},
-                            {"key": "SMTP_PORT", "value": "${SMTP_PORT}"},
-                            {"key": "SMTP_USER", "value": "${SMTP_USER}", "type": "SECRET"},
-                            {"key": "SMTP_PASS", "value": "${SMTP_PASS}", "type": "SECRET"},
-                            {"key": "FRONTEND_URL", "value": "${FRONTEND_URL}"},
-                            {"key": "ADMIN_EMAIL", "value": "${ADMIN_EMAIL}"}
-                        ],
-                        "health_check": {
-                            "http_path": "/health",
-                            "initial_delay_seconds": 10,
-                            "period_seconds": 10,
-                            "timeout_seconds": 5,
-                            "success_threshold": 1,
-                            "failure_threshold": 3
-                        }
-                    }
-                ],
-                "databases": [
-                    {
-                        "name": "dataweb-db",
-                        "engine": "PG",
-                        "version": "15",
-                        "production": False
-                    }
-                ],
-                "envs": [
-                    {"key": "DATABASE_URL", "value": "${DATABASE_URL}", "type": "SECRET"},
-                    {"key": "JWT_SECRET", "value": "${JWT_SECRET}", "type": "SECRET"},
-                    {"key": "SMTP_USER", "value": "${SMTP_USER}", "type": "SECRET"},
-                    {"key": "SMTP_PASS", "value": "${SMTP_PASS}", "type": "SECRET"}
-                ],
-                "region": "nyc"
-            }
+            app_spec = self.backend_app_spec(app_name)
 
             print(f"🚀 Creating backend app: {app_name}")
-            response = requests.post(
-                f"{self.base_url}/apps",
-                headers=self.headers,
+            response = self.client.post(
+                "/apps",
                 json={"spec": app_spec}
             )
 
@@ -104,9 +112,8 @@ class DigitalOceanBackendDeployer:
         """Deploy the backend app"""
         try:
             print(f"🚀 Starting backend deployment for app ID: {app_id}")
-            response = requests.post(
-                f"{self.base_url}/apps/{app_id}/deployments",
-                headers=self.headers,
+            response = self.client.post(
+                f"/apps/{app_id}/deployments",
                 json={"force_build": True}
             )
 
@@ -127,10 +134,7 @@ class DigitalOceanBackendDeployer:
     def get_deployment_status(self, app_id, deployment_id):
         """Get deployment status"""
         try:
-            response = requests.get(
-                f"{self.base_url}/apps/{app_id}/deployments/{deployment_id}",
-                headers=self.headers
-            )
+            response = self.client.get(f"/apps/{app_id}/deployments/{deployment_id}")
 
             if response.status_code == 200:
                 deployment_data = response.json()
@@ -146,28 +150,21 @@ class DigitalOceanBackendDeployer:
     def wait_for_deployment(self, app_id, deployment_id, timeout=600):
         """Wait for deployment to complete"""
         print("⏳ Waiting for backend deployment to complete...")
-        start_time = time.time()
-
-        while time.time() - start_time < timeout:
-            status = self.get_deployment_status(app_id, deployment_id)
-            
-            if status == "SUPERSEDED":
-                print("⚠️  Deployment was superseded by a newer deployment")
-                return False
-            elif status == "ERROR":
-                print("❌ Deployment failed")
-                return False
-            elif status == "ACTIVE":
-                print("✅ Backend deployment completed successfully!")
-                return True
-            elif status == "PENDING":
-                print("⏳ Deployment is pending...")
-            elif status == "BUILDING":
-                print("🔨 Building backend application...")
-            elif status == "DEPLOYING":
-                print("🚀 Deploying backend application...")
-
-            time.sleep(10)
+        phase, timings = wait_for_deployment(
+            self.client, app_id, deployment_id, timeout,
+            on_phase=lambda phase: print(PHASE_MESSAGES.get(phase, f"📊 Deployment status: {phase}")),
+            component="backend",
+        )
+
+        if phase == "SUPERSEDED":
+            print("⚠️  Deployment was superseded by a newer deployment")
+            return False
+        elif phase in FAILED_PHASES:
+            print("❌ Deployment failed")
+            return False
+        elif phase in ACTIVE_PHASES:
+            print(f"✅ Backend deployment completed successfully in {timings['total_s']:.0f}s!")
+            return True
 
         print("⏰ Deployment timeout reached")
         return False
@@ -175,10 +172,7 @@ class DigitalOceanBackendDeployer:
     def get_app_url(self, app_id):
         """Get the app URL"""
         try:
-            response = requests.get(
-                f"{self.base_url}/apps/{app_id}",
-                headers=self.headers
-            )
+            response = self.client.get(f"/apps/{app_id}")
 
             if response.status_code == 200:
                 app_data = response.json()
@@ -195,10 +189,7 @@ class DigitalOceanBackendDeployer:
         """Setup database and get connection string"""
         try:
             print("🗄️  Setting up database...")
-            response = requests.get(
-                f"{self.base_url}/apps/{app_id}",
-                headers=self.headers
-            )
+            response = self.client.get(f"/apps/{app_id}")
 
             if response.status_code == 200:
                 app_data = response.json()
@@ -209,17 +200,14 @@ class DigitalOceanBackendDeployer:
                     print(f"✅ Database found with ID: {db_id}")
                     
                     # Get database connection info
-                    db_response = requests.get(
-                        f"{self.base_url}/databases/{db_id}",
-                        headers=self.headers
-                    )
+                    db_response = self.client.get(f"/databases/{db_id}")
                     
                     if db_response.status_code == 200:
                         db_data = db_response.json()
                         connection_info = db_data["database"]["connection"]
                         
                         # Construct DATABASE_URL
-                        database_url = f"postgresql://{connection_info['user']}:{connection_info['password']}@{connection_info['host']}:{connection_info['port']}/{connection_info['database']}?sslmode=require"
+                        database_url = postgres_url(connection_info)
                         
                         print("✅ Database connection string generated")
                         return database_url
@@ -362,5 +350,7 @@ def main():
     else:
         print("❌ Backend deployment failed")
 
+    deployer.client.print_stats()
+
 if __name__ == "__main__":
     main()
@@ -6,24 +6,17 @@ Deploys Streamlit applications to Digital Ocean App Platform
 
 import os
 import json
-import requests
-import time
-from pathlib import Path
-import zipfile
-import tempfile
+
+from do_client import ACTIVE_PHASES, FAILED_PHASES, DigitalOceanClient, wait_for_deployment
 
 class DigitalOceanDeployer:
-    def __init__(self, api_token):
+    def __init__(self, api_token, client=None):
         self.api_token = api_token
-        self.base_url = "https://api.digitalocean.com/v2"
-        self.headers = {
-            "Authorization": f"Bearer {api_token}",
-            "Content-Type": "application/json"
-        }
+        self.client = client or DigitalOceanClient(api_token)
     
-    def create_app(self, app_name, region="nyc"):
-        """Create a new app on Digital Ocean"""
-        app_spec = {
+    def app_spec(self, app_name, region="nyc"):
+        """App Platform spec for the ML hub"""
+        return {
             "name": app_name,
             "region": region,
             "services": [
@@ -49,10 +42,13 @@ class DigitalOceanDeployer:
                 }
             ]
         }
+    
+    def create_app(self, app_name, region="nyc"):
+        """Create a new app on Digital Ocean"""
+        app_spec = self.app_spec(app_name, region)
         
-        response = requests.post(
-            f"{self.base_url}/apps",
-            headers=self.headers,
+        response = self.client.post(
+            "/apps",
             json={"spec": app_spec}
         )
         
@@ -66,10 +62,7 @@ class DigitalOceanDeployer:
     
     def deploy_app(self, app_id):
         """Deploy the app"""
-        response = requests.post(
-            f"{self.base_url}/apps/{app_id}/deployments",
-            headers=self.headers
-        )
+        response = self.client.post(f"/apps/{app_id}/deployments")
         
         if response.status_code == 201:
             deployment_data = response.json()
@@ -81,10 +74,7 @@ class DigitalOceanDeployer:
     
     def get_deployment_status(self, app_id, deployment_id):
         """Check deployment status"""
-        response = requests.get(
-            f"{self.base_url}/apps/{app_id}/deployments/{deployment_id}",
-            headers=self.headers
-        )
+        response = self.client.get(f"/apps/{app_id}/deployments/{deployment_id}")
         
         if response.status_code == 200:
             return response.json()['deployment']['phase']
@@ -93,30 +83,25 @@ class DigitalOceanDeployer:
     def wait_for_deployment(self, app_id, deployment_id, timeout=300):
         """Wait for deployment to complete"""
         print("⏳ Waiting for deployment to complete...")
-        start_time = time.time()
-        
-        while time.time() - start_time < timeout:
-            status = self.get_deployment_status(app_id, deployment_id)
-            print(f"📊 Deployment status: {status}")
-            
-            if status == "SUCCESS":
-                print("✅ Deployment completed successfully!")
-                return True
-            elif status in ["ERROR", "CANCELED"]:
-                print(f"❌ Deployment failed with status: {status}")
-                return False
-            
-            time.sleep(10)
-        
+        phase, timings = wait_for_deployment(
+            self.client, app_id, deployment_id, timeout,
+            on_phase=lambda phase: print(f"📊 Deployment status: {phase}"),
+            component="ml-hub",
+        )
+
+        if phase in ACTIVE_PHASES:
+            print(f"✅ Deployment completed successfully in {timings['total_s']:.0f}s!")
+            return True
+        elif phase in FAILED_PHASES:
+            print(f"❌ Deployment failed with status: {phase}")
+            return False
+
         print("⏰ Deployment timeout")
         return False
     
     def get_app_url(self, app_id):
         """Get the app URL"""
-        response = requests.get(
-            f"{self.base_url}/apps/{app_id}",
-            headers=self.headers
-        )
+        response = self.client.get(f"/apps/{app_id}")
         
         if response.status_code == 200:
             app_data = response.json()
@@ -276,5 +261,7 @@ def main():
     else:
         print("❌ Deployment failed")
 
+    deployer.client.print_stats()
+
 if __name__ == "__main__":
     main()
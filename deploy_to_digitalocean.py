@@ -8,8 +8,6 @@ import os
 import subprocess
 import json
 import time
-import requests
-from pathlib import Path
 
 class DataAfrikDeployer:
     def __init__(self):
@@ -54,11 +52,9 @@ class DataAfrikDeployer:
             print(f"❌ Error pushing to GitHub: {e}")
             return False
     
-    def create_app_spec(self):
-        """Create the app specification for DigitalOcean"""
-        print("📝 Creating DigitalOcean app specification...")
-        
-        app_spec = {
+    def app_spec(self):
+        """App Platform spec for the platform: frontend and backend services"""
+        return {
             "name": self.app_name,
             "services": [
                 {
@@ -198,6 +194,17 @@ class DataAfrikDeployer:
                 }
             ]
         }
+    
+    def frontend_app_spec(self):
+        """The platform spec with only its frontend service"""
+        app_spec = self.app_spec()
+        app_spec["services"] = [service for service in app_spec["services"] if service["name"] == "frontend"]
+        return app_spec
+    
+    def create_app_spec(self):
+        """Create the app specification for DigitalOcean"""
+        print("📝 Creating DigitalOcean app specification...")
+        app_spec = self.app_spec()
         
         # Write app spec to file
         with open("app_spec.json", "w") as f:
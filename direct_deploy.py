@@ -5,12 +5,20 @@ Deploys the DataWeb platform directly to www.dataafrik.com on DigitalOcean
 without requiring GitHub
 """
 
-import os
+import argparse
 import json
-import zipfile
-import tempfile
 from pathlib import Path
 
+from source_archive import IncrementalArchiver, load_ignore_patterns
+from tree_copy import copy_tree
+
+# Files and directories shipped in the source archive; .deployignore prunes them
+SOURCE_ITEMS = [
+    "package.json", "package-lock.json", "vite.config.ts", "tsconfig.json",
+    "tailwind.config.ts", "postcss.config.js", "index.html", "README.md",
+    "src/", "public/", "components.json", "eslint.config.js", "backend/"
+]
+
 class DirectDataAfrikDeployer:
     def __init__(self):
         self.app_name = "dataafrik-platform"
@@ -164,54 +172,42 @@ class DirectDataAfrikDeployer:
         """Create a source archive for direct deployment"""
         print("📦 Creating source archive...")
         
-        # Create a temporary directory for the archive
-        with tempfile.TemporaryDirectory() as temp_dir:
-            temp_path = Path(temp_dir)
-            
-            # Copy all necessary files
-            files_to_copy = [
-                "package.json", "package-lock.json", "vite.config.ts", "tsconfig.json",
-                "tailwind.config.ts", "postcss.config.js", "index.html", "README.md",
-                "src/", "public/", "components.json", "eslint.config.js"
-            ]
-            
-            for item in files_to_copy:
-                source = self.project_dir / item
-                dest = temp_path / item
-                
-                if source.exists():
-                    if source.is_file():
-                        dest.parent.mkdir(parents=True, exist_ok=True)
-                        dest.write_bytes(source.read_bytes())
-                    elif source.is_dir():
-                        self._copy_dir(source, dest)
-            
-            # Create backend directory
-            backend_dest = temp_path / "backend"
-            backend_dest.mkdir(exist_ok=True)
-            self._copy_dir(self.project_dir / "backend", backend_dest)
-            
-            # Create zip archive
-            archive_path = self.project_dir / "dataafrik-source.zip"
-            with zipfile.ZipFile(archive_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                for file_path in temp_path.rglob('*'):
-                    if file_path.is_file():
-                        arcname = file_path.relative_to(temp_path)
-                        zipf.write(file_path, arcname)
-            
-            print(f"✅ Source archive created: {archive_path}")
-            return archive_path
+        archive_path = self.project_dir / "dataafrik-source.zip"
+        archiver = IncrementalArchiver(self.project_dir)
+        counts = archiver.build(archive_path, SOURCE_ITEMS)
+        
+        print(f"✅ Source archive created: {archive_path} "
+              f"({counts['files']} files, {counts['archive_bytes'] / 1024**2:.1f} MB)")
+        print(f"   ♻️  {counts['reused']} unchanged entries reused, "
+              f"🗜️  {counts['compressed']} compressed, {counts['bytes_read'] / 1024**2:.1f} MB read")
+        return archive_path
     
     def _copy_dir(self, src, dst):
-        """Copy directory recursively"""
-        dst.mkdir(parents=True, exist_ok=True)
-        for item in src.iterdir():
-            if item.is_file():
-                (dst / item.name).write_bytes(item.read_bytes())
-            elif item.is_dir():
-                self._copy_dir(item, dst / item.name)
+        """Copy directory recursively, skipping unchanged files and ignored paths"""
+        src = Path(src)
+        # Match .deployignore against project-relative paths, as the archive does
+        try:
+            prefix = src.resolve().relative_to(self.project_dir.resolve()).as_posix()
+        except ValueError:
+            prefix = None
+        return copy_tree(src, dst, load_ignore_patterns(self.project_dir), prefix=prefix)
     
-    def deploy(self):
+    def stage_source(self, stage_dir):
+        """Copy the deployable sources into ``stage_dir``, e.g. a Docker build context"""
+        print(f"📂 Staging source in {stage_dir}...")
+        stage_dir = Path(stage_dir)
+        totals = {"copied": 0, "skipped": 0, "bytes": 0}
+        for item in SOURCE_ITEMS:
+            source = self.project_dir / item
+            if source.exists():
+                counts = self._copy_dir(source, stage_dir / item.rstrip("/"))
+                totals = {key: totals[key] + counts[key] for key in totals}
+        
+        print(f"✅ Source staged: {totals['copied']} files copied "
+              f"({totals['bytes'] / 1024**2:.1f} MB), {totals['skipped']} unchanged")
+        return stage_dir
+    
+    def deploy(self, stage_dir=None):
         """Main deployment process"""
         print("🚀 Direct DataAfrik.com Deployment Started")
         print("=" * 50)
@@ -222,6 +218,10 @@ class DirectDataAfrikDeployer:
         # Step 2: Create source archive
         archive_path = self.create_source_archive()
         
+        # Step 3: Optionally stage an unpacked copy
+        if stage_dir:
+            self.stage_source(stage_dir)
+        
         print("🎉 Preparation completed!")
         print("📁 App specification: direct_app_spec.json")
         print("📦 Source archive: dataafrik-source.zip")
@@ -231,8 +231,12 @@ class DirectDataAfrikDeployer:
 
 def main():
     """Main function"""
+    parser = argparse.ArgumentParser(description="Prepare DataWeb for direct deployment")
+    parser.add_argument("--stage", help="Also copy the deployable sources into this directory")
+    args = parser.parse_args()
+    
     deployer = DirectDataAfrikDeployer()
-    deployer.deploy()
+    deployer.deploy(stage_dir=args.stage)
 
 if __name__ == "__main__":
     main()
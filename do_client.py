@@ -0,0 +1,325 @@
+"""
+Digital Ocean API client for the DataWeb deployment scripts
+One pooled requests.Session per client, so the deployers reuse keep-alive
+TLS connections instead of opening one per call. Every request gets a
+(connect, read) timeout; rate-limited and transient failures are retried
+with exponential backoff and jitter, waiting as long as the API asks via
+Retry-After or RateLimit-Reset. Request times are kept per endpoint.
+
+``wait_for_deployment`` polls a deployment adaptively: every second or
+two while the phase is changing, backing off towards 15 s while it is
+not, with jitter and ETag revalidation. The time spent in each phase is
+appended to a JSON-lines file for later analysis.
+
+Set DIGITALOCEAN_API_URL to point the scripts at a local stub of the API.
+"""
+
+import json
+import os
+import random
+import re
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+
+API_URL = os.environ.get("DIGITALOCEAN_API_URL", "https://api.digitalocean.com/v2")
+
+# Seconds to open a connection, and to wait for each read of the response
+CONNECT_TIMEOUT = float(os.environ.get("DIGITALOCEAN_CONNECT_TIMEOUT", 5))
+READ_TIMEOUT = float(os.environ.get("DIGITALOCEAN_READ_TIMEOUT", 30))
+
+# Connections kept open per host
+POOL_SIZE = int(os.environ.get("DIGITALOCEAN_POOL_SIZE", 10))
+
+MAX_RETRIES = int(os.environ.get("DIGITALOCEAN_MAX_RETRIES", 5))
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 30
+# Longest wait taken from a rate-limit header before giving up on the request
+MAX_RATE_LIMIT_WAIT = 120
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Retried on any of RETRY_STATUSES; other methods (app creation, deployments)
+# only when the API certainly did not act on them
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+# Seconds between deployment status polls: the first poll after a phase
+# change, growing by POLL_BACKOFF per unchanged poll up to the maximum
+POLL_MIN_INTERVAL = float(os.environ.get("DIGITALOCEAN_POLL_MIN", 1))
+POLL_MAX_INTERVAL = float(os.environ.get("DIGITALOCEAN_POLL_MAX", 15))
+POLL_BACKOFF = 1.5
+POLL_JITTER = 0.2
+# Poll at the maximum interval once fewer requests than this are left in the quota
+LOW_RATE_LIMIT = 100
+
+ACTIVE_PHASES = {"ACTIVE"}
+FAILED_PHASES = {"ERROR", "CANCELED", "SUPERSEDED"}
+
+# Per-deployment phase timings, one JSON object per line; empty disables
+DEPLOY_TIMINGS_FILE = os.environ.get("DIGITALOCEAN_DEPLOY_TIMINGS", "deploy_timings.jsonl")
+
+# UUIDs and numeric IDs in paths, so stats group by endpoint rather than by app
+ID_PATTERN = re.compile(r"/(?:[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}|\d+)(?=/|$)")
+
+
+def endpoint(method, path):
+    """``"GET /apps/{id}"`` for ``("get", "/apps/6f0e...")``"""
+    return f"{method.upper()} {ID_PATTERN.sub('/{id}', path.split('?')[0])}"
+
+
+def rate_limit_wait(response, now=None):
+    """Seconds the API asks us to wait before retrying, or None
+
+    Retry-After is either seconds or an HTTP date. RateLimit-Reset is the
+    Unix time the quota refills; it only applies once the quota is spent.
+    """
+    now = time.time() if now is None else now
+    retry_after = response.headers.get("Retry-After")
+    if retry_after:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(retry_after).timestamp() - now)
+            except (TypeError, ValueError):
+                pass
+    reset = response.headers.get("RateLimit-Reset")
+    if reset and (response.status_code == 429 or response.headers.get("RateLimit-Remaining") == "0"):
+        try:
+            return max(0.0, float(reset) - now)
+        except ValueError:
+            pass
+    return None
+
+
+def _not_sent(error):
+    """The request failed while connecting, so the API never saw it"""
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    return isinstance(reason, (NewConnectionError, ConnectTimeoutError))
+
+
+class EndpointStats:
+    def __init__(self):
+        self.count = 0
+        self.retries = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "retries": self.retries,
+            "errors": self.errors,
+            "total_s": round(self.total, 3),
+            "mean_ms": round(self.total / self.count * 1000, 1) if self.count else 0.0,
+            "max_ms": round(self.max * 1000, 1),
+        }
+
+
+class DigitalOceanClient:
+    """Pooled, retrying client for the Digital Ocean v2 API
+
+    ``request`` returns the final ``requests.Response`` whatever its status,
+    as the bare ``requests`` calls did; connection errors are raised once
+    the retries are used up.
+    """
+
+    def __init__(self, api_token, base_url=None, timeout=None, max_retries=MAX_RETRIES,
+                 pool_size=POOL_SIZE):
+        self.base_url = (base_url or API_URL).rstrip("/")
+        self.timeout = timeout or (CONNECT_TIMEOUT, READ_TIMEOUT)
+        self.max_retries = max_retries
+        self.session = requests.Session()
+        self.session.headers.update({
+            "Authorization": f"Bearer {api_token}",
+            "Content-Type": "application/json",
+        })
+        # Retries are done here, where the rate-limit headers can be read
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.rate_limit_remaining = None
+        # path: (ETag, body) of the last 200 response with an ETag
+        self._etags = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def _record(self, name, seconds, retried, failed):
+        with self._lock:
+            stats = self._stats.setdefault(name, EndpointStats())
+            stats.count += 1
+            stats.retries += retried
+            stats.errors += failed
+            stats.total += seconds
+            stats.max = max(stats.max, seconds)
+
+    def _backoff(self, attempt):
+        # Full jitter keeps parallel deploys from retrying in lockstep
+        return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+    def request(self, method, path, **kwargs):
+        method = method.upper()
+        url = f"{self.base_url}/{path.lstrip('/')}"
+        kwargs.setdefault("timeout", self.timeout)
+        name = endpoint(method, path)
+        idempotent = method in IDEMPOTENT_METHODS
+
+        attempt = 0
+        while True:
+            start = time.perf_counter()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                self._record(name, time.perf_counter() - start, attempt > 0, True)
+                if attempt >= self.max_retries or not (idempotent or _not_sent(e)):
+                    raise
+                wait = self._backoff(attempt)
+            else:
+                failed = response.status_code >= 400
+                self._record(name, time.perf_counter() - start, attempt > 0, failed)
+                remaining = response.headers.get("RateLimit-Remaining")
+                if remaining is not None and remaining.isdigit():
+                    self.rate_limit_remaining = int(remaining)
+                retryable = response.status_code == 429 or (
+                    idempotent and response.status_code in RETRY_STATUSES)
+                if not retryable or attempt >= self.max_retries:
+                    return response
+                wait = rate_limit_wait(response)
+                if wait is None:
+                    wait = self._backoff(attempt)
+                elif wait > MAX_RATE_LIMIT_WAIT:
+                    return response
+                response.close()
+            attempt += 1
+            time.sleep(wait)
+
+    def get(self, path, **kwargs):
+        return self.request("GET", path, **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.request("POST", path, **kwargs)
+
+    def get_json(self, path):
+        """``(status, body)`` of a GET, revalidated with the ETag of the last one
+
+        On 304 Not Modified the status is 304 and the body is the one cached
+        from the earlier response; on other errors the body is None.
+        """
+        cached = self._etags.get(path)
+        headers = {"If-None-Match": cached[0]} if cached else {}
+        response = self.get(path, headers=headers)
+        if response.status_code == 304 and cached:
+            return 304, cached[1]
+        if response.status_code != 200:
+            return response.status_code, None
+        body = response.json()
+        if response.headers.get("ETag"):
+            self._etags[path] = (response.headers["ETag"], body)
+        return 200, body
+
+    def stats(self):
+        """``{endpoint: {count, retries, errors, total_s, mean_ms, max_ms}}``"""
+        with self._lock:
+            return {name: stats.as_dict() for name, stats in sorted(self._stats.items())}
+
+    def print_stats(self):
+        stats = self.stats()
+        if not stats:
+            return
+        print("📈 API requests:")
+        for name, row in stats.items():
+            retried = f", {row['retries']} retried" if row["retries"] else ""
+            print(f"   {name:<40} {row['count']:>4} × {row['mean_ms']:>8.1f} ms "
+                  f"(max {row['max_ms']:.1f} ms{retried})")
+
+    def close(self):
+        self.session.close()
+
+
+def poll_interval(unchanged_polls, rate_limit_remaining=None):
+    """Seconds to wait before the next status poll, with jitter"""
+    if rate_limit_remaining is not None and rate_limit_remaining < LOW_RATE_LIMIT:
+        interval = POLL_MAX_INTERVAL
+    else:
+        interval = min(POLL_MAX_INTERVAL, POLL_MIN_INTERVAL * POLL_BACKOFF ** unchanged_polls)
+    return interval * random.uniform(1 - POLL_JITTER, 1 + POLL_JITTER)
+
+
+def record_timings(record, path=None):
+    """Append one deployment's timings to ``path`` as a JSON line"""
+    path = DEPLOY_TIMINGS_FILE if path is None else path
+    if not path:
+        return
+    try:
+        with open(path, "a") as f:
+            f.write(json.dumps(record) + "\n")
+    except OSError as e:
+        print(f"⚠️  Could not record deployment timings: {e}")
+
+
+def wait_for_deployment(client, app_id, deployment_id, timeout, on_phase=None, component=None):
+    """Poll a deployment until it is active or has failed
+
+    ``on_phase(phase)`` is called whenever the phase changes. A poll that
+    fails to connect is reported and counts as unchanged, so polling goes
+    on until the timeout. Returns the last phase seen (None if none could
+    be read) and the timing record, whose ``result`` is that phase or
+    ``"TIMEOUT"``.
+    """
+    path = f"/apps/{app_id}/deployments/{deployment_id}"
+    started_at = time.time()
+    start = time.monotonic()
+    deadline = start + timeout
+    phases = []
+    phase = None
+    polls = not_modified = errors = unchanged = 0
+
+    while True:
+        try:
+            status, body = client.get_json(path)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            print(f"❌ Error getting deployment status: {e}")
+            status, body = None, None
+            errors += 1
+        polls += 1
+        now = time.monotonic()
+        not_modified += status == 304
+        current = body["deployment"]["phase"] if body else None
+        if current is not None and current != phase:
+            phase = current
+            phases.append({"phase": phase, "start_s": round(now - start, 2)})
+            unchanged = 0
+            if on_phase is not None:
+                on_phase(phase)
+        else:
+            unchanged += 1
+        if phase in ACTIVE_PHASES | FAILED_PHASES or now >= deadline:
+            break
+        time.sleep(min(poll_interval(unchanged, client.rate_limit_remaining), deadline - now))
+
+    end = time.monotonic() - start
+    for entry, following in zip(phases, phases[1:] + [None]):
+        entry["seconds"] = round((following["start_s"] if following else end) - entry["start_s"], 2)
+    # A final phase has no duration of its own
+    if phases and phase in ACTIVE_PHASES | FAILED_PHASES:
+        phases[-1]["seconds"] = 0.0
+    record = {
+        "component": component,
+        "app_id": app_id,
+        "deployment_id": deployment_id,
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(started_at)),
+        "result": phase if phase in ACTIVE_PHASES | FAILED_PHASES else "TIMEOUT",
+        "total_s": round(end, 2),
+        "polls": polls,
+        "not_modified": not_modified,
+        "errors": errors,
+        "phases": phases,
+    }
+    record_timings(record)
+    return phase, record
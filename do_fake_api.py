@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Fake Digital Ocean API for testing the DataWeb deployment scripts
+Serves the App Platform endpoints the deployers use from memory. New
+deployments walk through PENDING_BUILD, BUILDING, PENDING_DEPLOY and
+DEPLOYING to ACTIVE on a timer, and new database clusters go from
+creating to online; responses carry ETags and rate-limit headers, and
+429s or 503s can be injected, at random or in order, to exercise the
+client's retries.
+
+Usage: python do_fake_api.py --port 8089 --scale 0.1
+       DIGITALOCEAN_API_URL=http://127.0.0.1:8089/v2 DIGITALOCEAN_API_TOKEN=test python deploy_backend.py
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Seconds spent in each phase before the next one, before scaling
+PHASES = [
+    ("PENDING_BUILD", 2),
+    ("BUILDING", 20),
+    ("PENDING_DEPLOY", 2),
+    ("DEPLOYING", 10),
+    ("ACTIVE", None),
+]
+DATABASE_CREATE_SECONDS = 30
+
+RATE_LIMIT = 5000
+RATE_LIMIT_WINDOW = 3600
+
+ROUTES = [
+    ("GET", re.compile(r"/v2/apps"), "list_apps"),
+    ("POST", re.compile(r"/v2/apps"), "create_app"),
+    ("GET", re.compile(r"/v2/apps/(?P<app_id>[^/]+)"), "get_app"),
+    ("PUT", re.compile(r"/v2/apps/(?P<app_id>[^/]+)"), "update_app"),
+    ("POST", re.compile(r"/v2/apps/(?P<app_id>[^/]+)/deployments"), "create_deployment"),
+    ("GET", re.compile(r"/v2/apps/(?P<app_id>[^/]+)/deployments/(?P<deployment_id>[^/]+)"), "get_deployment"),
+    ("GET", re.compile(r"/v2/databases"), "list_databases"),
+    ("POST", re.compile(r"/v2/databases"), "create_database"),
+    ("GET", re.compile(r"/v2/databases/(?P<database_id>[^/]+)"), "get_database"),
+]
+
+
+class FakeDigitalOceanAPI:
+    """In-memory apps, deployments and databases behind a local HTTP server
+
+    ``scale`` multiplies the phase durations; ``fail_rate`` and
+    ``rate_limit_rate`` are the chances of answering any request with a
+    503 or a 429, whose Retry-After is ``retry_after`` seconds.
+    ``requests`` counts requests per route handler, including failed ones.
+    """
+
+    def __init__(self, port=0, scale=1.0, fail_rate=0.0, rate_limit_rate=0.0, host="127.0.0.1",
+                 retry_after=1):
+        self.phases = [(phase, None if seconds is None else seconds * scale) for phase, seconds in PHASES]
+        self.database_seconds = DATABASE_CREATE_SECONDS * scale
+        self.fail_rate = fail_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        # Outcomes forced on the next requests, see inject()
+        self.faults = []
+        self.apps = {}
+        self.deployments = {}
+        self.databases = {}
+        self.requests = Counter()
+        self.remaining = RATE_LIMIT
+        self.reset_at = time.time() + RATE_LIMIT_WINDOW
+        self.lock = threading.Lock()
+        handler = type("Handler", (FakeAPIHandler,), {"api": self})
+        self.server = ThreadingHTTPServer((host, port), handler)
+        self.server.daemon_threads = True
+        self.url = f"http://{host}:{self.server.server_port}/v2"
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, name="do-fake-api", daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def inject(self, *faults):
+        """Force the outcome of the next requests, one fault each, in order
+
+        A status answers the request with that status without acting on it;
+        ``"drop"`` acts on the request, then closes the connection without
+        responding, as when a response is lost on the way back.
+        """
+        with self.lock:
+            self.faults.extend(faults)
+
+    def phase(self, deployment):
+        elapsed = time.monotonic() - deployment["started"]
+        for phase, seconds in self.phases:
+            if seconds is None or elapsed < seconds:
+                return phase
+            elapsed -= seconds
+        return self.phases[-1][0]
+
+    def deployment(self, deployment_id):
+        deployment = self.deployments[deployment_id]
+        phase = deployment["canceled"] or self.phase(deployment)
+        if phase == "ACTIVE":
+            app = self.apps[deployment["app_id"]]
+            if app.get("active_deployment_id") not in (None, deployment_id):
+                # Only the newest active deployment stays live
+                older = self.deployments[app["active_deployment_id"]]
+                if older["started"] < deployment["started"]:
+                    older["canceled"] = "SUPERSEDED"
+            app["active_deployment_id"] = deployment_id
+            app["live_url"] = f"https://{app['spec']['name']}-fake.ondigitalocean.app"
+        return {
+            "id": deployment_id,
+            "phase": phase,
+            "cause": deployment["cause"],
+            "created_at": deployment["created_at"],
+        }
+
+    # Route handlers return (status, body)
+
+    def list_apps(self, body):
+        return 200, {"apps": list(self.apps.values())}
+
+    def create_app(self, body):
+        spec = (body or {}).get("spec")
+        if not spec or not spec.get("name"):
+            return 422, {"id": "unprocessable_entity", "message": "spec.name is required"}
+        if any(app["spec"]["name"] == spec["name"] for app in self.apps.values()):
+            return 409, {"id": "conflict", "message": f"app {spec['name']} already exists"}
+        app_id = str(uuid.uuid4())
+        app = {"id": app_id, "spec": spec, "live_url": None, "databases": []}
+        for database in spec.get("databases", []):
+            database_id = self.add_database(database["name"], ready=True)
+            app["databases"].append({"id": database_id, "name": database["name"]})
+        self.apps[app_id] = app
+        # Creating an app starts its first deployment, as on App Platform
+        self.create_deployment(None, app_id, cause="app created")
+        return 201, {"app": app}
+
+    def get_app(self, body, app_id):
+        if app_id not in self.apps:
+            return 404, {"id": "not_found", "message": "app not found"}
+        return 200, {"app": self.apps[app_id]}
+
+    def update_app(self, body, app_id):
+        if app_id not in self.apps:
+            return 404, {"id": "not_found", "message": "app not found"}
+        self.apps[app_id]["spec"] = (body or {}).get("spec", self.apps[app_id]["spec"])
+        self.create_deployment(None, app_id, cause="app spec updated")
+        return 200, {"app": self.apps[app_id]}
+
+    def create_deployment(self, body, app_id, cause="manual"):
+        if app_id not in self.apps:
+            return 404, {"id": "not_found", "message": "app not found"}
+        deployment_id = str(uuid.uuid4())
+        self.deployments[deployment_id] = {
+            "app_id": app_id,
+            "cause": cause,
+            "started": time.monotonic(),
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "canceled": None,
+        }
+        deployment = self.deployment(deployment_id)
+        self.apps[app_id]["pending_deployment"] = deployment
+        return 201, {"deployment": deployment}
+
+    def get_deployment(self, body, app_id, deployment_id):
+        if self.deployments.get(deployment_id, {}).get("app_id") != app_id:
+            return 404, {"id": "not_found", "message": "deployment not found"}
+        return 200, {"deployment": self.deployment(deployment_id)}
+
+    def add_database(self, name, ready=False):
+        database_id = str(uuid.uuid4())
+        self.databases[database_id] = {
+            "id": database_id,
+            "name": name,
+            "status": "online" if ready else "creating",
+            "online_at": time.monotonic() + (0 if ready else self.database_seconds),
+            "connection": {
+                "user": "doadmin", "password": "fake", "host": f"{name}.fake.db",
+                "port": 25060, "database": "defaultdb",
+            },
+        }
+        return database_id
+
+    def database(self, database_id):
+        database = self.databases[database_id]
+        if time.monotonic() >= database["online_at"]:
+            database["status"] = "online"
+        return {key: value for key, value in database.items() if key != "online_at"}
+
+    def list_databases(self, body):
+        return 200, {"databases": [self.database(database_id) for database_id in self.databases]}
+
+    def create_database(self, body):
+        name = (body or {}).get("name")
+        if not name:
+            return 422, {"id": "unprocessable_entity", "message": "name is required"}
+        if any(database["name"] == name for database in self.databases.values()):
+            return 409, {"id": "conflict", "message": f"database {name} already exists"}
+        return 201, {"database": self.database(self.add_database(name))}
+
+    def get_database(self, body, database_id):
+        if database_id not in self.databases:
+            return 404, {"id": "not_found", "message": "database not found"}
+        return 200, {"database": self.database(database_id)}
+
+    def handle(self, method, path, body):
+        """``(status, headers, body)`` for one request; status None drops the connection"""
+        with self.lock:
+            now = time.time()
+            if now >= self.reset_at:
+                self.remaining, self.reset_at = RATE_LIMIT, now + RATE_LIMIT_WINDOW
+            self.remaining = max(0, self.remaining - 1)
+            headers = {
+                "RateLimit-Limit": str(RATE_LIMIT),
+                "RateLimit-Remaining": str(self.remaining),
+                "RateLimit-Reset": str(int(self.reset_at)),
+            }
+            for route_method, pattern, name in ROUTES:
+                match = pattern.fullmatch(path)
+                if route_method == method and match:
+                    break
+            else:
+                return 404, headers, {"id": "not_found", "message": f"{method} {path}"}
+            self.requests[name] += 1
+            fault = self.faults.pop(0) if self.faults else None
+            if fault == 429 or (fault is None and random.random() < self.rate_limit_rate):
+                return (429, {**headers, "Retry-After": str(self.retry_after)},
+                        {"id": "too_many_requests", "message": "slow down"})
+            if fault == 503 or (fault is None and random.random() < self.fail_rate):
+                return 503, headers, {"id": "service_unavailable", "message": "try again"}
+            if fault not in (None, "drop"):
+                return fault, headers, {"id": "injected", "message": f"injected {fault}"}
+            status, payload = getattr(self, name)(body, **match.groupdict())
+            return (None if fault == "drop" else status), headers, payload
+
+
+class FakeAPIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes
+    disable_nagle_algorithm = True
+    api = None
+
+    def _handle(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length)) if length else None
+        if not self.headers.get("Authorization", "").startswith("Bearer "):
+            status, headers, payload = 401, {}, {"id": "unauthorized", "message": "missing token"}
+        else:
+            status, headers, payload = self.api.handle(self.command, self.path.split("?")[0], body)
+        if status is None:
+            self.close_connection = True
+            return
+        data = json.dumps(payload).encode()
+        if status == 200 and self.command == "GET":
+            etag = '"' + hashlib.sha1(data).hexdigest() + '"'
+            headers["ETag"] = etag
+            if self.headers.get("If-None-Match") == etag:
+                status, data = 304, b""
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        if status != 304:
+            self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    do_GET = do_POST = do_PUT = _handle
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a fake Digital Ocean App Platform API")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiplier for the phase durations")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Fraction of requests answered with 503")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of requests answered with 429")
+    args = parser.parse_args()
+
+    api = FakeDigitalOceanAPI(args.port, args.scale, args.fail_rate, args.rate_limit_rate)
+    print(f"🧪 Fake Digital Ocean API on {api.url}")
+    try:
+        api.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print("📈 Requests served:")
+        for route, count in sorted(api.requests.items()):
+            print(f"   {route:<20} {count:>5}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+"""
+Incremental source archives for the DataWeb direct deployment
+Files are streamed straight from the project into the zip, without a
+staging copy. A manifest next to the archive records each entry's size,
+mtime and SHA-256; on the next run an entry whose file is unchanged has
+its compressed bytes copied from the previous archive as they are, so
+only new or edited files are read and compressed again.
+
+Ignore rules come from ``.deployignore`` in the project directory (one
+glob per line, ``#`` for comments), or DEFAULT_IGNORE without one.
+Ignored directories are pruned, so ``node_modules`` is never walked.
+"""
+
+import fnmatch
+import hashlib
+import json
+import os
+import shutil
+import struct
+import zipfile
+from pathlib import Path
+
+DEFAULT_IGNORE = [
+    "node_modules", ".git", ".github", "dist", "coverage", ".cache", ".vite",
+    "__pycache__", "*.pyc", ".DS_Store", "*.log", ".env", ".env.*", "*.zip",
+]
+
+# Already-compressed formats are stored, not deflated again
+STORED_SUFFIXES = {
+    ".png", ".jpg", ".jpeg", ".gif", ".webp", ".avif", ".ico", ".woff", ".woff2",
+    ".mp3", ".mp4", ".webm", ".gz", ".zip", ".br", ".pdf",
+}
+
+CHUNK_SIZE = 1024 * 1024
+MANIFEST_VERSION = 1
+
+# Local file header (APPNOTE.TXT 4.3.7): signature, version, flags, method,
+# time, date, CRC-32, compressed size, size, name length, extra field length
+LOCAL_HEADER = struct.Struct("<4s5H3L2H")
+LOCAL_HEADER_SIGNATURE = b"PK\x03\x04"
+NAME_LENGTH, EXTRA_LENGTH = 9, 10
+# Bit 3: sizes and CRC follow the data in a descriptor instead of the local header
+DATA_DESCRIPTOR_FLAG = 0x08
+
+
+def load_ignore_patterns(project_dir):
+    """Glob patterns from ``.deployignore``, or DEFAULT_IGNORE"""
+    ignore_file = Path(project_dir) / ".deployignore"
+    if not ignore_file.exists():
+        return list(DEFAULT_IGNORE)
+    lines = (line.strip() for line in ignore_file.read_text().splitlines())
+    return [line.rstrip("/") for line in lines if line and not line.startswith("#")]
+
+
+def is_ignored(relative_path, patterns):
+    """Whether a path (relative to the project, with ``/`` separators) or its name matches"""
+    name = relative_path.rsplit("/", 1)[-1]
+    return any(fnmatch.fnmatch(name, pattern) or fnmatch.fnmatch(relative_path, pattern)
+               for pattern in patterns)
+
+
+def iter_files(project_dir, items, patterns):
+    """``(path, arcname, stat)`` for every file under ``items``, ignored paths pruned"""
+    project_dir = Path(project_dir)
+    pending = [item.rstrip("/") for item in items]
+    while pending:
+        relative = pending.pop()
+        if is_ignored(relative, patterns):
+            continue
+        path = project_dir / relative
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        if path.is_dir():
+            with os.scandir(path) as entries:
+                pending.extend(f"{relative}/{entry.name}" for entry in entries)
+        elif path.is_file():
+            yield path, relative, stat
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def raw_copy_supported(target):
+    """Whether this zipfile module has the internals ``_copy_raw_entry`` relies on
+
+    A raw copy writes the local header with ``ZipInfo.FileHeader`` and
+    moves the writer's ``start_dir`` and ``_didModify`` itself. These are
+    not public API; tests/test_source_archive.py checks them on the Python
+    in use, and without them entries are copied through ``ZipFile.open``.
+    """
+    return (callable(getattr(zipfile.ZipInfo, "FileHeader", None))
+            and hasattr(target, "start_dir") and hasattr(target, "_didModify"))
+
+
+def _copy_raw_entry(source, target, info):
+    """Append ``info``'s compressed bytes from ``source`` to ``target`` without recompressing"""
+    source.fp.seek(info.header_offset)
+    header = LOCAL_HEADER.unpack(source.fp.read(LOCAL_HEADER.size))
+    if header[0] != LOCAL_HEADER_SIGNATURE:
+        raise zipfile.BadZipFile(f"Bad local header for {info.filename}")
+    # Skip the local name and extra field, whose lengths may differ from the central directory's
+    source.fp.seek(header[NAME_LENGTH] + header[EXTRA_LENGTH], os.SEEK_CUR)
+
+    entry = zipfile.ZipInfo(info.filename, info.date_time)
+    entry.compress_type = info.compress_type
+    entry.external_attr = info.external_attr
+    entry.CRC = info.CRC
+    entry.compress_size = info.compress_size
+    entry.file_size = info.file_size
+    entry.flag_bits = info.flag_bits & ~DATA_DESCRIPTOR_FLAG
+    zip64 = max(info.file_size, info.compress_size) > zipfile.ZIP64_LIMIT
+
+    entry.header_offset = target.fp.tell()
+    target.fp.write(entry.FileHeader(zip64))
+    remaining = info.compress_size
+    while remaining:
+        chunk = source.fp.read(min(CHUNK_SIZE, remaining))
+        if not chunk:
+            raise zipfile.BadZipFile(f"Truncated entry {info.filename}")
+        target.fp.write(chunk)
+        remaining -= len(chunk)
+    target.filelist.append(entry)
+    target.NameToInfo[entry.filename] = entry
+    target.start_dir = target.fp.tell()
+    target._didModify = True
+
+
+def _copy_entry(source, target, info):
+    """Append ``info`` from ``source`` through the public API, compressed again the same way"""
+    entry = zipfile.ZipInfo(info.filename, info.date_time)
+    entry.compress_type = info.compress_type
+    entry.external_attr = info.external_attr
+    with source.open(info) as src, target.open(entry, "w", force_zip64=info.file_size > zipfile.ZIP64_LIMIT) as dst:
+        shutil.copyfileobj(src, dst, CHUNK_SIZE)
+
+
+class IncrementalArchiver:
+    """Builds a zip of ``items`` under ``project_dir``, reusing an earlier build's entries
+
+    Unchanged means same size and mtime as in the manifest; a file whose
+    stat changed but whose hash did not (a checkout, a ``touch``) is reused
+    as well.
+    """
+
+    def __init__(self, project_dir, patterns=None):
+        self.project_dir = Path(project_dir)
+        self.patterns = load_ignore_patterns(project_dir) if patterns is None else patterns
+
+    @staticmethod
+    def manifest_path(archive_path):
+        archive_path = Path(archive_path)
+        return archive_path.with_name(archive_path.name + ".manifest.json")
+
+    def _load_manifest(self, archive_path):
+        """Previous entries by arcname, if the manifest describes the archive on disk"""
+        try:
+            manifest = json.loads(self.manifest_path(archive_path).read_text())
+            stat = Path(archive_path).stat()
+        except (OSError, ValueError):
+            return {}
+        archive = manifest.get("archive", {})
+        if (manifest.get("version") != MANIFEST_VERSION or archive.get("size") != stat.st_size
+                or archive.get("mtime_ns") != stat.st_mtime_ns):
+            return {}
+        return manifest.get("files", {})
+
+    def _write_new(self, target, path, arcname, stat):
+        """Compress ``path`` into ``target``, hashing it in the same pass"""
+        entry = zipfile.ZipInfo.from_file(path, arcname)
+        entry.compress_type = zipfile.ZIP_STORED if path.suffix.lower() in STORED_SUFFIXES else zipfile.ZIP_DEFLATED
+        digest = hashlib.sha256()
+        # The size is known up front, so large files get zip64 headers when needed
+        with open(path, "rb") as src, target.open(entry, "w", force_zip64=stat.st_size > zipfile.ZIP64_LIMIT) as dst:
+            for chunk in iter(lambda: src.read(CHUNK_SIZE), b""):
+                digest.update(chunk)
+                dst.write(chunk)
+        return digest.hexdigest()
+
+    def build(self, archive_path, items):
+        """Write the archive and its manifest; returns counts of what was done per file"""
+        archive_path = Path(archive_path)
+        previous = self._load_manifest(archive_path)
+        files = sorted(iter_files(self.project_dir, items, self.patterns), key=lambda file: file[1])
+        counts = {"reused": 0, "rehashed": 0, "compressed": 0, "bytes_read": 0}
+        manifest_files = {}
+
+        staging = archive_path.with_name(archive_path.name + ".tmp")
+        old = zipfile.ZipFile(archive_path) if previous else None
+        try:
+            with zipfile.ZipFile(staging, "w", zipfile.ZIP_DEFLATED) as target:
+                copy_entry = _copy_raw_entry if raw_copy_supported(target) else _copy_entry
+                for path, arcname, stat in files:
+                    record = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+                    before = previous.get(arcname)
+                    info = old.NameToInfo.get(arcname) if old is not None and before else None
+                    sha256 = None
+                    if info is not None and before["size"] == stat.st_size:
+                        if before["mtime_ns"] == stat.st_mtime_ns:
+                            sha256 = before["sha256"]
+                        else:
+                            counts["rehashed"] += 1
+                            counts["bytes_read"] += stat.st_size
+                            sha256 = file_sha256(path)
+                            if sha256 != before["sha256"]:
+                                sha256 = None
+                    if sha256 is not None:
+                        copy_entry(old, target, info)
+                        counts["reused"] += 1
+                    else:
+                        sha256 = self._write_new(target, path, arcname, stat)
+                        counts["compressed"] += 1
+                        counts["bytes_read"] += stat.st_size
+                    manifest_files[arcname] = {**record, "sha256": sha256}
+        except BaseException:
+            # Leave no half-written zip next to the archive
+            staging.unlink(missing_ok=True)
+            raise
+        finally:
+            if old is not None:
+                old.close()
+
+        os.replace(staging, archive_path)
+        stat = archive_path.stat()
+        manifest = {
+            "version": MANIFEST_VERSION,
+            "archive": {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns},
+            "files": manifest_files,
+        }
+        self.manifest_path(archive_path).write_text(json.dumps(manifest, indent=1, sort_keys=True))
+        counts["files"] = len(files)
+        counts["archive_bytes"] = stat.st_size
+        return counts
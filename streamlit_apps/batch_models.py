@@ -0,0 +1,283 @@
+"""
+Batched model training for the ML Hub
+Regression, clustering and time series models that train and evaluate
+over fixed-size row blocks of a columnar dataset, so throughput scales to
+uploaded files without materializing the whole feature matrix.
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from metrics import MODEL_TRAINING_SECONDS, timed
+
+BATCH_ROWS = 50_000
+EPOCHS = 3
+
+# Every TEST_EVERY-th row is held out for evaluation
+TEST_EVERY = 5
+
+# Rows kept for plotting predictions or cluster assignments
+SAMPLE_ROWS = 2_000
+
+
+def _split(start, block):
+    """Boolean mask of held-out rows in a block starting at row ``start``"""
+    return np.arange(start, start + len(block)) % TEST_EVERY == 0
+
+
+def _complete(block):
+    return block[~np.isnan(block).any(axis=1)]
+
+
+def _throughput(rows, seconds):
+    return rows / seconds if seconds > 0 else float('inf')
+
+
+@timed(MODEL_TRAINING_SECONDS, model='batch-regression')
+def fit_regression(store, features, target, batch_rows=BATCH_ROWS, epochs=EPOCHS, random_state=42):
+    """Fit an SGD linear regressor with ``partial_fit`` over row blocks"""
+    from sklearn.linear_model import SGDRegressor
+    from sklearn.preprocessing import StandardScaler
+
+    columns = list(features) + [target]
+    scaler = StandardScaler()
+    start_time = time.perf_counter()
+
+    train_rows = 0
+    for start, block in store.iter_blocks(columns, batch_rows):
+        train = _complete(block[~_split(start, block)])
+        if len(train):
+            scaler.partial_fit(train)
+            train_rows += len(train)
+    if not train_rows:
+        raise ValueError("No complete training rows for the selected columns")
+
+    y_mean, y_scale = scaler.mean_[-1], scaler.scale_[-1]
+    model = SGDRegressor(random_state=random_state)
+    for _ in range(epochs):
+        for start, block in store.iter_blocks(columns, batch_rows):
+            train = _complete(block[~_split(start, block)])
+            if len(train):
+                scaled = scaler.transform(train)
+                model.partial_fit(scaled[:, :-1], scaled[:, -1])
+    fit_seconds = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    test_rows = 0
+    abs_error = sq_error = y_sum = y_sq_sum = 0.0
+    actual, predicted = [], []
+    for start, block in store.iter_blocks(columns, batch_rows):
+        test = _complete(block[_split(start, block)])
+        if not len(test):
+            continue
+        scaled = scaler.transform(test)
+        y_pred = model.predict(scaled[:, :-1]) * y_scale + y_mean
+        y_true = test[:, -1]
+        error = y_true - y_pred
+        abs_error += np.abs(error).sum()
+        sq_error += (error ** 2).sum()
+        y_sum += y_true.sum()
+        y_sq_sum += (y_true ** 2).sum()
+        test_rows += len(test)
+        if sum(len(a) for a in actual) < SAMPLE_ROWS:
+            actual.append(y_true)
+            predicted.append(y_pred)
+    eval_seconds = time.perf_counter() - start_time
+
+    total_ss = y_sq_sum - y_sum ** 2 / test_rows if test_rows else np.nan
+    metrics = {
+        'train_rows': train_rows,
+        'test_rows': test_rows,
+        'r2': 1 - sq_error / total_ss if test_rows and total_ss > 0 else np.nan,
+        'mae': abs_error / test_rows if test_rows else np.nan,
+        'rmse': np.sqrt(sq_error / test_rows) if test_rows else np.nan,
+        'fit_seconds': fit_seconds,
+        'eval_seconds': eval_seconds,
+        'fit_rows_per_second': _throughput(train_rows * (epochs + 1), fit_seconds),
+        'predict_rows_per_second': _throughput(test_rows, eval_seconds),
+    }
+    coefficients = pd.DataFrame({
+        'Feature': list(features),
+        # Coefficients of standardized features, comparable across features
+        'Coefficient': model.coef_,
+    })
+    sample = pd.DataFrame({
+        'Actual': np.concatenate(actual)[:SAMPLE_ROWS] if actual else [],
+        'Predicted': np.concatenate(predicted)[:SAMPLE_ROWS] if predicted else [],
+    })
+    return {'model': model, 'scaler': scaler, 'metrics': metrics,
+            'coefficients': coefficients, 'sample': sample}
+
+
+@timed(MODEL_TRAINING_SECONDS, model='batch-kmeans')
+def fit_clustering(store, features, n_clusters, batch_rows=BATCH_ROWS, epochs=EPOCHS, random_state=42):
+    """Fit MiniBatchKMeans with ``partial_fit`` over row blocks"""
+    from sklearn.cluster import MiniBatchKMeans
+    from sklearn.preprocessing import StandardScaler
+
+    features = list(features)
+    scaler = StandardScaler()
+    start_time = time.perf_counter()
+
+    rows = 0
+    for _, block in store.iter_blocks(features, batch_rows):
+        block = _complete(block)
+        if len(block):
+            scaler.partial_fit(block)
+            rows += len(block)
+    if rows < n_clusters:
+        raise ValueError("Not enough complete rows for the requested number of clusters")
+
+    model = MiniBatchKMeans(n_clusters=n_clusters, random_state=random_state, n_init=3)
+    for _ in range(epochs):
+        for _, block in store.iter_blocks(features, batch_rows):
+            block = _complete(block)
+            # partial_fit needs at least n_clusters rows on its first call
+            if len(block) >= n_clusters:
+                model.partial_fit(scaler.transform(block))
+    fit_seconds = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    sizes = np.zeros(n_clusters, dtype=np.int64)
+    inertia = 0.0
+    samples = []
+    for _, block in store.iter_blocks(features, batch_rows):
+        block = _complete(block)
+        if not len(block):
+            continue
+        scaled = scaler.transform(block)
+        labels = model.predict(scaled)
+        sizes += np.bincount(labels, minlength=n_clusters)
+        inertia += ((scaled - model.cluster_centers_[labels]) ** 2).sum()
+        if sum(len(s) for s in samples) < SAMPLE_ROWS:
+            sample = pd.DataFrame(block[:SAMPLE_ROWS], columns=features)
+            sample['Cluster'] = labels[:SAMPLE_ROWS].astype(str)
+            samples.append(sample)
+    predict_seconds = time.perf_counter() - start_time
+
+    metrics = {
+        'rows': rows,
+        'inertia': inertia,
+        'fit_seconds': fit_seconds,
+        'predict_seconds': predict_seconds,
+        'fit_rows_per_second': _throughput(rows * (epochs + 1), fit_seconds),
+        'predict_rows_per_second': _throughput(rows, predict_seconds),
+    }
+    centers = pd.DataFrame(scaler.inverse_transform(model.cluster_centers_), columns=features)
+    centers.insert(0, 'Size', sizes)
+    return {'model': model, 'scaler': scaler, 'metrics': metrics, 'centers': centers,
+            'sample': pd.concat(samples, ignore_index=True).head(SAMPLE_ROWS)}
+
+
+def lag_matrix(values, lags):
+    """Design matrix of the previous ``lags`` values and the value to predict"""
+    windows = np.lib.stride_tricks.sliding_window_view(values, lags + 1)
+    return windows[:, :-1], windows[:, -1]
+
+
+def aggregate_series(store, date_column, value_column, freq='D', batch_rows=BATCH_ROWS):
+    """Sum of ``value_column`` per ``freq`` period, aggregated one row block at a time
+
+    Only the per-period totals are kept, so memory follows the number of
+    periods rather than the number of rows. Periods without rows are 0.
+    """
+    dates = store.column(date_column)
+    values = store.column(value_column)
+    totals = None
+    for start in range(0, len(values), batch_rows):
+        stop = start + batch_rows
+        block = pd.Series(values.iloc[start:stop].to_numpy(dtype=np.float64),
+                          index=pd.to_datetime(dates.iloc[start:stop], errors='coerce'))
+        block = block[block.index.notna()].dropna()
+        if not len(block):
+            continue
+        sums = block.resample(freq).sum()
+        totals = sums if totals is None else totals.add(sums, fill_value=0)
+    if totals is None:
+        return pd.Series(dtype=np.float64)
+    return totals.resample(freq).sum()
+
+
+@timed(MODEL_TRAINING_SECONDS, model='batch-time-series')
+def fit_time_series(store, date_column, value_column, freq='D', lags=14, horizon=30,
+                    batch_rows=BATCH_ROWS, ridge=1e-3):
+    """Fit a lag-feature ridge autoregression by accumulating normal equations
+
+    The series is aggregated (summed) to ``freq`` block by block; the last
+    fifth of the windows is held out, then the model forecasts ``horizon``
+    steps ahead.
+    """
+    start_time = time.perf_counter()
+    series = aggregate_series(store, date_column, value_column, freq, batch_rows)
+    if len(series) <= lags * 2:
+        raise ValueError(f"Need more than {lags * 2} periods after resampling to '{freq}'")
+
+    X, y = lag_matrix(series.to_numpy(), lags)
+    split = int(len(X) * 0.8)
+
+    # Normal equations accumulated block by block, with an intercept column
+    xtx = np.zeros((lags + 1, lags + 1))
+    xty = np.zeros(lags + 1)
+    for start in range(0, split, batch_rows):
+        stop = min(start + batch_rows, split)
+        design = np.column_stack([np.ones(stop - start), X[start:stop]])
+        xtx += design.T @ design
+        xty += design.T @ y[start:stop]
+    coef = np.linalg.solve(xtx + ridge * np.eye(lags + 1), xty)
+    fit_seconds = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    test_pred = coef[0] + X[split:] @ coef[1:]
+    error = y[split:] - test_pred
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mape = np.nanmean(np.abs(error / y[split:]))
+
+    history = list(series.to_numpy()[-lags:])
+    forecast = []
+    for _ in range(horizon):
+        value = coef[0] + np.dot(coef[1:], history[-lags:])
+        forecast.append(value)
+        history.append(value)
+    predict_seconds = time.perf_counter() - start_time
+
+    future_index = pd.date_range(series.index[-1], periods=horizon + 1, freq=freq)[1:]
+    test_index = series.index[lags + split:]
+    metrics = {
+        'periods': len(series),
+        'windows': len(X),
+        'mae': float(np.abs(error).mean()) if len(error) else np.nan,
+        'mape': float(mape) if len(error) else np.nan,
+        'fit_seconds': fit_seconds,
+        'predict_seconds': predict_seconds,
+        'fit_rows_per_second': _throughput(split, fit_seconds),
+    }
+    frame = pd.concat([
+        pd.DataFrame({'Date': series.index, 'Value': series.to_numpy(), 'Type': 'Historical'}),
+        pd.DataFrame({'Date': test_index, 'Value': test_pred, 'Type': 'Backtest'}),
+        pd.DataFrame({'Date': future_index, 'Value': forecast, 'Type': 'Forecast'}),
+    ], ignore_index=True)
+    return {'coef': coef, 'metrics': metrics, 'frame': frame}
+
+
+def sample_dataset(kind, rows=200_000, random_state=42):
+    """Synthetic dataset used when no file is uploaded"""
+    if kind == 'Regression':
+        from sklearn.datasets import make_regression
+        X, y = make_regression(n_samples=rows, n_features=10, n_informative=6, noise=10.0,
+                               random_state=random_state)
+        frame = pd.DataFrame(X, columns=[f'feature_{i}' for i in range(X.shape[1])])
+        frame['target'] = y
+        return frame
+    if kind == 'Clustering':
+        from sklearn.datasets import make_blobs
+        X, _ = make_blobs(n_samples=rows, centers=4, n_features=4, random_state=random_state)
+        return pd.DataFrame(X, columns=[f'feature_{i}' for i in range(X.shape[1])])
+
+    rng = np.random.default_rng(random_state)
+    dates = pd.date_range(start='2020-01-01', end='2024-01-01', freq='D')
+    t = np.arange(len(dates))
+    sales = (100 + 0.05 * t + 15 * np.sin(2 * np.pi * t / 7) + 25 * np.sin(2 * np.pi * t / 365.25)
+             + rng.normal(0, 5, len(dates)))
+    return pd.DataFrame({'Date': dates, 'Sales': sales})
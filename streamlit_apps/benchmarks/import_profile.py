@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Startup import profile for the ML Hub
+Runs the top-level imports of main.py under ``python -X importtime`` and
+prints the cumulative cost of each top-level module, then the cost of the
+modules the warm-up thread loads after the first paint. With ``--first-run``
+it also renders the Dashboard once through Streamlit's AppTest (warm-up
+disabled) and reports which heavy modules that first run imported.
+
+Usage: python benchmarks/import_profile.py --top 15 --first-run
+"""
+
+import argparse
+import ast
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+APP_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(APP_DIR))
+
+HEAVY_MODULES = ['plotly', 'sklearn', 'scipy', 'joblib', 'requests']
+
+
+def app_imports(path=APP_DIR / 'main.py'):
+    """Source of the module-level import statements of ``path``"""
+    tree = ast.parse(path.read_text())
+    return '\n'.join(
+        ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))
+    )
+
+
+def import_times(code):
+    """``{module: (self_us, cumulative_us)}`` for top-level imports made by ``code``"""
+    output = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=APP_DIR, capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in output.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        if not name.startswith('  '):
+            times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def first_run():
+    """Render the Dashboard once and list the heavy modules it imported"""
+    from streamlit.testing.v1 import AppTest
+
+    os.chdir(APP_DIR)
+    start = time.perf_counter()
+    app = AppTest.from_file(str(APP_DIR / 'main.py'), default_timeout=120).run()
+    elapsed = time.perf_counter() - start
+    return {
+        'seconds': round(elapsed, 3),
+        'exceptions': [str(e.value) for e in app.exception],
+        'loaded': [name for name in HEAVY_MODULES if name in sys.modules],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile the ML Hub's startup imports")
+    parser.add_argument('--top', type=int, default=15, help="Top-level modules to list")
+    parser.add_argument('--first-run', action='store_true', help="Also time the first Dashboard run")
+    parser.add_argument('--json', help="Write results to this JSON file")
+    parser.add_argument('--run-first', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_first:
+        print(json.dumps(first_run()))
+        return
+
+    from lazy_imports import WARM_UP_MODULES
+
+    code = app_imports()
+    # Leave out what the interpreter imports before running any code
+    baseline = import_times('pass')
+    startup = {name: times for name, times in import_times(code).items() if name not in baseline}
+    total = sum(cumulative for _, cumulative in startup.values())
+    print(f"⏱️  main.py imports: {total / 1e6:.2f} s across {len(startup)} top-level modules")
+    for name, (_, cumulative) in sorted(startup.items(), key=lambda item: -item[1][1])[:args.top]:
+        print(f"  {name:<30} {cumulative / 1e3:>9.1f} ms")
+
+    deferred = import_times(code + '\n' + '\n'.join(f'import {name}' for name in WARM_UP_MODULES))
+    warm_up = {
+        name: cumulative for name, (_, cumulative) in deferred.items()
+        if name not in startup and name not in baseline
+    }
+    print(f"🔥 Deferred to the warm-up thread: {sum(warm_up.values()) / 1e6:.2f} s")
+    for name, cumulative in sorted(warm_up.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {name:<30} {cumulative / 1e3:>9.1f} ms")
+
+    results = {
+        'startup_seconds': total / 1e6,
+        'startup': {name: cumulative for name, (_, cumulative) in startup.items()},
+        'warm_up_seconds': sum(warm_up.values()) / 1e6,
+        'warm_up': warm_up,
+    }
+
+    if args.first_run:
+        output = subprocess.run(
+            [sys.executable, __file__, '--run-first'],
+            capture_output=True, text=True, check=True,
+            env={**os.environ, 'ML_HUB_WARM_UP': 'false'},
+        )
+        results['first_run'] = json.loads(output.stdout.strip().splitlines()[-1])
+        print(f"🏠 First Dashboard run: {results['first_run']['seconds']:.2f} s, "
+              f"heavy modules loaded: {', '.join(results['first_run']['loaded']) or 'none'}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Page benchmark for the ML Hub
+Drives main.py headlessly through Streamlit's AppTest against synthetic
+CSV uploads of 10K, 1M and 10M rows. Each scenario is a sequence of widget
+interactions (select a page, pick a column, move a slider); every step
+records its wall time and the bytes of the messages sent to the browser,
+and each scenario reports the peak RSS of its own subprocess, with an
+empty model and dataset cache.
+
+Scenarios cover the load, correlation, histogram, top-value, training and
+forecasting paths. Results are written as JSON; with ``--baseline`` a
+previous file is compared and the script exits non-zero on regressions.
+
+Usage: python benchmarks/pages.py --rows 10000 1000000 --json results.json
+       python benchmarks/pages.py --baseline results.json --tolerance 0.25
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+APP_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(APP_DIR))
+
+ROW_COUNTS = [10_000, 1_000_000, 10_000_000]
+CHUNK_ROWS = 1_000_000
+SKUS = 1000
+SEED = 42
+
+
+def page(name):
+    return lambda at: at.sidebar.selectbox[0].select(name)
+
+
+def select(label, value):
+    return lambda at: next(s for s in at.selectbox if s.label.startswith(label)).select(value)
+
+
+def slide(label, value):
+    return lambda at: next(s for s in at.slider if s.label.startswith(label)).set_value(value)
+
+
+def check(label):
+    return lambda at: next(c for c in at.checkbox if c.label.startswith(label)).check()
+
+
+# name: (uses the upload, [(step, action before the rerun)])
+SCENARIOS = {
+    # Startup renders the Dashboard, so it needs no further step
+    'dashboard': (False, []),
+    'visualization': (False, [('render', page("🔍 Data Visualization"))]),
+    'analytics': (True, [
+        ('load + correlation', page("📊 Data Analytics")),
+        ('histogram', select("Select a column", 'units')),
+        ('histogram bins', slide("Bins:", 100)),
+        ('top values', select("Select a column", 'sku')),
+    ]),
+    'analytics-streaming': (True, [
+        ('page', page("📊 Data Analytics")),
+        ('streaming profile', check("⚡ Streaming mode")),
+    ]),
+    'training': (True, [
+        ('classification', page("🤖 Machine Learning")),
+        ('regression', select("Choose Model Type", 'Regression')),
+        ('clustering', select("Choose Model Type", 'Clustering')),
+    ]),
+    'forecast': (True, [('load + fit', page("📈 Predictive Models"))]),
+}
+
+
+def write_dataset(path, rows, chunk_rows=CHUNK_ROWS, seed=SEED):
+    """Sales-like CSV: date, SKU, segment, units, five features and a target, ~2% missing"""
+    rng = np.random.default_rng(seed)
+    start = np.datetime64('2022-01-01')
+    with open(path, 'w') as f:
+        for offset in range(0, rows, chunk_rows):
+            n = min(chunk_rows, rows - offset)
+            features = rng.normal(size=(n, 5))
+            features[rng.random((n, 5)) < 0.02] = np.nan
+            chunk = pd.DataFrame({
+                'date': (start + rng.integers(0, 3 * 365, n).astype('timedelta64[D]')).astype(str),
+                'sku': np.char.add('sku-', rng.zipf(1.3, n).clip(max=SKUS).astype(str)),
+                'segment': rng.choice(['retail', 'wholesale', 'online', 'partner'], n),
+                'units': rng.poisson(20, n).astype(np.float64),
+                **{f'x{i}': features[:, i] for i in range(5)},
+            })
+            chunk['target'] = features[:, :3] @ [1.5, -2.0, 0.5] + rng.normal(scale=0.5, size=n)
+            chunk.to_csv(f, header=offset == 0, index=False)
+
+
+def dataset_path(data_dir, rows):
+    """Generated CSV for ``rows``, reused across runs since generation is seeded"""
+    path = Path(data_dir) / f'ml-hub-bench-{rows}-s{SEED}.csv'
+    if not path.exists():
+        print(f"📝 Generating {rows:,} rows...")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        staging = path.with_suffix('.tmp')
+        write_dataset(staging, rows)
+        staging.rename(path)
+    return path
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process
+
+    VmHWM starts afresh at exec, unlike ``ru_maxrss``, which a subprocess
+    inherits from the parent that generated the dataset.
+    """
+    try:
+        for line in Path('/proc/self/status').read_text().splitlines():
+            if line.startswith('VmHWM:'):
+                return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+class BenchUpload(io.BytesIO):
+    """In-memory upload with the attributes of Streamlit's UploadedFile"""
+
+    def __init__(self, path):
+        super().__init__(Path(path).read_bytes())
+        self.name = Path(path).name
+        self.size = len(self.getbuffer())
+        self.file_id = f'bench-{self.name}'
+
+
+def run_scenario(name, data):
+    """Run one scenario in this process and return per-step results"""
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+    from streamlit.testing.v1.local_script_runner import LocalScriptRunner
+
+    # Count the bytes of every message the script sends to the browser, and
+    # time the script run itself: AppTest polls for completion in 0.1 s steps
+    sent = [0]
+    elapsed = [0.0]
+    enqueue = LocalScriptRunner._enqueue_forward_msg
+    run_script = LocalScriptRunner._run_script
+
+    def counting_enqueue(self, msg):
+        sent[0] += msg.ByteSize()
+        return enqueue(self, msg)
+
+    def timed_run_script(self, rerun_data):
+        start = time.perf_counter()
+        try:
+            return run_script(self, rerun_data)
+        finally:
+            elapsed[0] += time.perf_counter() - start
+
+    LocalScriptRunner._enqueue_forward_msg = counting_enqueue
+    LocalScriptRunner._run_script = timed_run_script
+
+    if data is not None:
+        upload = BenchUpload(data)
+
+        def file_uploader(*args, **kwargs):
+            upload.seek(0)
+            return upload
+
+        st.file_uploader = file_uploader
+
+    os.chdir(APP_DIR)
+    app = AppTest.from_file(str(APP_DIR / 'main.py'), default_timeout=3600)
+    _, steps = SCENARIOS[name]
+    results = []
+    for step, action in [('startup', None)] + steps:
+        sent[0] = 0
+        elapsed[0] = 0.0
+        if action is not None:
+            action(app)
+        app.run()
+        results.append({
+            'step': step,
+            'seconds': round(elapsed[0], 3),
+            'payload_bytes': sent[0],
+            'errors': [str(e.value) for e in app.exception] + [e.value for e in app.error],
+        })
+    return {
+        'scenario': name,
+        'steps': results,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Steps whose time, payload or peak RSS grew by more than ``tolerance``"""
+    previous = {(r['scenario'], r['rows']): r for r in baseline['results']}
+    regressions = []
+    for result in results:
+        old = previous.get((result['scenario'], result['rows']))
+        if old is None:
+            continue
+        checks = [('peak_rss_mb', result['peak_rss_mb'], old['peak_rss_mb'], 50)]
+        old_steps = {s['step']: s for s in old['steps']}
+        for step in result['steps']:
+            if step['step'] in old_steps:
+                before = old_steps[step['step']]
+                # Absolute floors keep millisecond noise from counting as a regression
+                checks.append((f"{step['step']} seconds", step['seconds'], before['seconds'], 0.05))
+                checks.append((f"{step['step']} payload_bytes", step['payload_bytes'],
+                               before['payload_bytes'], 1024))
+        for metric, new, old_value, floor in checks:
+            if new > old_value * (1 + tolerance) and new - old_value > floor:
+                regressions.append(f"{result['scenario']} @ {result['rows']:,} rows: "
+                                   f"{metric} {old_value} → {new}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ML Hub pages through AppTest")
+    parser.add_argument('--rows', type=int, nargs='+', default=ROW_COUNTS)
+    parser.add_argument('--scenarios', nargs='+', choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument('--data-dir', default=tempfile.gettempdir(),
+                        help="Where generated datasets are kept between runs")
+    parser.add_argument('--json', help="Write results to this JSON file")
+    parser.add_argument('--baseline', help="Earlier results to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="Allowed relative growth before a step counts as a regression")
+    parser.add_argument('--run', choices=list(SCENARIOS), help=argparse.SUPPRESS)
+    parser.add_argument('--data', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        print(json.dumps(run_scenario(args.run, args.data)))
+        return
+
+    results = []
+    for name in args.scenarios:
+        uses_data = SCENARIOS[name][0]
+        for rows in args.rows if uses_data else [0]:
+            command = [sys.executable, __file__, '--run', name]
+            if uses_data:
+                command += ['--data', str(dataset_path(args.data_dir, rows))]
+            with tempfile.TemporaryDirectory() as cache_dir:
+                # A fresh cache directory per scenario, so every run starts cold
+                env = {**os.environ, 'ML_HUB_CACHE_DIR': cache_dir, 'ML_HUB_WARM_UP': 'false'}
+                output = subprocess.run(command, capture_output=True, text=True, check=True, env=env)
+            result = {**json.loads(output.stdout.strip().splitlines()[-1]), 'rows': rows}
+            results.append(result)
+            label = f"{name} @ {rows:,} rows" if uses_data else name
+            print(f"📄 {label} (peak RSS {result['peak_rss_mb']:.0f} MB)")
+            for step in result['steps']:
+                warning = f"  ⚠️ {step['errors'][0][:80]}" if step['errors'] else ''
+                print(f"  {step['step']:<22} {step['seconds']:>9.2f} s "
+                      f"{step['payload_bytes'] / 1024:>10.1f} KB{warning}")
+
+    report = {
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+        },
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'results': results,
+    }
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"❌ {regression}")
+        if regressions:
+            sys.exit(1)
+        print("✅ No regressions against the baseline")
+
+
+if __name__ == "__main__":
+    main()
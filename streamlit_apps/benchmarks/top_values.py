@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Top-value benchmark for the ML Hub
+Compares exact ``Series.value_counts`` against the one-pass column sketch
+used by the Data Analytics page on a synthetic Zipf-distributed ID column.
+Reports counting time, peak traced memory, top-k recall, the largest top-k count
+error and the distinct-count error. The sketch is fed chunk by chunk, so it
+never holds the whole column.
+
+Usage: python benchmarks/top_values.py --rows 5000000 --chunk-rows 100000
+"""
+
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+APP_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(APP_DIR))
+
+from sketches import TOP_K, ColumnSketch  # noqa: E402
+
+
+def iter_id_chunks(rows, chunk_rows, skew, seed=42):
+    """Yield chunks of string IDs drawn from a Zipf distribution"""
+    rng = np.random.default_rng(seed)
+    for start in range(0, rows, chunk_rows):
+        ids = rng.zipf(skew, min(chunk_rows, rows - start))
+        yield pd.Series(ids).map('id-{}'.format)
+
+
+def run_exact(rows, chunk_rows, skew):
+    column = pd.concat(iter_id_chunks(rows, chunk_rows, skew), ignore_index=True)
+    start = time.perf_counter()
+    counts = column.value_counts()
+    return counts, counts.size, time.perf_counter() - start
+
+
+def run_sketch(rows, chunk_rows, skew):
+    sketch = ColumnSketch()
+    seconds = 0.0
+    for chunk in iter_id_chunks(rows, chunk_rows, skew):
+        start = time.perf_counter()
+        sketch.update(chunk)
+        seconds += time.perf_counter() - start
+    return sketch, sketch.distinct, seconds
+
+
+def measure(method, *args):
+    """Run one method, returning its result, counting time and peak traced memory
+
+    Generating the IDs is excluded from the time but not from the memory,
+    since the exact method has to hold every chunk at once.
+    """
+    tracemalloc.start()
+    result, distinct, seconds = method(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, distinct, seconds, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sketch-based top values against value_counts")
+    parser.add_argument('--rows', type=int, default=2_000_000)
+    parser.add_argument('--chunk-rows', type=int, default=100_000)
+    parser.add_argument('--skew', type=float, default=1.2, help="Zipf exponent of the ID column")
+    parser.add_argument('--top', type=int, default=TOP_K)
+    parser.add_argument('--json', help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    exact, exact_distinct, exact_seconds, exact_peak = measure(
+        run_exact, args.rows, args.chunk_rows, args.skew)
+    sketch, sketch_distinct, sketch_seconds, sketch_peak = measure(
+        run_sketch, args.rows, args.chunk_rows, args.skew)
+
+    top = sketch.top(args.top)
+    true_top = set(exact.index[:args.top])
+    recall = sum(value in true_top for value, _ in top) / args.top
+    max_error = max(count - exact.get(value, 0) for value, count in top)
+
+    results = [
+        {'method': 'Series.value_counts', 'seconds': round(exact_seconds, 3),
+         'peak_mb': round(exact_peak / 1024**2, 1), 'distinct': int(exact_distinct)},
+        {'method': 'sketches.ColumnSketch', 'seconds': round(sketch_seconds, 3),
+         'peak_mb': round(sketch_peak / 1024**2, 1), 'distinct': int(sketch_distinct),
+         'top_recall': recall, 'max_count_error': int(max_error),
+         'distinct_error': round(abs(sketch_distinct - exact_distinct) / exact_distinct, 4)},
+    ]
+    print(f"📊 {args.rows:,} rows, {exact_distinct:,} distinct IDs")
+    for result in results:
+        print(f"{result['method']:<25} {result['seconds']:>8.2f} s {result['peak_mb']:>9.1f} MB "
+              f"{result['distinct']:>12,} distinct")
+    print(f"Top-{args.top} recall {recall:.0%}, max count error {max_error:,}, "
+          f"distinct error {results[1]['distinct_error']:.2%}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'rows': args.rows, 'chunk_rows': args.chunk_rows, 'skew': args.skew,
+                       'results': results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Excel loader benchmark for the ML Hub
+Generates a synthetic workbook and compares load time and peak RSS of
+pandas.read_excel against the streaming loaders used by the Data Analytics
+page. Each reader runs in a fresh subprocess so peak RSS is not shared.
+
+Usage: python benchmarks/xlsx_loader.py --rows 200000 --cols 12
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+APP_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(APP_DIR))
+
+READERS = ['baseline (imports only)', 'pandas.read_excel', 'loaders.read_table', 'streaming_profile.profile_table']
+
+
+def create_workbook(path, rows, cols):
+    """Write a workbook with numeric, text and date columns in write-only mode"""
+    from datetime import datetime, timedelta
+    import random
+
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet('data')
+    worksheet.append([f'col_{i}' for i in range(cols)])
+    start = datetime(2024, 1, 1)
+    rng = random.Random(42)
+    for r in range(rows):
+        row = []
+        for c in range(cols):
+            if c % 4 == 0:
+                row.append(f'cat_{rng.randint(0, 50)}')
+            elif c % 4 == 1:
+                row.append(start + timedelta(minutes=r))
+            else:
+                row.append(rng.random() * 1000)
+        worksheet.append(row)
+    workbook.save(path)
+
+
+def run_reader(reader, path, chunk_rows):
+    """Load the workbook with one reader and report time and peak RSS"""
+    # Imported up front so every reader's peak RSS includes the same baseline
+    import openpyxl  # noqa: F401
+    import pandas as pd
+
+    start = time.perf_counter()
+    if reader == 'baseline (imports only)':
+        rows = 0
+    elif reader == 'pandas.read_excel':
+        rows = len(pd.read_excel(path, engine='openpyxl'))
+    elif reader == 'loaders.read_table':
+        from loaders import read_table
+        rows = len(read_table(path, 'xlsx'))
+    else:
+        from streaming_profile import profile_table
+        rows = profile_table(path, 'xlsx', chunk_rows=chunk_rows).rows
+    elapsed = time.perf_counter() - start
+
+    return {
+        'reader': reader,
+        'rows': rows,
+        'seconds': round(elapsed, 3),
+        'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Excel loading paths")
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--cols', type=int, default=12)
+    parser.add_argument('--chunk-rows', type=int, default=10_000,
+                        help="Chunk size for the streaming profile")
+    parser.add_argument('--workbook', help="Existing workbook to load instead of a generated one")
+    parser.add_argument('--json', help="Write results to this JSON file")
+    parser.add_argument('--run', choices=READERS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        print(json.dumps(run_reader(args.run, args.workbook, args.chunk_rows)))
+        return
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = args.workbook
+        if path is None:
+            path = os.path.join(temp_dir, 'bench.xlsx')
+            print(f"📝 Generating {args.rows} x {args.cols} workbook...")
+            create_workbook(path, args.rows, args.cols)
+        print(f"📦 Workbook size: {os.path.getsize(path) / 1024**2:.1f} MB")
+
+        results = []
+        for reader in READERS:
+            output = subprocess.run(
+                [sys.executable, __file__, '--run', reader, '--workbook', path,
+                 '--chunk-rows', str(args.chunk_rows)],
+                capture_output=True, text=True, check=True
+            )
+            result = json.loads(output.stdout.strip().splitlines()[-1])
+            results.append(result)
+            print(f"{reader:<35} {result['seconds']:>8.2f} s {result['peak_rss_mb']:>9.1f} MB")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'rows': args.rows, 'cols': args.cols, 'results': results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
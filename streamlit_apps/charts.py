@@ -0,0 +1,193 @@
+"""
+Bounded-payload Plotly charts for the ML Hub
+Histograms are drawn from counts binned on the server. Line charts above
+a point budget are downsampled per trace with Largest-Triangle-Three-Buckets
+(after a min-max pre-selection for very long series); scatters above the
+budget are aggregated into a 2-D density heatmap. Either way the figure
+sent to the browser stays a fixed size no matter how many rows the dataset
+has.
+"""
+
+import numpy as np
+import pandas as pd
+
+from lazy_imports import lazy_module
+from metrics import CHART_BUILD_SECONDS, timed
+
+px = lazy_module('plotly.express')
+go = lazy_module('plotly.graph_objects')
+
+# Points kept per line trace
+MAX_LINE_POINTS = 2_000
+
+# Points drawn as markers before a scatter becomes a density heatmap
+MAX_SCATTER_POINTS = 10_000
+
+# Min-max pre-selection runs when a trace is this many times over budget
+MINMAX_RATIO = 4
+
+DENSITY_BINS = 200
+
+# Trace-splitting arguments of px.line; each resulting trace is downsampled alone
+TRACE_ARGS = ('color', 'line_dash', 'line_group', 'symbol', 'facet_row', 'facet_col')
+
+
+def _numeric(values):
+    """Float view of x values (datetimes as ns, labels as positions)"""
+    values = pd.Series(values)
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values.to_numpy(dtype='datetime64[ns]').astype(np.int64).astype(np.float64)
+    if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+        return values.to_numpy(dtype=np.float64)
+    return np.arange(len(values), dtype=np.float64)
+
+
+def minmax_indices(y, n_buckets):
+    """Positions of the minimum and maximum of ``y`` in each of ``n_buckets``"""
+    n = len(y)
+    size = -(-n // n_buckets)
+    padded = np.full(size * n_buckets, np.nan)
+    padded[:n] = y
+    rows = padded.reshape(n_buckets, size)
+    valid = ~np.isnan(rows).all(axis=1)
+    offsets = np.arange(n_buckets)[valid] * size
+    rows = rows[valid]
+    indices = np.concatenate([
+        [0],
+        offsets + np.nanargmin(rows, axis=1),
+        offsets + np.nanargmax(rows, axis=1),
+        [n - 1],
+    ])
+    return np.unique(indices)
+
+
+def lttb_indices(x, y, n_out):
+    """Positions kept by Largest-Triangle-Three-Buckets downsampling
+
+    The first and last points are always kept; every bucket in between
+    contributes the point forming the largest triangle with the previously
+    kept point and the mean of the next bucket.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_hi = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[hi:next_hi].mean()
+        avg_y = y[hi:next_hi].mean()
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(area.argmax())
+        selected[i + 1] = a
+    return selected
+
+
+def downsample_indices(x, y, max_points=MAX_LINE_POINTS):
+    """Positions of at most ``max_points`` points that preserve the shape of a line"""
+    x = _numeric(x)
+    y = pd.Series(y).to_numpy(dtype=np.float64)
+    finite = np.flatnonzero(np.isfinite(x) & np.isfinite(y))
+    if len(finite) <= max_points:
+        return finite
+
+    if len(finite) > max_points * MINMAX_RATIO:
+        finite = finite[minmax_indices(y[finite], max_points * MINMAX_RATIO // 2)]
+    return finite[lttb_indices(x[finite], y[finite], max_points)]
+
+
+def line_points(x, y, max_points=MAX_LINE_POINTS):
+    """Downsampled ``x`` and ``y`` keyword arguments for ``go.Scatter``"""
+    x, y = pd.Series(x), pd.Series(y)
+    if len(x) <= max_points:
+        return {'x': x, 'y': y}
+    keep = downsample_indices(x, y, max_points)
+    return {'x': x.iloc[keep], 'y': y.iloc[keep]}
+
+
+@timed(CHART_BUILD_SECONDS, chart='line')
+def line(data_frame, x, y, max_points=MAX_LINE_POINTS, **kwargs):
+    """``px.line`` with every trace downsampled to ``max_points``"""
+    if len(data_frame) > max_points:
+        groups = [kwargs[arg] for arg in TRACE_ARGS if isinstance(kwargs.get(arg), str)]
+        traces = data_frame.groupby(groups, sort=False, observed=True) if groups else [(None, data_frame)]
+        data_frame = pd.concat(
+            [trace.iloc[downsample_indices(trace[x], trace[y], max_points)] for _, trace in traces],
+            ignore_index=True,
+        )
+    return px.line(data_frame, x=x, y=y, **kwargs)
+
+
+@timed(CHART_BUILD_SECONDS, chart='histogram')
+def histogram(counts, edges, title=None, label=None):
+    """Bar chart of pre-binned ``counts`` over bin ``edges``"""
+    fig = go.Figure(go.Bar(
+        x=(edges[:-1] + edges[1:]) / 2, y=counts, width=np.diff(edges),
+        hovertemplate='%{x}<br>count=%{y:,}<extra></extra>',
+    ))
+    fig.update_layout(title=title, xaxis_title=label, yaxis_title='count', bargap=0)
+    return fig
+
+
+def _density_heatmap(x, y, bins=DENSITY_BINS, title=None, x_title=None, y_title=None):
+    """Log-scaled 2-D histogram of ``x`` against ``y`` as a heatmap figure"""
+    x, y = pd.Series(x), pd.Series(y)
+    xs, ys = _numeric(x), y.to_numpy(dtype=np.float64)
+    finite = np.isfinite(xs) & np.isfinite(ys)
+    counts, x_edges, y_edges = np.histogram2d(xs[finite], ys[finite], bins=bins)
+
+    x_centers = (x_edges[:-1] + x_edges[1:]) / 2
+    if pd.api.types.is_datetime64_any_dtype(x):
+        x_centers = pd.to_datetime(x_centers.astype(np.int64))
+    with np.errstate(divide='ignore'):
+        z = np.where(counts > 0, np.log10(counts), np.nan).T
+
+    fig = go.Figure(go.Heatmap(
+        x=x_centers, y=(y_edges[:-1] + y_edges[1:]) / 2, z=z, customdata=counts.T,
+        colorscale='Viridis', colorbar=dict(title='log10(count)'),
+        hovertemplate='x=%{x}<br>y=%{y}<br>count=%{customdata:,}<extra></extra>',
+    ))
+    fig.update_layout(
+        title=f"{title} (density of {int(finite.sum()):,} points)" if title else None,
+        xaxis_title=x_title,
+        yaxis_title=y_title,
+    )
+    return fig
+
+
+@timed(CHART_BUILD_SECONDS, chart='scatter')
+def scatter(data_frame, x, y, max_points=MAX_SCATTER_POINTS, bins=DENSITY_BINS, **kwargs):
+    """``px.scatter``, or a density heatmap once there are more than ``max_points`` rows
+
+    The heatmap aggregates all rows, so per-point styling such as ``color``
+    is not drawn.
+    """
+    if len(data_frame) <= max_points:
+        return px.scatter(data_frame, x=x, y=y, **kwargs)
+    return _density_heatmap(data_frame[x], data_frame[y], bins=bins,
+                            title=kwargs.get('title'), x_title=x, y_title=y)
+
+
+def flame(sections, title=None):
+    """Flame chart of timed sections: one row per nesting depth, bars placed on the time axis
+
+    ``sections`` has ``Section``, ``Path``, ``Depth``, ``Start (ms)`` and
+    ``Duration (ms)`` columns, as returned by ``ProfileReport.sections()``.
+    """
+    fig = go.Figure(go.Bar(
+        base=sections['Start (ms)'], x=sections['Duration (ms)'], y=sections['Depth'],
+        orientation='h', text=sections['Section'], textposition='inside', insidetextanchor='start',
+        customdata=sections['Path'], marker=dict(color=sections['Depth'], colorscale='Sunsetdark'),
+        hovertemplate='%{customdata}<br>%{x:.1f} ms<extra></extra>',
+    ))
+    fig.update_layout(
+        title=title, xaxis_title='ms since rerun start', bargap=0.05,
+        yaxis=dict(autorange='reversed', tickmode='array', tickvals=sorted(sections['Depth'].unique()), title='depth'),
+        height=120 + 40 * (int(sections['Depth'].max()) + 1 if len(sections) else 1),
+        margin=dict(l=10, r=10, t=40 if title else 10, b=10),
+    )
+    return fig
@@ -0,0 +1,259 @@
+"""
+Columnar on-disk store for uploaded datasets
+Each dataset is written once as one ``.npy`` file per column under the
+cache directory and read back through memory maps, so every session (and
+every worker process) on the same upload shares the OS page cache instead
+of holding a private pandas copy.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import weakref
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from compact import compact_frame
+
+CACHE_DIR = Path(os.environ.get('ML_HUB_CACHE_DIR', Path(tempfile.gettempdir()) / 'dataweb-ml-hub'))
+STORE_DIR = CACHE_DIR / 'datasets'
+STORE_MAX_BYTES = int(os.environ.get('DATASET_STORE_MB', 2048)) * 1024**2
+# Datasets opened or read this recently are never pruned: another worker
+# process may still have them cached
+PRUNE_MIN_AGE = int(os.environ.get('DATASET_PRUNE_MIN_AGE', 900))
+# Reads refresh the manifest mtime at most this often (seconds)
+TOUCH_INTERVAL = 60
+
+MANIFEST = 'manifest.json'
+FORMAT_VERSION = 1
+
+# Datasets open in this process, whose directories must not be pruned
+_open_stores = weakref.WeakSet()
+
+
+def _column_kind(series):
+    dtype = series.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        return 'category'
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return 'datetime'
+    if pd.api.types.is_bool_dtype(dtype):
+        return 'bool'
+    if pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_extension_array_dtype(dtype):
+        return 'numeric'
+    return 'category'
+
+
+def _write_column(series, directory, index):
+    """Write one column and return its manifest entry"""
+    kind = _column_kind(series)
+    spec = {
+        'name': series.name,
+        'kind': kind,
+        'dtype': str(series.dtype),
+        'file': f'c{index:05d}.npy',
+        'nulls': int(series.isna().sum()),
+    }
+
+    if kind == 'category':
+        categorical = pd.Categorical(series)
+        np.save(directory / spec['file'], categorical.codes)
+        spec['categories'] = f'c{index:05d}.categories.json'
+        with open(directory / spec['categories'], 'w') as f:
+            json.dump(categorical.categories.tolist(), f, default=str)
+    elif kind == 'datetime':
+        tz = getattr(series.dt, 'tz', None)
+        values = series.dt.tz_convert('UTC').dt.tz_localize(None) if tz is not None else series
+        np.save(directory / spec['file'], values.to_numpy(dtype='datetime64[ns]').view(np.int64))
+        spec['tz'] = str(tz) if tz is not None else None
+    else:
+        np.save(directory / spec['file'], series.to_numpy())
+
+    return spec
+
+
+def write_store(frame, directory, metadata=None):
+    """Spill a DataFrame into ``directory`` as memory-mappable columns
+
+    The columns are written into a sibling temp directory which is renamed
+    into place, so a concurrent writer of the same dataset never exposes a
+    half-written store.
+    """
+    directory = Path(directory)
+    directory.parent.mkdir(parents=True, exist_ok=True)
+    staging = Path(tempfile.mkdtemp(prefix=f'.{directory.name}-', dir=directory.parent))
+
+    try:
+        columns = [_write_column(frame[name], staging, i) for i, name in enumerate(frame.columns)]
+        manifest = {
+            'version': FORMAT_VERSION,
+            'rows': len(frame),
+            'frame_memory_bytes': int(frame.memory_usage(deep=True).sum()),
+            'columns': columns,
+            'metadata': metadata or {},
+        }
+        with open(staging / MANIFEST, 'w') as f:
+            json.dump(manifest, f, default=str)
+        os.replace(staging, directory)
+    except OSError:
+        # Another session finished writing the same dataset first
+        if not (directory / MANIFEST).exists():
+            raise
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+    return directory
+
+
+class ColumnarDataset:
+    """Read-only view of a spilled dataset backed by memory maps"""
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        with open(self.directory / MANIFEST) as f:
+            manifest = json.load(f)
+        if manifest.get('version') != FORMAT_VERSION:
+            raise ValueError(f"Unsupported dataset store version in {self.directory}")
+
+        self.rows = manifest['rows']
+        self.frame_memory_bytes = manifest['frame_memory_bytes']
+        self.metadata = manifest.get('metadata', {})
+        self._specs = {spec['name']: spec for spec in manifest['columns']}
+        self.columns = [spec['name'] for spec in manifest['columns']]
+        self._categories = {}
+        self._lock = threading.Lock()
+        self._touched = time.time()
+        _open_stores.add(self)
+
+    def touch(self):
+        """Mark the dataset as in use, so no process prunes it for PRUNE_MIN_AGE"""
+        now = time.time()
+        try:
+            os.utime(self.directory / MANIFEST, (now, now))
+        except OSError:
+            pass
+        self._touched = now
+
+    @property
+    def dtypes(self):
+        return pd.Series({name: spec['dtype'] for name, spec in self._specs.items()})
+
+    @property
+    def null_counts(self):
+        return pd.Series({name: spec['nulls'] for name, spec in self._specs.items()})
+
+    @property
+    def numeric_columns(self):
+        return [name for name in self.columns if self._specs[name]['kind'] == 'numeric']
+
+    @property
+    def disk_bytes(self):
+        return sum(path.stat().st_size for path in self.directory.iterdir())
+
+    def _load_categories(self, name):
+        with self._lock:
+            if name not in self._categories:
+                with open(self.directory / self._specs[name]['categories']) as f:
+                    self._categories[name] = pd.Index(json.load(f))
+            return self._categories[name]
+
+    def column(self, name):
+        """Return one column as a Series over a read-only memory map"""
+        spec = self._specs[name]
+        if time.time() - self._touched > TOUCH_INTERVAL:
+            self.touch()
+        data = np.load(self.directory / spec['file'], mmap_mode='r')
+
+        if spec['kind'] == 'category':
+            # String columns come back as categoricals rather than Python objects
+            values = pd.Categorical.from_codes(data, categories=self._load_categories(name))
+        elif spec['kind'] == 'datetime':
+            values = data.view('datetime64[ns]')
+            if spec.get('tz'):
+                values = pd.DatetimeIndex(values).tz_localize('UTC').tz_convert(spec['tz'])
+        else:
+            values = data
+
+        return pd.Series(values, name=name, copy=False)
+
+    def select(self, columns, rows=None):
+        """Materialize a subset of columns (optionally the first ``rows`` rows)"""
+        data = {}
+        for name in columns:
+            series = self.column(name)
+            data[name] = series.iloc[:rows] if rows is not None else series
+        return pd.DataFrame(data, columns=list(columns))
+
+    def head(self, n=5):
+        return self.select(self.columns, rows=n)
+
+    def iter_blocks(self, columns, block_rows, dtype=np.float64):
+        """Yield ``(start, block)`` with ``block`` a 2-D array of up to ``block_rows`` rows
+
+        Only one block is materialized at a time; the rest stays mapped.
+        """
+        arrays = [self.column(name).to_numpy() for name in columns]
+        for start in range(0, self.rows, block_rows):
+            stop = min(start + block_rows, self.rows)
+            block = np.empty((stop - start, len(arrays)), dtype=dtype)
+            for i, values in enumerate(arrays):
+                block[:, i] = values[start:stop]
+            yield start, block
+
+
+def prune_store(max_bytes=STORE_MAX_BYTES, keep=None):
+    """Delete least recently used datasets until the store fits ``max_bytes``
+
+    Datasets open in this process or used within PRUNE_MIN_AGE are kept,
+    even if that leaves the store over budget.
+    """
+    if not STORE_DIR.exists():
+        return
+    in_use = {store.directory.name for store in list(_open_stores)}
+    cutoff = time.time() - PRUNE_MIN_AGE
+    entries = []
+    total = 0
+    for directory in STORE_DIR.iterdir():
+        manifest = directory / MANIFEST
+        if not manifest.exists():
+            continue
+        size = sum(path.stat().st_size for path in directory.iterdir())
+        total += size
+        mtime = manifest.stat().st_mtime
+        if directory.name != keep and directory.name not in in_use and mtime < cutoff:
+            entries.append((mtime, size, directory))
+
+    for _, size, directory in sorted(entries):
+        if total <= max_bytes:
+            break
+        shutil.rmtree(directory, ignore_errors=True)
+        total -= size
+
+
+def open_or_spill(key, load_frame, compact=False):
+    """Open the stored dataset for ``key``, spilling ``load_frame()`` on first use
+
+    With ``compact`` the frame goes through the dtype compaction pass before
+    it is written, and the per-column memory report is kept in the manifest.
+    """
+    if compact:
+        key = f'{key}-compact'
+    directory = STORE_DIR / key
+    if not (directory / MANIFEST).exists():
+        frame = load_frame()
+        metadata = {}
+        if compact:
+            frame, report = compact_frame(frame)
+            metadata['compaction'] = report.to_dict(orient='records')
+        write_store(frame, directory, metadata)
+        del frame
+        prune_store(keep=key)
+    else:
+        now = time.time()
+        os.utime(directory / MANIFEST, (now, now))
+    return ColumnarDataset(directory)
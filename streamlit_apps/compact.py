@@ -0,0 +1,88 @@
+"""
+Compact dtype pass for uploaded datasets
+Infers categoricals for low-cardinality strings, parses date-like string
+columns once, and downcasts numerics, reporting memory before and after.
+"""
+
+import warnings
+
+import numpy as np
+import pandas as pd
+
+# Share of distinct values under which a string column becomes categorical
+CATEGORY_RATIO = 0.5
+
+# Share of sampled values that must parse for a string column to become datetime
+DATE_PARSE_RATIO = 0.95
+DATE_SAMPLE_SIZE = 1000
+
+
+def _looks_like_dates(values):
+    sample = values.dropna()
+    if sample.empty:
+        return False
+    sample = sample.sample(min(len(sample), DATE_SAMPLE_SIZE), random_state=0).astype(str)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        parsed = pd.to_datetime(sample, errors='coerce')
+    return parsed.notna().mean() >= DATE_PARSE_RATIO
+
+
+def _compact_strings(series, category_ratio):
+    non_null = series.count()
+    if _looks_like_dates(series):
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            parsed = pd.to_datetime(series, errors='coerce')
+        # The format is inferred from the first value; keep strings if it did not fit the rest
+        if parsed.count() >= DATE_PARSE_RATIO * non_null:
+            return parsed
+    if non_null and series.nunique() / non_null <= category_ratio:
+        return series.astype('category')
+    return series
+
+
+def _compact_floats(series):
+    # Only when every value survives the round trip: large IDs and amounts must not be rounded
+    with np.errstate(over='ignore'):
+        downcast = series.astype(np.float32)
+    if np.array_equal(downcast.to_numpy(dtype=np.float64), series.to_numpy(dtype=np.float64), equal_nan=True):
+        return downcast
+    return series
+
+
+def compact_column(series, category_ratio=CATEGORY_RATIO):
+    """Return the smallest faithful representation of one column"""
+    dtype = series.dtype
+    if pd.api.types.is_bool_dtype(dtype) or isinstance(dtype, pd.CategoricalDtype):
+        return series
+    if pd.api.types.is_integer_dtype(dtype):
+        return pd.to_numeric(series, downcast='integer')
+    if pd.api.types.is_float_dtype(dtype):
+        return _compact_floats(series)
+    if pd.api.types.is_object_dtype(dtype) or pd.api.types.is_string_dtype(dtype):
+        return _compact_strings(series, category_ratio)
+    return series
+
+
+def compact_frame(frame, category_ratio=CATEGORY_RATIO):
+    """Compact every column of ``frame``
+
+    Returns the compacted frame and a report with one row per column
+    (dtype and deep memory before and after).
+    """
+    columns = {}
+    report = []
+    for name in frame.columns:
+        before = frame[name]
+        after = compact_column(before, category_ratio)
+        columns[name] = after
+        report.append({
+            'column': name,
+            'dtype_before': str(before.dtype),
+            'dtype_after': str(after.dtype),
+            'bytes_before': int(before.memory_usage(deep=True, index=False)),
+            'bytes_after': int(after.memory_usage(deep=True, index=False)),
+        })
+
+    return pd.DataFrame(columns, index=frame.index), pd.DataFrame(report)
@@ -0,0 +1,161 @@
+"""
+Incremental correlation engine for the ML Hub
+Accumulates pairwise-complete sufficient statistics (counts, sums, sums of
+squares and cross-products) block by block with matrix products, so the
+full frame is never materialized, appended rows only cost their own
+block, and any column subset of the matrix is read off the stored
+statistics without another pass over the data.
+"""
+
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Upper bound on the float64 block materialized per update
+BLOCK_BYTES = 64 * 1024**2
+
+# Columns shown in the heatmap by default on wide datasets
+HEATMAP_COLUMNS = 30
+
+
+class CorrelationAccumulator:
+    """Pairwise-complete Pearson correlation over rows added in blocks
+
+    Statistics for pair ``(i, j)`` only include rows where both columns are
+    present, matching ``DataFrame.corr()``. Values are shifted by a per
+    column offset (the first block's means unless given) to keep the sums
+    numerically stable.
+    """
+
+    def __init__(self, columns, shift=None):
+        self.columns = list(columns)
+        p = len(self.columns)
+        self.rows = 0
+        self.shift = None if shift is None else np.asarray(shift, dtype=np.float64)
+        self.counts = np.zeros((p, p))
+        # sums[i, j] is the sum of column i over rows where column j is present
+        self.sums = np.zeros((p, p))
+        self.squares = np.zeros((p, p))
+        self.cross = np.zeros((p, p))
+
+    def block_rows(self, block_bytes=BLOCK_BYTES):
+        """Rows per block so one float64 block stays under ``block_bytes``"""
+        return max(1, block_bytes // (8 * max(len(self.columns), 1)))
+
+    def update(self, block):
+        """Add a 2-D array of rows (NaN marks a missing value)"""
+        block = np.asarray(block, dtype=np.float64)
+        if not len(block):
+            return
+        if self.shift is None:
+            finite = np.isfinite(block)
+            present_rows = finite.sum(axis=0)
+            totals = np.where(finite, block, 0.0).sum(axis=0)
+            self.shift = np.divide(totals, present_rows, out=np.zeros(len(totals)), where=present_rows > 0)
+
+        values = block - self.shift
+        present = np.isfinite(values)
+        self.rows += len(block)
+
+        if present.all():
+            # Complete block: every pair sees every row, one Gram matrix is enough
+            column_sums = values.sum(axis=0)
+            column_squares = (values ** 2).sum(axis=0)
+            self.counts += len(block)
+            self.sums += column_sums[:, None]
+            self.squares += column_squares[:, None]
+            self.cross += values.T @ values
+            return
+
+        mask = present.astype(np.float64)
+        values = np.where(present, values, 0.0)
+        self.counts += mask.T @ mask
+        self.sums += values.T @ mask
+        self.squares += (values ** 2).T @ mask
+        self.cross += values.T @ values
+
+    def update_from(self, store, block_rows=None):
+        """Add the rows of a columnar store not seen yet, e.g. after an append"""
+        block_rows = block_rows or self.block_rows()
+        for start, block in store.iter_blocks(self.columns, block_rows):
+            if start + len(block) > self.rows:
+                self.update(block[max(self.rows - start, 0):])
+        return self
+
+    def _indices(self, columns):
+        if columns is None:
+            return np.arange(len(self.columns))
+        positions = {name: i for i, name in enumerate(self.columns)}
+        return np.array([positions[name] for name in columns], dtype=np.intp)
+
+    def _correlation(self, columns, min_periods=2):
+        """Column names, correlation array and pair counts for ``columns``"""
+        idx = self._indices(columns)
+        ix = np.ix_(idx, idx)
+        n = self.counts[ix]
+        sums = self.sums[ix]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cov = n * self.cross[ix] - sums * sums.T
+            var = n * self.squares[ix] - sums ** 2
+            corr = np.clip(cov / np.sqrt(var * var.T), -1.0, 1.0)
+        corr[n < min_periods] = np.nan
+        return [self.columns[i] for i in idx], corr, n
+
+    def matrix(self, columns=None, min_periods=2):
+        """Correlation matrix of ``columns`` (all by default) as a DataFrame"""
+        names, corr, _ = self._correlation(columns, min_periods)
+        return pd.DataFrame(corr, index=names, columns=names)
+
+    def top_pairs(self, k=20, columns=None):
+        """The ``k`` column pairs with the largest absolute correlation"""
+        names, corr, n = self._correlation(columns)
+        i, j = np.triu_indices(len(names), k=1)
+        pairs = pd.DataFrame({
+            'Column A': np.array(names, dtype=object)[i],
+            'Column B': np.array(names, dtype=object)[j],
+            'Correlation': corr[i, j],
+            'Rows': n[i, j].astype(np.int64),
+        }).dropna(subset=['Correlation'])
+        order = pairs['Correlation'].abs().sort_values(ascending=False, kind='stable').index
+        return pairs.loc[order].head(k).reset_index(drop=True)
+
+    def top_columns(self, k=HEATMAP_COLUMNS):
+        """The ``k`` columns with the strongest correlation to any other column"""
+        _, corr, _ = self._correlation(None)
+        strength = np.abs(corr)
+        np.fill_diagonal(strength, np.nan)
+        strength = np.where(np.isnan(strength), -1.0, strength).max(axis=1)
+        order = np.argsort(-strength, kind='stable')[:k]
+        return [self.columns[i] for i in sorted(order)]
+
+    def save(self, path):
+        """Write the statistics atomically to an ``.npz`` file"""
+        path = Path(path)
+        fd, staging = tempfile.mkstemp(prefix='.correlation-', suffix='.npz', dir=path.parent)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(f, columns=np.array(self.columns, dtype=str), rows=self.rows,
+                         shift=self.shift if self.shift is not None else np.zeros(len(self.columns)),
+                         counts=self.counts, sums=self.sums, squares=self.squares, cross=self.cross)
+            os.replace(staging, path)
+        finally:
+            if os.path.exists(staging):
+                os.remove(staging)
+
+    @classmethod
+    def load(cls, path, columns):
+        """Statistics saved for exactly ``columns``, or None"""
+        try:
+            with np.load(path) as data:
+                if data['columns'].tolist() != [str(name) for name in columns]:
+                    return None
+                accumulator = cls(columns, shift=data['shift'])
+                accumulator.rows = int(data['rows'])
+                for name in ('counts', 'sums', 'squares', 'cross'):
+                    setattr(accumulator, name, data[name])
+                return accumulator
+        except (OSError, KeyError, ValueError):
+            return None
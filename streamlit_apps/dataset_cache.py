@@ -0,0 +1,332 @@
+"""
+Content-addressed dataset cache for the ML Hub
+Parsed uploads are keyed by a hash of their bytes and kept in a
+size-bounded LRU, so Streamlit reruns reuse the parsed frame and its
+profile instead of parsing the upload again on every widget change.
+"""
+
+import hashlib
+import os
+import sys
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from correlation import CorrelationAccumulator
+from metrics import REGISTRY
+from sketches import ColumnSketch
+
+DEFAULT_MAX_BYTES = int(os.environ.get('DATASET_CACHE_MB', 256)) * 1024**2
+DEFAULT_MAX_ENTRIES = 64
+
+# Budget for the statistics memoized per dataset (describe, sketches, histograms)
+MEMO_MAX_BYTES = int(os.environ.get('DATASET_MEMO_MB', 32)) * 1024**2
+
+# Rows processed per step when scanning a memory-mapped column
+BLOCK_ROWS = 1_000_000
+
+CORRELATION_FILE = 'correlation.npz'
+
+
+def content_hash(data):
+    """Hex digest of an upload's bytes (bytes, bytearray or memoryview)"""
+    return hashlib.blake2b(data, digest_size=20).hexdigest()
+
+
+def upload_key(uploaded_file, memo):
+    """Content hash of a Streamlit upload, hashed once per uploaded file
+
+    ``memo`` is a per-session mapping (e.g. ``st.session_state``) so reruns
+    with the same upload skip re-hashing the bytes.
+    """
+    hashes = memo.setdefault('upload_hashes', {})
+    file_id = getattr(uploaded_file, 'file_id', None) or (uploaded_file.name, uploaded_file.size)
+    if file_id not in hashes:
+        hashes[file_id] = content_hash(uploaded_file.getbuffer())
+    return hashes[file_id]
+
+
+def estimate_nbytes(value, _seen=None):
+    """Approximate memory held by a cached value
+
+    Frames and arrays count their buffers, containers their items, and
+    other objects (fitted models, sketches) their attributes, walked the
+    same way; nothing is serialized.
+    """
+    seen = set() if _seen is None else _seen
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, (pd.Series, pd.Index)):
+        return int(value.memory_usage(deep=True))
+    if hasattr(value, 'nbytes'):
+        return int(value.nbytes)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            estimate_nbytes(k, seen) + estimate_nbytes(v, seen) for k, v in value.items()
+        )
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sys.getsizeof(value) + sum(estimate_nbytes(item, seen) for item in value)
+    attributes = getattr(value, '__dict__', None)
+    if isinstance(attributes, dict):
+        return sys.getsizeof(value) + estimate_nbytes(attributes, seen)
+    return sys.getsizeof(value)
+
+
+class KeyedLocks:
+    """One lock per key, dropped once no thread holds or waits for it"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # key: [lock, threads holding or waiting for it]
+        self._locks = {}
+
+    def __len__(self):
+        with self._lock:
+            return len(self._locks)
+
+    @contextmanager
+    def hold(self, key):
+        with self._lock:
+            entry = self._locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self._locks[key]
+
+
+def histogram(values, bins, block_rows=BLOCK_ROWS):
+    """Counts and edges of ``bins`` equal-width bins over the finite ``values``
+
+    ``values`` may be a memory-mapped array; it is binned in blocks so only
+    one block is materialized at a time.
+    """
+    lo, hi = np.inf, -np.inf
+    for start in range(0, len(values), block_rows):
+        block = values[start:start + block_rows].astype(np.float64)
+        block = block[np.isfinite(block)]
+        if len(block):
+            lo, hi = min(lo, block.min()), max(hi, block.max())
+    if lo > hi:
+        lo, hi = 0.0, 1.0
+
+    counts = np.zeros(bins, dtype=np.int64)
+    for start in range(0, len(values), block_rows):
+        block = values[start:start + block_rows].astype(np.float64)
+        counts += np.histogram(block[np.isfinite(block)], bins=bins, range=(lo, hi))[0]
+    return counts, np.histogram_bin_edges([], bins=bins, range=(lo, hi))
+
+
+class CachedDataset:
+    """Spilled dataset plus the profile computed once at load time
+
+    Columns are read on demand from the memory-mapped store, so sessions
+    on the same upload share pages rather than private DataFrame copies.
+    Statistics computed later are memoized in an LRU of ``memo_max_bytes``.
+    """
+
+    def __init__(self, store, memo_max_bytes=MEMO_MAX_BYTES):
+        self.store = store
+        self.rows = store.rows
+        self.columns = store.columns
+        self.memory_bytes = store.frame_memory_bytes
+        self.disk_bytes = store.disk_bytes
+        self.missing_values = int(store.null_counts.sum())
+        self.dtype_counts = store.dtypes.value_counts()
+        self.numeric_columns = store.numeric_columns
+        self.compaction = (
+            pd.DataFrame(store.metadata['compaction']) if 'compaction' in store.metadata else None
+        )
+        self.memo_max_bytes = memo_max_bytes
+        self.memo_bytes = 0
+        self._lock = threading.Lock()
+        self._memo = OrderedDict()
+        self._computing = KeyedLocks()
+
+    @property
+    def nbytes(self):
+        # The memo fills after the dataset is cached, so its budget is counted up front
+        return self.disk_bytes + self.memo_max_bytes
+
+    def _cached(self, key):
+        with self._lock:
+            if key not in self._memo:
+                return None
+            self._memo.move_to_end(key)
+            return self._memo[key]
+
+    def _memoize(self, key, compute):
+        """``compute()`` once per key; other keys are served while it runs"""
+        cached = self._cached(key)
+        if cached is not None:
+            return cached[0]
+        with self._computing.hold(key):
+            cached = self._cached(key)
+            if cached is not None:
+                return cached[0]
+            value = compute()
+            nbytes = estimate_nbytes(value)
+            with self._lock:
+                self._memo[key] = (value, nbytes)
+                self.memo_bytes += nbytes
+                while len(self._memo) > 1 and self.memo_bytes > self.memo_max_bytes:
+                    _, (_, evicted_bytes) = self._memo.popitem(last=False)
+                    self.memo_bytes -= evicted_bytes
+            return value
+
+    def head(self, n=5):
+        return self.store.head(n)
+
+    def column(self, name):
+        return self.store.column(name)
+
+    def describe(self, column):
+        if column not in self.numeric_columns:
+            return self.sketch(column).describe(column)
+        return self._memoize(('describe', column), lambda: self.column(column).describe())
+
+    def sketch(self, column):
+        """Top-value and distinct-count sketch of a non-numeric column, in one pass"""
+        def build():
+            values = self.column(column)
+            sketch = ColumnSketch()
+            for start in range(0, len(values), BLOCK_ROWS):
+                sketch.update(values.iloc[start:start + BLOCK_ROWS].dropna())
+            return sketch
+        return self._memoize(('sketch', column), build)
+
+    def histogram(self, column, bins):
+        return self._memoize(
+            ('histogram', column, bins), lambda: histogram(self.column(column).to_numpy(), bins)
+        )
+
+    def correlation(self):
+        """Correlation statistics of the numeric columns, persisted beside the store
+
+        Saved statistics cover the rows seen so far, so rows appended to the
+        store later are the only ones read again.
+        """
+        def build():
+            path = self.store.directory / CORRELATION_FILE
+            accumulator = CorrelationAccumulator.load(path, self.numeric_columns)
+            if accumulator is None or accumulator.rows > self.store.rows:
+                accumulator = CorrelationAccumulator(self.numeric_columns)
+            if accumulator.rows < self.store.rows:
+                accumulator.update_from(self.store)
+                try:
+                    accumulator.save(path)
+                except OSError:
+                    pass
+            return accumulator
+        return self._memoize(('correlation',), build)
+
+
+class DatasetCache:
+    """Thread-safe LRU of loaded datasets bounded by footprint and entry count"""
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._loading = KeyedLocks()
+
+    def _lookup(self, key):
+        # Callers hold self._lock
+        if key not in self._entries:
+            return None
+        self._entries.move_to_end(key)
+        return self._entries[key][0]
+
+    def get(self, key):
+        with self._lock:
+            return self._lookup(key)
+
+    def put(self, key, value, nbytes=None):
+        """Insert an entry and evict least recently used ones over the budget
+
+        The newest entry is always kept, even if it alone exceeds the budget.
+        """
+        if nbytes is None:
+            nbytes = estimate_nbytes(value)
+        with self._lock:
+            if key in self._entries:
+                self.current_bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (value, nbytes)
+            self.current_bytes += nbytes
+            while len(self._entries) > 1 and (
+                self.current_bytes > self.max_bytes or len(self._entries) > self.max_entries
+            ):
+                _, (_, evicted_bytes) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_bytes
+
+    def get_or_load(self, key, loader):
+        """Return the cached value for ``key``, calling ``loader()`` once on a miss
+
+        Concurrent sessions asking for the same key wait for a single load.
+        The key's lock is dropped once no session is waiting on it.
+        """
+        with self._lock:
+            value = self._lookup(key)
+            if value is not None:
+                self.hits += 1
+                return value
+
+        with self._loading.hold(key):
+            with self._lock:
+                value = self._lookup(key)
+                if value is not None:
+                    self.hits += 1
+                    return value
+                self.misses += 1
+            value = loader()
+            self.put(key, value)
+            return value
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+
+_dataset_cache = None
+_dataset_cache_lock = threading.Lock()
+
+
+def get_dataset_cache():
+    """Process-wide cache shared by all Streamlit sessions"""
+    global _dataset_cache
+    with _dataset_cache_lock:
+        if _dataset_cache is None:
+            _dataset_cache = DatasetCache()
+        return _dataset_cache
+
+
+def _cache_stat(name):
+    return lambda: get_dataset_cache().stats()[name]
+
+
+REGISTRY.callback('ml_hub_dataset_cache_hits_total', "Dataset cache lookups served from memory",
+                  _cache_stat('hits'), kind='counter')
+REGISTRY.callback('ml_hub_dataset_cache_misses_total', "Dataset cache lookups that ran the loader",
+                  _cache_stat('misses'), kind='counter')
+REGISTRY.callback('ml_hub_dataset_cache_bytes', "Bytes held by the dataset cache", _cache_stat('bytes'))
+REGISTRY.callback('ml_hub_dataset_cache_entries', "Entries held by the dataset cache", _cache_stat('entries'))
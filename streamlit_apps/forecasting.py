@@ -0,0 +1,279 @@
+"""
+Forecasting engine for the Predictive Models page
+Fits additive Holt-Winters exponential smoothing to many series at once.
+Series are pivoted into a (series x periods) panel and the smoothing
+recursion runs over periods with every series, and every candidate
+smoothing parameter set, updated in one vectorized step. Seasonal starting
+values come from a classical seasonal decomposition.
+"""
+
+import itertools
+import time
+
+import numpy as np
+import pandas as pd
+
+from metrics import MODEL_TRAINING_SECONDS, timed
+
+# Candidate smoothing parameters; each series keeps the combination with the
+# lowest one-step-ahead squared error
+ALPHAS = (0.05, 0.1, 0.2, 0.3, 0.5, 0.7)
+BETAS = (0.0, 0.01, 0.05, 0.1)
+GAMMAS = (0.0, 0.05, 0.1, 0.3)
+
+# Series fitted together; bounds the (series x candidates x season) state
+SERIES_BLOCK = 2_000
+
+SEASON_LENGTHS = {'D': 7, 'W': 52, 'MS': 12}
+
+
+def parameter_grid(seasonal=True):
+    """Admissible (alpha, beta, gamma) candidates as three aligned arrays"""
+    gammas = GAMMAS if seasonal else (0.0,)
+    grid = [
+        (alpha, beta, gamma)
+        for alpha, beta, gamma in itertools.product(ALPHAS, BETAS, gammas)
+        if beta <= alpha and gamma <= 1 - alpha
+    ]
+    return tuple(np.array(values) for values in zip(*grid))
+
+
+def build_panel(dates, series_ids, values, freq='MS'):
+    """Aggregate long-format observations into a (series x periods) panel
+
+    Values are summed per series and period; periods without observations
+    are zero, as for SKU sales.
+    """
+    frame = pd.DataFrame({
+        'date': pd.to_datetime(dates, errors='coerce'),
+        'series': np.asarray(series_ids).astype(str),
+        'value': pd.to_numeric(values, errors='coerce'),
+    }).dropna()
+    if frame.empty:
+        raise ValueError("No rows with a valid date and numeric value")
+
+    totals = frame.groupby(['series', pd.Grouper(key='date', freq=freq)])['value'].sum()
+    periods = totals.index.get_level_values('date')
+    index = pd.date_range(periods.min(), periods.max(), freq=freq)
+    return totals.unstack(fill_value=0.0).reindex(columns=index, fill_value=0.0)
+
+
+def decompose(values, period):
+    """Classical additive decomposition of each row of ``values``
+
+    Returns ``(trend, seasonal, residual)`` arrays shaped like ``values``.
+    The trend is a centered moving average (2 x ``period`` for even
+    periods), so it is NaN for half a season at either end.
+    """
+    values = np.atleast_2d(np.asarray(values, dtype=np.float64))
+    n_periods = values.shape[1]
+    if period % 2:
+        weights = np.full(period, 1 / period)
+    else:
+        weights = np.r_[0.5, np.ones(period - 1), 0.5] / period
+    width = len(weights)
+
+    trend = np.full_like(values, np.nan)
+    if n_periods >= width:
+        windows = np.lib.stride_tricks.sliding_window_view(values, width, axis=1)
+        trend[:, width // 2:n_periods - width // 2] = windows @ weights
+
+    detrended = values - trend
+    phases = np.arange(n_periods) % period
+    indices = np.full((values.shape[0], period), np.nan)
+    for phase in range(period):
+        column = detrended[:, phases == phase]
+        if np.isfinite(column).any():
+            indices[:, phase] = np.nanmean(column, axis=1)
+    indices = np.nan_to_num(indices - np.nanmean(indices, axis=1, keepdims=True))
+
+    seasonal = indices[:, phases]
+    return trend, seasonal, values - trend - seasonal
+
+
+def _initial_states(values, period):
+    """Level, trend and seasonal starting values from the first two seasons"""
+    if period > 1:
+        _, seasonal, _ = decompose(values, period)
+        season = seasonal[:, :period]
+    else:
+        season = np.zeros((len(values), 1))
+    adjusted = values[:, :2 * period] - np.tile(season, 2)
+    level = adjusted[:, :period].mean(axis=1)
+    trend = (adjusted[:, period:].mean(axis=1) - level) / period
+    return level, trend, season
+
+
+def _smooth(values, alpha, beta, gamma, level, trend, season, fitted=False):
+    """Run the additive Holt-Winters recursion for every series and candidate
+
+    Parameters broadcast against states shaped ``(series, candidates)``;
+    ``season`` is ``(series, candidates, period)``. Returns the summed
+    squared and absolute one-step errors, the final states and, when
+    ``fitted`` is set, the one-step-ahead predictions.
+    """
+    n_series, n_periods = values.shape
+    period = season.shape[-1]
+    sq_error = np.zeros(level.shape)
+    abs_error = np.zeros(level.shape)
+    predictions = np.empty(level.shape + (n_periods,)) if fitted else None
+
+    for t in range(n_periods):
+        phase = t % period
+        forecast = level + trend + season[..., phase]
+        error = values[:, t, None] - forecast
+        sq_error += error ** 2
+        abs_error += np.abs(error)
+        if fitted:
+            predictions[..., t] = forecast
+        level = level + trend + alpha * error
+        trend = trend + beta * error
+        season[..., phase] += gamma * error
+
+    return sq_error, abs_error, level, trend, season, predictions
+
+
+class ForecastModel:
+    """Fitted Holt-Winters states and parameters for a panel of series
+
+    Forecasts are computed from the stored final states, so any horizon can
+    be drawn without refitting.
+    """
+
+    def __init__(self, series, periods, freq, period, values, params, states, fitted, fit_seconds):
+        self.series = series
+        self.periods = periods
+        self.freq = freq
+        self.period = period
+        self.values = values
+        self.alpha, self.beta, self.gamma = params
+        self.level, self.trend, self.season = states
+        self.fitted = fitted
+        self.fit_seconds = fit_seconds
+
+    @property
+    def n_series(self):
+        return len(self.series)
+
+    def forecast(self, horizon):
+        """``(series x horizon)`` forecasts following the last period"""
+        steps = np.arange(1, horizon + 1)
+        phases = (len(self.periods) + steps - 1) % self.period
+        return self.level[:, None] + self.trend[:, None] * steps + self.season[:, phases]
+
+    def future_periods(self, horizon):
+        return pd.date_range(self.periods[-1], periods=horizon + 1, freq=self.freq)[1:]
+
+    def parameters(self):
+        """Per-series smoothing parameters and in-sample accuracy"""
+        errors = np.abs(self.values - self.fitted)
+        totals = np.abs(self.values).sum(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            wape = np.where(totals > 0, errors.sum(axis=1) / totals, np.nan)
+        return pd.DataFrame({
+            'Series': self.series,
+            'alpha': self.alpha,
+            'beta': self.beta,
+            'gamma': self.gamma,
+            'MAE': errors.mean(axis=1),
+            'WAPE': wape,
+            'Total': self.values.sum(axis=1),
+        })
+
+    def series_frame(self, series, horizon):
+        """Historical, fitted and forecast values of one series for plotting"""
+        row = self.series.get_loc(series)
+        return pd.concat([
+            pd.DataFrame({'Date': self.periods, 'Value': self.values[row], 'Type': 'Historical'}),
+            pd.DataFrame({'Date': self.periods, 'Value': self.fitted[row], 'Type': 'Fitted'}),
+            pd.DataFrame({'Date': self.future_periods(horizon), 'Value': self.forecast(horizon)[row],
+                          'Type': 'Forecast'}),
+        ], ignore_index=True)
+
+    def components(self, series):
+        """Trend, seasonal and residual components of one series"""
+        row = self.series.get_loc(series)
+        trend, seasonal, residual = decompose(self.values[row], max(self.period, 2))
+        return pd.DataFrame({
+            'Date': self.periods,
+            'Observed': self.values[row],
+            'Trend': trend[0],
+            'Seasonal': seasonal[0],
+            'Residual': residual[0],
+        })
+
+
+@timed(MODEL_TRAINING_SECONDS, model='holt-winters')
+def fit_panel(panel, freq='MS', period=None, series_block=SERIES_BLOCK):
+    """Fit Holt-Winters to every row of a ``build_panel`` result
+
+    Seasonality is dropped (Holt's linear trend) when the panel is shorter
+    than two seasons.
+    """
+    start_time = time.perf_counter()
+    values = panel.to_numpy(dtype=np.float64)
+    n_series, n_periods = values.shape
+    period = period or SEASON_LENGTHS.get(freq, 1)
+    if n_periods < 2 * period:
+        period = 1
+    if n_periods < 3:
+        raise ValueError("Need at least 3 periods to fit a forecast")
+
+    alphas, betas, gammas = parameter_grid(seasonal=period > 1)
+    params = np.empty((3, n_series))
+    level = np.empty(n_series)
+    trend = np.empty(n_series)
+    season = np.empty((n_series, period))
+    fitted = np.empty_like(values)
+
+    for start in range(0, n_series, series_block):
+        block = values[start:start + series_block]
+        rows = slice(start, start + len(block))
+        level0, trend0, season0 = _initial_states(block, period)
+
+        # Grid pass: every candidate for every series, keep the errors only
+        candidates = len(alphas)
+        sq_error, *_ = _smooth(
+            block, alphas, betas, gammas,
+            np.repeat(level0[:, None], candidates, axis=1),
+            np.repeat(trend0[:, None], candidates, axis=1),
+            np.repeat(season0[:, None, :], candidates, axis=1),
+        )
+        best = sq_error.argmin(axis=1)
+        params[:, rows] = alphas[best], betas[best], gammas[best]
+
+        # Final pass with each series' chosen parameters for states and fit
+        _, _, block_level, block_trend, block_season, predictions = _smooth(
+            block, alphas[best, None], betas[best, None], gammas[best, None],
+            level0[:, None], trend0[:, None], season0[:, None, :].copy(), fitted=True,
+        )
+        level[rows] = block_level[:, 0]
+        trend[rows] = block_trend[:, 0]
+        season[rows] = block_season[:, 0]
+        fitted[rows] = predictions[:, 0]
+
+    return ForecastModel(
+        panel.index, panel.columns, freq, period, values, tuple(params),
+        (level, trend, season), fitted, time.perf_counter() - start_time,
+    )
+
+
+def sample_sku_sales(n_series=1_000, start='2020-01-01', periods=48, freq='MS', random_state=42):
+    """Synthetic long-format SKU sales used when no file is uploaded"""
+    rng = np.random.default_rng(random_state)
+    dates = pd.date_range(start=start, periods=periods, freq=freq)
+    period = SEASON_LENGTHS.get(freq, 12)
+    t = np.arange(periods)
+
+    base = rng.lognormal(4, 1, (n_series, 1))
+    growth = rng.normal(0.005, 0.01, (n_series, 1))
+    amplitude = rng.uniform(0, 0.4, (n_series, 1))
+    phase = rng.uniform(0, 2 * np.pi, (n_series, 1))
+    mean = base * (1 + growth * t) * (1 + amplitude * np.sin(2 * np.pi * t / period + phase))
+    sales = rng.poisson(np.clip(mean, 0, None))
+
+    return pd.DataFrame({
+        'Date': np.tile(dates, n_series),
+        'SKU': np.repeat([f'SKU-{i:05d}' for i in range(n_series)], periods),
+        'Sales': sales.ravel(),
+    })
@@ -0,0 +1,262 @@
+"""
+Health probes for the ML Hub
+A background thread runs the readiness checks (Streamlit answers on its
+port, model-cache warmness, memory headroom) every few seconds and renders
+the responses once, so the threaded probe server only writes cached bytes
+and a slow check never blocks a probe.
+
+GET /health        liveness, for the platform's restart probe: same as /health/live
+GET /health/live   200 while the process and its monitor thread are running
+GET /health/ready  200 when every check passes, 503 otherwise (JSON detail)
+GET /metrics       Prometheus text format (see the metrics module)
+"""
+
+import json
+import os
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from metrics import CONTENT_TYPE, REGISTRY
+from model_registry import get_model_registry
+from training import CLASSIFIER_NAME, CLASSIFIER_PARAMS
+
+CHECK_INTERVAL = float(os.environ.get('HEALTH_CHECK_INTERVAL', 2))
+PROBE_TIMEOUT = 1
+
+# Not ready below this much free memory
+MIN_FREE_MB = int(os.environ.get('HEALTH_MIN_FREE_MB', 64))
+
+# cgroup v2, then v1: (limit, usage, stat file, inactive page cache field)
+CGROUP_MEMORY_FILES = [
+    ('/sys/fs/cgroup/memory.max', '/sys/fs/cgroup/memory.current',
+     '/sys/fs/cgroup/memory.stat', 'inactive_file'),
+    ('/sys/fs/cgroup/memory/memory.limit_in_bytes', '/sys/fs/cgroup/memory/memory.usage_in_bytes',
+     '/sys/fs/cgroup/memory/memory.stat', 'total_inactive_file'),
+]
+
+
+def rss_bytes():
+    """Resident set size of this process"""
+    try:
+        pages = int(Path('/proc/self/statm').read_text().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        import resource
+        # ru_maxrss is in kilobytes on Linux: a peak, but better than nothing
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+_started = time.monotonic()
+
+REGISTRY.callback('process_resident_memory_bytes', "Resident memory size in bytes", rss_bytes)
+REGISTRY.callback('process_uptime_seconds', "Seconds since this process started",
+                  lambda: round(time.monotonic() - _started, 1))
+
+
+def _meminfo():
+    fields = {}
+    for line in Path('/proc/meminfo').read_text().splitlines():
+        name, _, value = line.partition(':')
+        fields[name] = int(value.split()[0]) * 1024
+    return fields['MemTotal'], fields['MemTotal'] - fields['MemAvailable']
+
+
+def _inactive_file(stat_file, field):
+    try:
+        for line in Path(stat_file).read_text().splitlines():
+            name, _, value = line.partition(' ')
+            if name == field:
+                return int(value)
+    except (OSError, ValueError):
+        pass
+    return 0
+
+
+def memory_limit_and_usage():
+    """Bytes allowed and working set used by this container, or by the host without a cgroup limit
+
+    The cgroup usage counts page cache, which the memory-mapped dataset
+    store fills on purpose; inactive file pages are reclaimable, so they are
+    subtracted as the kubelet does for its working-set figure. The host
+    figure (MemTotal - MemAvailable) already leaves reclaimable cache out.
+    """
+    host_total, host_used = _meminfo()
+    for limit_file, usage_file, stat_file, inactive_field in CGROUP_MEMORY_FILES:
+        try:
+            limit = Path(limit_file).read_text().strip()
+            usage = int(Path(usage_file).read_text())
+        except (OSError, ValueError):
+            continue
+        # "max" or a huge v1 sentinel means no limit
+        if limit != 'max' and int(limit) < host_total:
+            return int(limit), max(0, usage - _inactive_file(stat_file, inactive_field))
+    return host_total, host_used
+
+
+def memory_check(min_free_mb=MIN_FREE_MB):
+    limit, used = memory_limit_and_usage()
+    free_mb = (limit - used) / 1024**2
+    return {
+        'ok': free_mb >= min_free_mb,
+        'rss_mb': round(rss_bytes() / 1024**2, 1),
+        'used_mb': round(used / 1024**2, 1),
+        'limit_mb': round(limit / 1024**2, 1),
+        'free_mb': round(free_mb, 1),
+    }
+
+
+def model_check():
+    """Whether the churn model is in the registry, so predictions skip training
+
+    Reported but not required: a cold registry trains on first use.
+    """
+    return {'ok': True, 'warm': get_model_registry().is_warm(CLASSIFIER_NAME, CLASSIFIER_PARAMS)}
+
+
+def streamlit_check(ports, base_url_path='ml'):
+    """Probe Streamlit's own health endpoint on each port; ready if any answers"""
+    path = f"/{base_url_path.strip('/')}/_stcore/health" if base_url_path.strip('/') else '/_stcore/health'
+    results = {}
+    for port in ports:
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}{path}", timeout=PROBE_TIMEOUT) as response:
+                up = response.status == 200
+        except OSError:
+            up = False
+        results[str(port)] = {'up': up, 'ms': round((time.perf_counter() - start) * 1000, 1)}
+    return {'ok': any(result['up'] for result in results.values()), 'ports': results}
+
+
+class HealthMonitor:
+    """Runs ``checks`` in a background thread and caches the probe responses
+
+    ``checks`` maps a name to a callable returning a dict with an ``ok`` key.
+    The thread runs from ``start()`` until ``stop()``.
+    """
+
+    def __init__(self, checks, interval=CHECK_INTERVAL):
+        self.checks = checks
+        self.interval = interval
+        self.updated = None
+        self.status = {}
+        self.ready = False
+        self.responses = {}
+        self._stopped = threading.Event()
+        self.refresh()
+
+    def start(self):
+        threading.Thread(target=self._run, name='ml-hub-health', daemon=True).start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+
+    def refresh(self):
+        start = time.perf_counter()
+        results = {}
+        for name, check in self.checks.items():
+            try:
+                results[name] = check()
+            except Exception as e:
+                results[name] = {'ok': False, 'error': str(e)}
+        ready = all(result['ok'] for result in results.values())
+        status = {
+            'ready': ready,
+            'checks': results,
+            'checked_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'check_ms': round((time.perf_counter() - start) * 1000, 1),
+        }
+        ready_code = 200 if ready else 503
+        # Swap in the rendered responses at once; handlers only read them
+        self.responses = {
+            '/health/ready': (ready_code, 'application/json', json.dumps(status).encode()),
+        }
+        self.status = status
+        self.ready = ready
+        self.updated = time.monotonic()
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self.refresh()
+
+    @property
+    def live(self):
+        """The monitor thread has refreshed recently, so the process is not hung"""
+        return time.monotonic() - self.updated < max(3 * self.interval, 10)
+
+    def response(self, path):
+        # Failing readiness checks must not get the process restarted
+        if path in ('/health', '/health/live'):
+            live = self.live
+            return (200 if live else 503), 'text/plain', b'OK' if live else b'STALE'
+        return self.responses.get(path)
+
+
+class HealthHandler(BaseHTTPRequestHandler):
+    monitor = None
+
+    def _send(self, status, content_type, body):
+        self.send_response(status)
+        self.send_header('Content-type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def metrics(self):
+        """Body of /metrics: rendered per scrape, unlike the cached probes"""
+        return REGISTRY.render()
+
+    def do_GET(self):
+        if self.path == '/metrics':
+            self._send(200, CONTENT_TYPE, self.metrics())
+            return
+        response = self.monitor.response(self.path.split('?')[0])
+        if response is None:
+            self.send_response(404)
+            self.end_headers()
+            return
+        self._send(*response)
+
+    def log_message(self, format, *args):
+        # Probes arrive every few seconds; keep them out of the app log
+        pass
+
+
+def create_health_server(port, monitor, handler=HealthHandler, host='0.0.0.0'):
+    handler.monitor = monitor
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+_health_server = None
+_health_server_lock = threading.Lock()
+
+
+def start_health_server(port, checks, handler=HealthHandler):
+    """Serve the probes on ``port`` from a daemon thread, once per process
+
+    Returns None if the port is taken; later calls do not retry.
+    """
+    global _health_server
+    with _health_server_lock:
+        if _health_server is None:
+            monitor = HealthMonitor(checks)
+            try:
+                # Bind before the monitor thread starts, so a taken port leaves no thread behind
+                _health_server = create_health_server(port, monitor, handler)
+            except OSError as e:
+                monitor.stop()
+                print(f"Health check server error: {e}")
+                _health_server = False
+                return None
+            monitor.start()
+            threading.Thread(target=_health_server.serve_forever, name='ml-hub-health-server',
+                             daemon=True).start()
+            print(f"Health check server running on port {port}")
+        return _health_server or None
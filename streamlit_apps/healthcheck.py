@@ -2,61 +2,63 @@
 """
 Health check endpoint for ML Hub service
 This file provides a simple HTTP endpoint that DigitalOcean can use for health checks
+and launches the Streamlit workers (ML_HUB_WORKERS, default 1) under a supervisor.
+The probes (/health, /health/live, /health/ready) are served by the health
+module; /health/workers lists every worker's state as JSON and /metrics merges the
+workers' metrics.
 """
 
-import http.server
-import socketserver
+import json
 import os
-import sys
-import subprocess
 import threading
-import time
 
-class HealthCheckHandler(http.server.BaseHTTPRequestHandler):
+from health import HealthHandler, memory_check, model_check, start_health_server, streamlit_check
+from supervisor import BASE_URL_PATH, Supervisor, run_workers
+
+class HealthCheckHandler(HealthHandler):
+    supervisor = None
+
+    def metrics(self):
+        if self.supervisor is None:
+            return super().metrics()
+        return self.supervisor.metrics()
+
     def do_GET(self):
-        if self.path == '/health':
-            self.send_response(200)
-            self.send_header('Content-type', 'text/plain')
-            self.end_headers()
-            self.wfile.write(b'OK')
+        if self.path == '/health/workers' and self.supervisor is not None:
+            self._send(200, 'application/json', json.dumps(self.supervisor.status()).encode())
         else:
-            self.send_response(404)
-            self.end_headers()
+            super().do_GET()
 
-def run_health_check_server():
-    """Run a simple HTTP server for health checks"""
+def run_health_check_server(supervisor=None):
+    """Run a threaded HTTP server for health checks"""
     PORT = int(os.environ.get('HEALTH_CHECK_PORT', 8081))
+    HealthCheckHandler.supervisor = supervisor
+    checks = {'models': model_check, 'memory': memory_check}
+    if supervisor is not None:
+        checks['streamlit'] = lambda: streamlit_check(
+            [worker.port for worker in supervisor.workers], BASE_URL_PATH
+        )
     
     try:
-        with socketserver.TCPServer(("", PORT), HealthCheckHandler) as httpd:
-            print(f"Health check server running on port {PORT}")
-            httpd.serve_forever()
+        start_health_server(PORT, checks, HealthCheckHandler)
     except Exception as e:
         print(f"Health check server error: {e}")
 
-def run_streamlit():
-    """Run the main Streamlit application"""
-    cmd = [
-        sys.executable, "-m", "streamlit", "run", "main.py",
-        "--server.port", os.environ.get('PORT', '8080'),
-        "--server.address", "0.0.0.0",
-        "--server.baseUrlPath", "ml"
-    ]
-    
-    print(f"Starting Streamlit with command: {' '.join(cmd)}")
-    try:
-        subprocess.run(cmd, check=True)
-    except subprocess.CalledProcessError as e:
-        print(f"Streamlit error: {e}")
-        sys.exit(1)
+def run_streamlit(supervisor):
+    """Run the Streamlit workers, restarting any that exit"""
+    run_workers(supervisor, int(os.environ.get('PORT', 8080)))
 
 if __name__ == "__main__":
-    # Start health check server in a separate thread
-    health_thread = threading.Thread(target=run_health_check_server, daemon=True)
-    health_thread.start()
+    supervisor = Supervisor(public_port=int(os.environ.get('PORT', 8080)))
+    
+    # Start health check server; it serves from its own threads
+    run_health_check_server(supervisor)
     
-    # Give health check server time to start
-    time.sleep(2)
+    # Optionally serve the churn model's prediction API next to the app
+    if os.environ.get('PREDICTION_SERVICE') == 'true':
+        from prediction_service import run_prediction_server
+        prediction_thread = threading.Thread(target=run_prediction_server, daemon=True)
+        prediction_thread.start()
     
     # Start Streamlit
-    run_streamlit()
+    run_streamlit(supervisor)
@@ -0,0 +1,80 @@
+"""
+Deferred imports for the ML Hub
+Heavy libraries (plotly, scikit-learn) are bound to module proxies that
+import on first attribute access, so the first page paints before they
+load. After the first run a background thread imports them, so the page
+that needs them next finds them already in ``sys.modules``.
+
+Profile the startup cost with ``python benchmarks/import_profile.py``.
+"""
+
+import importlib
+import os
+import sys
+import threading
+
+# Imported by the warm-up thread, roughly in order of first use
+WARM_UP_MODULES = (
+    'plotly.graph_objects',
+    'plotly.express',
+    'joblib',
+    'sklearn.ensemble',
+    'sklearn.metrics',
+    'sklearn.model_selection',
+    'sklearn.datasets',
+    'sklearn.linear_model',
+    'sklearn.cluster',
+    'sklearn.preprocessing',
+)
+
+WARM_UP_ENABLED = os.environ.get('ML_HUB_WARM_UP', 'true') == 'true'
+
+
+class LazyModule:
+    """Stand-in for a module that imports it on first attribute access"""
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            # The import system serializes concurrent imports of one module
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        state = 'loaded' if self._module is not None else 'not loaded'
+        return f"<lazy module {self._name!r} ({state})>"
+
+
+def lazy_module(name):
+    """The module itself if already imported, otherwise a ``LazyModule``"""
+    return sys.modules.get(name) or LazyModule(name)
+
+
+_warm_up_started = False
+_warm_up_lock = threading.Lock()
+
+
+def _warm_up(names):
+    for name in names:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            pass
+
+
+def start_warm_up(names=WARM_UP_MODULES):
+    """Import ``names`` once per process in a daemon thread"""
+    global _warm_up_started
+    if not WARM_UP_ENABLED:
+        return
+    with _warm_up_lock:
+        if _warm_up_started:
+            return
+        _warm_up_started = True
+    threading.Thread(target=_warm_up, args=(names,), name='ml-hub-warm-up', daemon=True).start()
@@ -0,0 +1,139 @@
+"""
+Dataset loaders for the ML Hub
+Dispatches uploads to a CSV or Excel reader by file extension. Excel
+workbooks are opened read-only and their rows streamed in chunks, so a
+large sheet never exists as one Python list of rows.
+"""
+
+import warnings
+from pathlib import Path
+
+import pandas as pd
+
+DEFAULT_CHUNK_ROWS = 100_000
+
+# Rows buffered as Python tuples per Excel chunk when reading a whole sheet
+XLSX_CHUNK_ROWS = 10_000
+
+FORMATS = {
+    '.csv': 'csv',
+    '.txt': 'csv',
+    '.xlsx': 'xlsx',
+    '.xlsm': 'xlsx',
+}
+
+
+def detect_format(name):
+    """Map a file name to a loader format, defaulting to CSV"""
+    return FORMATS.get(Path(name).suffix.lower(), 'csv')
+
+
+def _rewind(source):
+    if hasattr(source, 'seek'):
+        source.seek(0)
+
+
+def _open_workbook(source):
+    from openpyxl import load_workbook
+
+    _rewind(source)
+    return load_workbook(source, read_only=True, data_only=True, keep_links=False)
+
+
+def list_sheets(source):
+    """Sheet names of a workbook, in workbook order"""
+    workbook = _open_workbook(source)
+    try:
+        return list(workbook.sheetnames)
+    finally:
+        workbook.close()
+
+
+def _header(row):
+    """Column names from a header row, deduplicated as ``pd.read_csv`` does"""
+    names = [str(value) if value is not None else f'Unnamed: {i}' for i, value in enumerate(row)]
+    # A repeat gets the next ``name.N`` not taken by any header cell, so a
+    # later ``a.1`` keeps its own name
+    taken = set(names)
+    counts = {}
+    seen = set()
+    for i, name in enumerate(names):
+        if name in seen:
+            count = counts.get(name, 0) + 1
+            while f'{name}.{count}' in taken:
+                count += 1
+            counts[name] = count
+            names[i] = f'{name}.{count}'
+            taken.add(names[i])
+        seen.add(names[i])
+    return names
+
+
+def iter_xlsx_chunks(source, sheet=None, chunk_rows=DEFAULT_CHUNK_ROWS, usecols=None):
+    """Yield DataFrames of up to ``chunk_rows`` rows from one worksheet
+
+    The first non-empty row is the header; fully empty rows are skipped.
+    Cells to the right of the header are dropped, with a warning.
+    """
+    workbook = _open_workbook(source)
+    try:
+        worksheet = workbook[sheet] if sheet is not None else workbook.worksheets[0]
+        columns = None
+        rows = []
+        yielded = False
+        warned = False
+
+        for row in worksheet.iter_rows(values_only=True):
+            if all(value is None for value in row):
+                continue
+            if columns is None:
+                columns = _header(row)
+                continue
+            if not warned and any(value is not None for value in row[len(columns):]):
+                warnings.warn(f"Row has cells beyond the {len(columns)} header columns; they are dropped",
+                              stacklevel=2)
+                warned = True
+            rows.append(_pad(row, len(columns)))
+            if len(rows) >= chunk_rows:
+                yield _frame(rows, columns, usecols)
+                yielded = True
+                rows = []
+
+        if rows or (columns is not None and not yielded):
+            yield _frame(rows, columns, usecols)
+    finally:
+        workbook.close()
+
+
+def _pad(row, width):
+    row = tuple(row[:width])
+    return row + (None,) * (width - len(row))
+
+
+def _frame(rows, columns, usecols):
+    frame = pd.DataFrame.from_records(rows, columns=columns).infer_objects()
+    return frame[usecols] if usecols is not None else frame
+
+
+def iter_chunks(source, fmt='csv', sheet=None, chunk_rows=DEFAULT_CHUNK_ROWS, usecols=None):
+    """Chunked reader for any supported format"""
+    if fmt == 'xlsx':
+        return iter_xlsx_chunks(source, sheet=sheet, chunk_rows=chunk_rows, usecols=usecols)
+    _rewind(source)
+    return pd.read_csv(source, chunksize=chunk_rows, usecols=usecols)
+
+
+def read_table(source, fmt='csv', sheet=None, nrows=None):
+    """Read a whole table (or its first ``nrows`` rows) into a DataFrame"""
+    if fmt == 'xlsx':
+        chunk_rows = nrows or XLSX_CHUNK_ROWS
+        frames = []
+        for chunk in iter_xlsx_chunks(source, sheet=sheet, chunk_rows=chunk_rows):
+            frames.append(chunk)
+            if nrows is not None:
+                break
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+    _rewind(source)
+    return pd.read_csv(source, nrows=nrows)
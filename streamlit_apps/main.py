@@ -1,41 +1,129 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
-from datetime import datetime, timedelta
-import requests
-import json
 import os
+import time
+
+import charts
+import profiling
+from batch_models import BATCH_ROWS, fit_clustering, fit_regression, fit_time_series, sample_dataset
+from columnar_store import open_or_spill
+from correlation import HEATMAP_COLUMNS
+from dataset_cache import CachedDataset, get_dataset_cache, upload_key
+from forecasting import SEASON_LENGTHS, build_panel, fit_panel, sample_sku_sales
+from lazy_imports import lazy_module, start_warm_up
+from loaders import DEFAULT_CHUNK_ROWS, detect_format, list_sheets, read_table
+from metrics import DATASET_LOAD_BYTES, DATASET_LOAD_SECONDS, PAGE_RENDER_SECONDS
+from model_registry import get_model_registry
+from sketches import TOP_K
+from streaming_profile import HISTOGRAM_BINS, profile_table
+from training import CLASSIFIER_NAME, CLASSIFIER_PARAMS, train_random_forest
+from training_pool import get_training_pool
+
+# Plotly is imported on first use so the first page paints without it
+px = lazy_module('plotly.express')
+go = lazy_module('plotly.graph_objects')
+
+# Script runs that reach the footer are recorded in ml_hub_page_render_seconds
+render_start = time.perf_counter()
+
+# Opt-in per-rerun profile (ML_HUB_PROFILE or ?profile=), shown in the sidebar
+profiler = profiling.start_rerun(st.experimental_get_query_params().get('profile', [None])[0])
 
 # Add a simple health check endpoint for DigitalOcean
 if os.environ.get('HEALTH_CHECK') == 'true':
-    import http.server
-    import socketserver
-    import threading
-    
-    class HealthCheckHandler(http.server.BaseHTTPRequestHandler):
-        def do_GET(self):
-            if self.path == '/health':
-                self.send_response(200)
-                self.send_header('Content-type', 'text/plain')
-                self.end_headers()
-                self.wfile.write(b'OK')
-            else:
-                self.send_response(404)
-                self.end_headers()
-    
-    def run_health_server():
-        PORT = int(os.environ.get('HEALTH_CHECK_PORT', 8081))
-        with socketserver.TCPServer(("", PORT), HealthCheckHandler) as httpd:
-            print(f"Health check server running on port {PORT}")
-            httpd.serve_forever()
-    
-    # Start health check server in a separate thread
-    health_thread = threading.Thread(target=run_health_server, daemon=True)
-    health_thread.start()
+    from health import memory_check, model_check, start_health_server, streamlit_check
+    
+    # Started once per process; later reruns find it running
+    start_health_server(int(os.environ.get('HEALTH_CHECK_PORT', 8081)), {
+        'streamlit': lambda: streamlit_check(
+            [st.get_option('server.port')], st.get_option('server.baseUrlPath')
+        ),
+        'models': model_check,
+        'memory': memory_check,
+    })
+
+def select_upload(uploaded_file, key=None):
+    """Content key, format and sheet of an upload, asking for a sheet if needed"""
+    dataset_key = upload_key(uploaded_file, st.session_state)
+    file_format = detect_format(uploaded_file.name)
+    sheet = None
+    
+    if file_format == 'xlsx':
+        try:
+            sheets = get_dataset_cache().get_or_load(
+                (dataset_key, 'sheets'), lambda: list_sheets(uploaded_file)
+            )
+        except Exception as e:
+            st.error(f"Error reading workbook: {str(e)}")
+            st.stop()
+        sheet = st.selectbox("Select a sheet:", sheets, key=key)
+        dataset_key = f"{dataset_key}-s{sheets.index(sheet)}"
+    
+    return dataset_key, file_format, sheet
+
+def load_dataset(uploaded_file, dataset_key, file_format, sheet, compact=False):
+    """Parse an upload once into the columnar store and cache its profile"""
+    def load():
+        with DATASET_LOAD_SECONDS.time(format=file_format):
+            dataset = CachedDataset(open_or_spill(
+                dataset_key, lambda: read_table(uploaded_file, file_format, sheet=sheet),
+                compact=compact
+            ))
+        DATASET_LOAD_BYTES.observe(uploaded_file.size, format=file_format)
+        return dataset
+    
+    return get_dataset_cache().get_or_load((dataset_key, compact), load)
+
+def sketch_caption(sketch):
+    """How exact the counts drawn from a value sketch are"""
+    if sketch.exact:
+        return f"{sketch.distinct:,} distinct values, exact counts"
+    if not sketch.error_bound:
+        return f"≈ {sketch.distinct:,} distinct values (HyperLogLog); top counts are exact"
+    return (f"≈ {sketch.distinct:,} distinct values (HyperLogLog); "
+            f"counts may overstate by up to {sketch.error_bound:,} (Space-Saving / Count-Min)")
+
+def show_correlation(accumulator):
+    """Heatmap of a column subset and the most correlated column pairs"""
+    columns = accumulator.columns
+    if len(columns) > HEATMAP_COLUMNS:
+        default = accumulator.top_columns(HEATMAP_COLUMNS)
+        st.caption(f"Showing the {HEATMAP_COLUMNS} most correlated of {len(columns)} numeric columns")
+    else:
+        default = columns
+    selected = st.multiselect("Correlation columns:", columns, default=default)
+    
+    if len(selected) > 1:
+        fig = px.imshow(accumulator.matrix(selected),
+                      title="Correlation Matrix (pairwise complete rows)",
+                      color_continuous_scale='RdBu',
+                      zmin=-1, zmax=1,
+                      aspect='auto')
+        st.plotly_chart(fig, use_container_width=True)
+    
+    with st.expander("🔝 Most Correlated Pairs"):
+        st.dataframe(accumulator.top_pairs(columns=selected if len(selected) > 1 else None))
+
+def show_profile(report):
+    """Sidebar panel with this rerun's section timings and any cProfile/tracemalloc top-lists"""
+    with st.sidebar.expander(f"⏱️ Rerun profile: {report.seconds * 1000:.0f} ms", expanded=True):
+        sections = report.sections()
+        st.plotly_chart(charts.flame(sections), use_container_width=True)
+        st.dataframe(
+            sections[['Path', 'Duration (ms)', 'Share']].sort_values('Duration (ms)', ascending=False),
+            hide_index=True,
+            column_config={'Share': st.column_config.ProgressColumn(min_value=0, max_value=1, format="%.0f%%")},
+        )
+        if report.functions is not None:
+            st.caption("🐢 Slowest functions (cProfile, cumulative)")
+            st.dataframe(report.functions, hide_index=True)
+        if report.allocations is not None:
+            st.caption(f"🧠 Largest allocations (tracemalloc), peak {report.peak_bytes / 1024**2:.1f} MB")
+            st.dataframe(report.allocations, hide_index=True)
 
 # Page configuration
+profiling.phase("Page config & CSS")
 st.set_page_config(
     page_title="DataWeb ML Hub",
     page_icon="🤖",
@@ -77,6 +165,7 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Sidebar
+profiling.phase("Sidebar")
 st.sidebar.title("🤖 DataWeb ML Hub")
 st.sidebar.markdown("---")
 
@@ -87,6 +176,7 @@ page = st.sidebar.selectbox(
 )
 
 # Main content
+profiling.phase(page.split(' ', 1)[1])
 if page == "🏠 Dashboard":
     st.markdown('<div class="main-header"><h1>DataWeb Machine Learning Hub</h1><p>Advanced Analytics & AI Solutions</p></div>', unsafe_allow_html=True)
     
@@ -133,31 +223,34 @@ if page == "🏠 Dashboard":
     st.subheader("📈 Model Performance Trends")
     
     # Generate sample data
-    dates = pd.date_range(start='2024-01-01', end='2024-01-31', freq='D')
-    performance_data = pd.DataFrame({
-        'Date': dates,
-        'Accuracy': np.random.normal(94, 2, len(dates)),
-        'Precision': np.random.normal(92, 3, len(dates)),
-        'Recall': np.random.normal(89, 4, len(dates))
-    })
-    
-    fig = go.Figure()
-    fig.add_trace(go.Scatter(x=performance_data['Date'], y=performance_data['Accuracy'], 
-                            mode='lines+markers', name='Accuracy', line=dict(color='#667eea')))
-    fig.add_trace(go.Scatter(x=performance_data['Date'], y=performance_data['Precision'], 
-                            mode='lines+markers', name='Precision', line=dict(color='#764ba2')))
-    fig.add_trace(go.Scatter(x=performance_data['Date'], y=performance_data['Recall'], 
-                            mode='lines+markers', name='Recall', line=dict(color='#f093fb')))
-    
-    fig.update_layout(
-        title="Model Performance Over Time",
-        xaxis_title="Date",
-        yaxis_title="Score (%)",
-        hovermode='x unified',
-        height=400
-    )
-    
-    st.plotly_chart(fig, use_container_width=True)
+    with profiling.section("sample data"):
+        dates = pd.date_range(start='2024-01-01', end='2024-01-31', freq='D')
+        performance_data = pd.DataFrame({
+            'Date': dates,
+            'Accuracy': np.random.normal(94, 2, len(dates)),
+            'Precision': np.random.normal(92, 3, len(dates)),
+            'Recall': np.random.normal(89, 4, len(dates))
+        })
+    
+    with profiling.section("figure build"):
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(**charts.line_points(performance_data['Date'], performance_data['Accuracy']), 
+                                mode='lines+markers', name='Accuracy', line=dict(color='#667eea')))
+        fig.add_trace(go.Scatter(**charts.line_points(performance_data['Date'], performance_data['Precision']), 
+                                mode='lines+markers', name='Precision', line=dict(color='#764ba2')))
+        fig.add_trace(go.Scatter(**charts.line_points(performance_data['Date'], performance_data['Recall']), 
+                                mode='lines+markers', name='Recall', line=dict(color='#f093fb')))
+        
+        fig.update_layout(
+            title="Model Performance Over Time",
+            xaxis_title="Date",
+            yaxis_title="Score (%)",
+            hovermode='x unified',
+            height=400
+        )
+    
+    with profiling.section("plotly_chart"):
+        st.plotly_chart(fig, use_container_width=True)
     
     # Project Cards
     st.subheader("🚀 Featured Projects")
@@ -201,11 +294,90 @@ elif page == "📊 Data Analytics":
     
     # File upload
     uploaded_file = st.file_uploader("Upload your dataset", type=['csv', 'xlsx'])
+    streaming_mode = st.checkbox(
+        "⚡ Streaming mode (large files)",
+        help="Read the upload in bounded-size chunks and compute the overview incrementally"
+    )
+    # Streaming never builds the dataset, so there is nothing to compact
+    compact_mode = not streaming_mode and st.checkbox(
+        "🗜️ Compact loading",
+        help="Infer categoricals, parse dates and downcast numerics to shrink the dataset in memory"
+    )
     
     if uploaded_file is not None:
+        dataset_key, file_format, sheet = select_upload(uploaded_file)
+    
+    if uploaded_file is not None and streaming_mode:
+        try:
+            chunk_rows = st.select_slider(
+                "Rows per chunk",
+                options=[10_000, 50_000, 100_000, 250_000, 500_000],
+                value=DEFAULT_CHUNK_ROWS
+            )
+            with st.spinner("Profiling dataset in chunks..."):
+                profile = get_dataset_cache().get_or_load(
+                    (dataset_key, 'stream', chunk_rows),
+                    lambda: profile_table(uploaded_file, file_format, sheet=sheet, chunk_rows=chunk_rows)
+                )
+            st.success(f"✅ Streamed {profile.rows} rows and {len(profile.columns)} columns in {profile.chunks} chunks")
+            
+            # Basic statistics
+            st.subheader("📈 Dataset Overview")
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                st.write("**Dataset Info:**")
+                st.write(f"- Shape: {(profile.rows, len(profile.columns))}")
+                st.write(f"- Peak Chunk Memory: {profile.peak_chunk_bytes / 1024**2:.2f} MB")
+                st.write(f"- Missing Values: {profile.missing_values()}")
+            
+            with col2:
+                st.write("**Data Types:**")
+                st.write(profile.dtype_summary())
+            
+            # Data preview
+            st.subheader("👀 Data Preview")
+            st.dataframe(get_dataset_cache().get_or_load(
+                (dataset_key, 'preview'),
+                lambda: read_table(uploaded_file, file_format, sheet=sheet, nrows=5)
+            ))
+            
+            # Column analysis
+            st.subheader("🔍 Column Analysis")
+            selected_column = st.selectbox("Select a column to analyze:", profile.columns)
+            
+            if selected_column:
+                col1, col2 = st.columns(2)
+                
+                with col1:
+                    st.write(f"**Statistics for {selected_column}:**")
+                    st.write(profile.describe(selected_column))
+                
+                with col2:
+                    if selected_column in profile.histograms:
+                        counts, edges = profile.histograms[selected_column]
+                        fig = charts.histogram(counts, edges, label=selected_column,
+                                               title=f"Distribution of {selected_column}")
+                        st.plotly_chart(fig, use_container_width=True)
+                    elif selected_column in profile.top_values:
+                        top_n = st.slider("Top values:", 5, TOP_K, 10)
+                        sketch = profile.top_values[selected_column]
+                        fig = px.bar(sketch.top_frame(top_n), x='Value', y='Count',
+                                   title=f"Top Value Counts for {selected_column}")
+                        st.plotly_chart(fig, use_container_width=True)
+                        st.caption(sketch_caption(sketch))
+            
+            # Correlation matrix for numerical columns
+            if profile.correlation is not None:
+                st.subheader("🔗 Correlation Matrix")
+                show_correlation(profile.correlation)
+                
+        except Exception as e:
+            st.error(f"Error streaming file: {str(e)}")
+    elif uploaded_file is not None:
         try:
-            df = pd.read_csv(uploaded_file)
-            st.success(f"✅ Successfully loaded {len(df)} rows and {len(df.columns)} columns")
+            dataset = load_dataset(uploaded_file, dataset_key, file_format, sheet, compact=compact_mode)
+            st.success(f"✅ Successfully loaded {dataset.rows} rows and {len(dataset.columns)} columns")
             
             # Basic statistics
             st.subheader("📈 Dataset Overview")
@@ -213,50 +385,59 @@ elif page == "📊 Data Analytics":
             
             with col1:
                 st.write("**Dataset Info:**")
-                st.write(f"- Shape: {df.shape}")
-                st.write(f"- Memory Usage: {df.memory_usage(deep=True).sum() / 1024**2:.2f} MB")
-                st.write(f"- Missing Values: {df.isnull().sum().sum()}")
+                st.write(f"- Shape: {(dataset.rows, len(dataset.columns))}")
+                st.write(f"- Memory Usage: {dataset.memory_bytes / 1024**2:.2f} MB")
+                if dataset.compaction is not None:
+                    before = dataset.compaction['bytes_before'].sum()
+                    st.write(f"- Before Compaction: {before / 1024**2:.2f} MB "
+                             f"({before / max(dataset.memory_bytes, 1):.1f}x smaller)")
+                st.write(f"- On-disk (memory-mapped): {dataset.disk_bytes / 1024**2:.2f} MB")
+                st.write(f"- Missing Values: {dataset.missing_values}")
             
             with col2:
                 st.write("**Data Types:**")
-                st.write(df.dtypes.value_counts())
+                st.write(dataset.dtype_counts)
+            
+            if dataset.compaction is not None:
+                with st.expander("🗜️ Compaction Report"):
+                    st.dataframe(dataset.compaction)
             
             # Data preview
             st.subheader("👀 Data Preview")
-            st.dataframe(df.head())
+            st.dataframe(dataset.head())
             
             # Column analysis
             st.subheader("🔍 Column Analysis")
-            selected_column = st.selectbox("Select a column to analyze:", df.columns)
+            selected_column = st.selectbox("Select a column to analyze:", dataset.columns)
             
             if selected_column:
                 col1, col2 = st.columns(2)
                 
                 with col1:
                     st.write(f"**Statistics for {selected_column}:**")
-                    st.write(df[selected_column].describe())
+                    st.write(dataset.describe(selected_column))
                 
                 with col2:
                     # Plot based on data type
-                    if df[selected_column].dtype in ['int64', 'float64']:
-                        fig = px.histogram(df, x=selected_column, title=f"Distribution of {selected_column}")
+                    if selected_column in dataset.numeric_columns:
+                        # Binned server-side and memoized per column and bin count
+                        bins = st.slider("Bins:", 10, 200, HISTOGRAM_BINS)
+                        counts, edges = dataset.histogram(selected_column, bins)
+                        fig = charts.histogram(counts, edges, label=selected_column,
+                                               title=f"Distribution of {selected_column}")
                         st.plotly_chart(fig, use_container_width=True)
                     else:
-                        value_counts = df[selected_column].value_counts()
-                        fig = px.bar(x=value_counts.index, y=value_counts.values, 
+                        top_n = st.slider("Top values:", 5, TOP_K, 10)
+                        sketch = dataset.sketch(selected_column)
+                        fig = px.bar(sketch.top_frame(top_n), x='Value', y='Count',
                                    title=f"Value Counts for {selected_column}")
                         st.plotly_chart(fig, use_container_width=True)
+                        st.caption(sketch_caption(sketch))
             
             # Correlation matrix for numerical columns
-            numerical_cols = df.select_dtypes(include=[np.number]).columns
-            if len(numerical_cols) > 1:
+            if len(dataset.numeric_columns) > 1:
                 st.subheader("🔗 Correlation Matrix")
-                corr_matrix = df[numerical_cols].corr()
-                fig = px.imshow(corr_matrix, 
-                              title="Correlation Matrix",
-                              color_continuous_scale='RdBu',
-                              aspect='auto')
-                st.plotly_chart(fig, use_container_width=True)
+                show_correlation(dataset.correlation())
                 
         except Exception as e:
             st.error(f"Error loading file: {str(e)}")
@@ -275,49 +456,182 @@ elif page == "🤖 Machine Learning":
     if model_type == "Classification":
         st.subheader("📊 Classification Models")
         
-        # Sample classification data
-        from sklearn.datasets import make_classification
-        from sklearn.model_selection import train_test_split
-        from sklearn.ensemble import RandomForestClassifier
-        from sklearn.metrics import accuracy_score, classification_report
-        
-        # Generate sample data
-        X, y = make_classification(n_samples=1000, n_features=20, n_informative=15, 
-                                 n_redundant=5, random_state=42)
+        # Train once in a background worker and serve later reruns from the model registry
+        registry = get_model_registry()
+        trained_now = not registry.is_warm(CLASSIFIER_NAME, CLASSIFIER_PARAMS)
+        if trained_now:
+            job = get_training_pool().submit(CLASSIFIER_NAME, CLASSIFIER_PARAMS, train_random_forest)
+            progress_bar = st.progress(0.0, text="🔨 Training in background worker...")
+            while not job.wait(timeout=0.2):
+                progress_bar.progress(job.progress, text=f"🔨 Training in background worker... {job.progress:.0%}")
+            job.result()
+            progress_bar.empty()
         
-        # Split data
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+        artifact = registry.get_or_train(CLASSIFIER_NAME, CLASSIFIER_PARAMS, train_random_forest)
+        metrics = artifact.metrics
         
-        # Train model
-        model = RandomForestClassifier(n_estimators=100, random_state=42)
-        model.fit(X_train, y_train)
-        
-        # Predictions
-        y_pred = model.predict(X_test)
-        accuracy = accuracy_score(y_test, y_pred)
+        if trained_now:
+            st.caption(f"🔨 Trained in {metrics['training_seconds']:.2f}s in a background worker and saved as version {artifact.version}")
+        else:
+            st.caption(f"⚡ Served from model cache (version {artifact.version}, trained {metrics['trained_at']})")
         
         # Display results
         col1, col2 = st.columns(2)
         
         with col1:
-            st.metric("Accuracy", f"{accuracy:.2%}")
-            st.metric("Training Samples", len(X_train))
-            st.metric("Test Samples", len(X_test))
+            st.metric("Accuracy", f"{metrics['accuracy']:.2%}")
+            st.metric("Training Samples", metrics['train_samples'])
+            st.metric("Test Samples", metrics['test_samples'])
         
         with col2:
             st.write("**Classification Report:**")
-            st.text(classification_report(y_test, y_pred))
+            st.text(metrics['classification_report'])
         
         # Feature importance
         feature_importance = pd.DataFrame({
-            'Feature': [f'Feature_{i}' for i in range(X.shape[1])],
-            'Importance': model.feature_importances_
+            'Feature': metrics['feature_names'],
+            'Importance': metrics['feature_importances']
         }).sort_values('Importance', ascending=False)
         
         fig = px.bar(feature_importance.head(10), x='Importance', y='Feature', 
                     title="Top 10 Feature Importance",
                     orientation='h')
         st.plotly_chart(fig, use_container_width=True)
+    
+    else:
+        # Uploaded data (or a synthetic sample) trained in row batches
+        ml_file = st.file_uploader("Upload a dataset to train on (optional)", type=['csv', 'xlsx'], key='ml_upload')
+        if ml_file is not None:
+            dataset_key, file_format, sheet = select_upload(ml_file, key='ml_sheet')
+            try:
+                dataset = load_dataset(ml_file, dataset_key, file_format, sheet)
+            except Exception as e:
+                st.error(f"Error loading file: {str(e)}")
+                st.stop()
+        else:
+            dataset_key = f"sample-{model_type.lower().replace(' ', '-')}"
+            dataset = get_dataset_cache().get_or_load(
+                (dataset_key, False),
+                lambda: CachedDataset(open_or_spill(dataset_key, lambda: sample_dataset(model_type)))
+            )
+            st.caption(f"Using a synthetic sample of {dataset.rows:,} rows. Upload a file to train on your own data.")
+        
+        batch_rows = st.select_slider("Rows per batch", options=[10_000, 50_000, 100_000, 250_000], value=BATCH_ROWS)
+        numeric_cols = dataset.numeric_columns
+        
+        try:
+            if model_type == "Regression":
+                st.subheader("📉 Regression Models")
+                if len(numeric_cols) < 2:
+                    st.warning("Regression needs at least two numeric columns")
+                    st.stop()
+                target = st.selectbox("Target column:", numeric_cols, index=len(numeric_cols) - 1)
+                features = st.multiselect("Feature columns:", [c for c in numeric_cols if c != target],
+                                          default=[c for c in numeric_cols if c != target][:50])
+                if not features:
+                    st.stop()
+                
+                result = get_dataset_cache().get_or_load(
+                    (dataset_key, 'regression', tuple(features), target, batch_rows),
+                    lambda: fit_regression(dataset.store, features, target, batch_rows=batch_rows)
+                )
+                metrics = result['metrics']
+                
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    st.metric("R²", f"{metrics['r2']:.3f}")
+                    st.metric("MAE", f"{metrics['mae']:.3f}")
+                    st.metric("RMSE", f"{metrics['rmse']:.3f}")
+                with col2:
+                    st.metric("Training Rows", f"{metrics['train_rows']:,}")
+                    st.metric("Test Rows", f"{metrics['test_rows']:,}")
+                    st.metric("Fit Time", f"{metrics['fit_seconds']:.2f}s")
+                with col3:
+                    st.metric("Fit Throughput", f"{metrics['fit_rows_per_second']:,.0f} rows/s")
+                    st.metric("Predict Throughput", f"{metrics['predict_rows_per_second']:,.0f} rows/s")
+                
+                fig = charts.scatter(result['sample'], x='Actual', y='Predicted', title="Actual vs Predicted (test sample)")
+                st.plotly_chart(fig, use_container_width=True)
+                
+                coefficients = result['coefficients'].reindex(
+                    result['coefficients']['Coefficient'].abs().sort_values(ascending=False).index
+                )
+                fig = px.bar(coefficients.head(10), x='Coefficient', y='Feature',
+                            title="Top 10 Standardized Coefficients", orientation='h')
+                st.plotly_chart(fig, use_container_width=True)
+            
+            elif model_type == "Clustering":
+                st.subheader("🧩 Clustering Models")
+                if not numeric_cols:
+                    st.warning("Clustering needs numeric columns")
+                    st.stop()
+                features = st.multiselect("Feature columns:", numeric_cols, default=numeric_cols[:50])
+                n_clusters = st.slider("Number of clusters:", 2, 12, 4)
+                if not features:
+                    st.stop()
+                
+                result = get_dataset_cache().get_or_load(
+                    (dataset_key, 'clustering', tuple(features), n_clusters, batch_rows),
+                    lambda: fit_clustering(dataset.store, features, n_clusters, batch_rows=batch_rows)
+                )
+                metrics = result['metrics']
+                
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    st.metric("Rows Clustered", f"{metrics['rows']:,}")
+                    st.metric("Inertia", f"{metrics['inertia']:,.0f}")
+                with col2:
+                    st.metric("Fit Time", f"{metrics['fit_seconds']:.2f}s")
+                    st.metric("Predict Time", f"{metrics['predict_seconds']:.2f}s")
+                with col3:
+                    st.metric("Fit Throughput", f"{metrics['fit_rows_per_second']:,.0f} rows/s")
+                    st.metric("Predict Throughput", f"{metrics['predict_rows_per_second']:,.0f} rows/s")
+                
+                st.write("**Cluster Centers:**")
+                st.dataframe(result['centers'])
+                
+                if len(features) > 1:
+                    fig = charts.scatter(result['sample'], x=features[0], y=features[1], color='Cluster',
+                                        title=f"Cluster Assignments (sample of {len(result['sample']):,} rows)")
+                    st.plotly_chart(fig, use_container_width=True)
+            
+            elif model_type == "Time Series":
+                st.subheader("⏰ Time Series Models")
+                other_cols = [c for c in dataset.columns if c not in numeric_cols]
+                if not other_cols or not numeric_cols:
+                    st.warning("Time series needs a date column and a numeric value column")
+                    st.stop()
+                date_column = st.selectbox("Date column:", other_cols)
+                value_column = st.selectbox("Value column:", numeric_cols)
+                freq = st.selectbox("Aggregate to:", ['D', 'W', 'ME'],
+                                    format_func={'D': 'Daily', 'W': 'Weekly', 'ME': 'Monthly'}.get)
+                lags = st.slider("Lag periods:", 2, 60, 14)
+                horizon = st.slider("Forecast horizon (periods):", 1, 120, 30)
+                
+                result = get_dataset_cache().get_or_load(
+                    (dataset_key, 'time-series', date_column, value_column, freq, lags, horizon, batch_rows),
+                    lambda: fit_time_series(dataset.store, date_column, value_column, freq=freq,
+                                            lags=lags, horizon=horizon, batch_rows=batch_rows)
+                )
+                metrics = result['metrics']
+                
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    st.metric("Backtest MAE", f"{metrics['mae']:.3f}")
+                    st.metric("Backtest MAPE", f"{metrics['mape']:.2%}")
+                with col2:
+                    st.metric("Periods", f"{metrics['periods']:,}")
+                    st.metric("Fit Time", f"{metrics['fit_seconds'] * 1000:.1f} ms")
+                with col3:
+                    st.metric("Fit Throughput", f"{metrics['fit_rows_per_second']:,.0f} windows/s")
+                    st.metric("Forecast Time", f"{metrics['predict_seconds'] * 1000:.1f} ms")
+                
+                fig = charts.line(result['frame'], x='Date', y='Value', color='Type',
+                                  title=f"{value_column}: Backtest and {horizon}-Period Forecast")
+                st.plotly_chart(fig, use_container_width=True)
+        
+        except ValueError as e:
+            st.error(f"Error training model: {str(e)}")
 
 elif page == "📈 Predictive Models":
     st.title("📈 Predictive Models")
@@ -325,47 +639,111 @@ elif page == "📈 Predictive Models":
     # Time series forecasting
     st.subheader("⏰ Time Series Forecasting")
     
-    # Generate sample time series data
-    dates = pd.date_range(start='2020-01-01', end='2024-01-01', freq='M')
-    np.random.seed(42)
-    trend = np.linspace(100, 200, len(dates))
-    seasonal = 20 * np.sin(2 * np.pi * np.arange(len(dates)) / 12)
-    noise = np.random.normal(0, 5, len(dates))
-    sales_data = trend + seasonal + noise
-    
-    ts_df = pd.DataFrame({
-        'Date': dates,
-        'Sales': sales_data
-    })
+    # Long-format sales (one row per date and SKU), uploaded or a synthetic sample
+    forecast_file = st.file_uploader("Upload sales history (date, SKU and value columns)",
+                                     type=['csv', 'xlsx'], key='forecast_upload')
+    if forecast_file is not None:
+        dataset_key, file_format, sheet = select_upload(forecast_file, key='forecast_sheet')
+        try:
+            dataset = load_dataset(forecast_file, dataset_key, file_format, sheet)
+        except Exception as e:
+            st.error(f"Error loading file: {str(e)}")
+            st.stop()
+    else:
+        dataset_key = 'sample-sku-sales'
+        dataset = get_dataset_cache().get_or_load(
+            (dataset_key, False),
+            lambda: CachedDataset(open_or_spill(dataset_key, sample_sku_sales))
+        )
+        st.caption(f"Using synthetic sales of {dataset.rows:,} rows. Upload a file to forecast your own series.")
+    
+    numeric_cols = dataset.numeric_columns
+    other_cols = [c for c in dataset.columns if c not in numeric_cols]
+    if not other_cols or not numeric_cols:
+        st.warning("Forecasting needs a date column, a series column and a numeric value column")
+        st.stop()
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        date_column = st.selectbox("Date column:", other_cols)
+    with col2:
+        series_column = st.selectbox("Series column:", [c for c in dataset.columns if c != date_column])
+    with col3:
+        value_column = st.selectbox("Value column:", [c for c in numeric_cols if c != series_column])
+    if value_column is None:
+        st.warning("Forecasting needs a numeric value column other than the series column")
+        st.stop()
     
-    # Plot original data
-    fig = px.line(ts_df, x='Date', y='Sales', title="Historical Sales Data")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        freq = st.selectbox("Aggregate to:", ['MS', 'W', 'D'],
+                            format_func={'D': 'Daily', 'W': 'Weekly', 'MS': 'Monthly'}.get)
+    with col2:
+        season_length = st.number_input("Season length (periods):", 1, 366, SEASON_LENGTHS[freq])
+    with col3:
+        horizon = st.slider("Forecast horizon (periods):", 1, 60, 12)
+    
+    # Fitted states are cached per column choice; changing the horizon only re-reads them
+    try:
+        model = get_dataset_cache().get_or_load(
+            (dataset_key, 'forecast', date_column, series_column, value_column, freq, season_length),
+            lambda: fit_panel(
+                build_panel(dataset.column(date_column), dataset.column(series_column),
+                            dataset.column(value_column), freq=freq),
+                freq=freq, period=season_length
+            )
+        )
+    except ValueError as e:
+        st.error(f"Error fitting forecast: {str(e)}")
+        st.stop()
+    
+    parameters = model.parameters().sort_values('Total', ascending=False)
+    
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Series", f"{model.n_series:,}")
+    with col2:
+        st.metric("Periods", f"{len(model.periods):,}")
+    with col3:
+        st.metric("Fit Time", f"{model.fit_seconds:.2f}s")
+    with col4:
+        st.metric("Median WAPE", f"{parameters['WAPE'].median():.1%}")
+    if model.period == 1:
+        st.caption("Fewer than two seasons of history; fitted without seasonality")
+    
+    # Sum of all series
+    future_dates = model.future_periods(horizon)
+    combined_df = pd.concat([
+        pd.DataFrame({'Date': model.periods, 'Sales': model.values.sum(axis=0), 'Type': 'Historical'}),
+        pd.DataFrame({'Date': future_dates, 'Sales': model.forecast(horizon).sum(axis=0), 'Type': 'Forecast'}),
+    ])
+    fig = charts.line(combined_df, x='Date', y='Sales', color='Type',
+                      title=f"Total {value_column} Forecast (Next {horizon} Periods)")
+    fig.update_traces(line=dict(dash='dash'), selector=dict(name='Forecast'))
     st.plotly_chart(fig, use_container_width=True)
     
-    # Simple forecasting
+    # Single series
     st.subheader("🔮 Sales Forecast")
     
-    # Add forecast
-    future_dates = pd.date_range(start='2024-01-01', end='2024-12-01', freq='M')
-    forecast_trend = np.linspace(200, 250, len(future_dates))
-    forecast_seasonal = 20 * np.sin(2 * np.pi * np.arange(len(future_dates)) / 12)
-    forecast_noise = np.random.normal(0, 5, len(future_dates))
-    forecast_sales = forecast_trend + forecast_seasonal + forecast_noise
-    
-    forecast_df = pd.DataFrame({
-        'Date': future_dates,
-        'Sales': forecast_sales,
-        'Type': 'Forecast'
-    })
-    
-    # Combine historical and forecast
-    ts_df['Type'] = 'Historical'
-    combined_df = pd.concat([ts_df, forecast_df])
-    
-    fig = px.line(combined_df, x='Date', y='Sales', color='Type', 
-                  title="Sales Forecast (Next 12 Months)")
+    series = st.selectbox("Series (by total volume):", parameters['Series'])
+    series_df = model.series_frame(series, horizon)
+    fig = charts.line(series_df, x='Date', y='Value', color='Type',
+                      title=f"{series}: Forecast (Next {horizon} Periods)")
     fig.update_traces(line=dict(dash='dash'), selector=dict(name='Forecast'))
+    fig.update_traces(line=dict(dash='dot'), selector=dict(name='Fitted'))
     st.plotly_chart(fig, use_container_width=True)
+    
+    components = model.components(series).melt(id_vars='Date', var_name='Component', value_name='Value')
+    fig = charts.line(components, x='Date', y='Value', facet_row='Component', height=600,
+                      title=f"{series}: Seasonal Decomposition")
+    fig.update_yaxes(matches=None)
+    st.plotly_chart(fig, use_container_width=True)
+    
+    with st.expander("📋 Fitted parameters"):
+        st.dataframe(parameters)
+    
+    forecast_df = pd.DataFrame(model.forecast(horizon), index=model.series, columns=future_dates.date)
+    st.download_button("Download forecasts (CSV)", forecast_df.to_csv(), file_name='forecasts.csv', mime='text/csv')
 
 elif page == "🔍 Data Visualization":
     st.title("🔍 Interactive Data Visualization")
@@ -389,8 +767,8 @@ elif page == "🔍 Data Visualization":
         x_col = st.selectbox("X-axis:", iris.feature_names, index=0)
         y_col = st.selectbox("Y-axis:", iris.feature_names, index=1)
         
-        fig = px.scatter(df, x=x_col, y=y_col, color='species', 
-                        title=f"{x_col} vs {y_col} by Species")
+        fig = charts.scatter(df, x=x_col, y=y_col, color='species', 
+                            title=f"{x_col} vs {y_col} by Species")
         st.plotly_chart(fig, use_container_width=True)
         
         # Box plot
@@ -405,6 +783,7 @@ elif page == "🔍 Data Visualization":
         st.plotly_chart(fig, use_container_width=True)
 
 # Footer
+profiling.phase("Footer")
 st.markdown("---")
 st.markdown("""
 <div style="text-align: center; color: #666; padding: 2rem;">
@@ -412,3 +791,11 @@ st.markdown("""
     <p>Advanced Analytics & Machine Learning Solutions</p>
 </div>
 """, unsafe_allow_html=True)
+
+PAGE_RENDER_SECONDS.observe(time.perf_counter() - render_start, page=page.split(' ', 1)[1])
+
+if profiler is not None:
+    show_profile(profiler.finish())
+
+# Preload plotly and scikit-learn in the background once the first page is out
+start_warm_up()
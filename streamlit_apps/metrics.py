@@ -0,0 +1,236 @@
+"""
+Prometheus-style metrics for the ML Hub
+Histograms, counters and gauges kept in process and rendered in the text
+exposition format on the health server's /metrics. Instruments are
+module-level singletons, so every Streamlit session in a process records
+into the same series.
+"""
+
+import bisect
+import functools
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Seconds: page renders and chart builds are sub-second, loads and fits run to minutes
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+BYTES_BUCKETS = tuple(1024 ** 2 * size for size in (0.1, 1, 10, 50, 100, 250, 500, 1000, 2500))
+
+# Set by the profiling module so timed blocks also show up in a rerun's profile
+section_hook = None
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def header(self):
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values = {}
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+                for key, value in sorted(values.items())]
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=SECONDS_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket (+Inf last), sum]
+        self._series = {}
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._series.get(key, ([0] * (len(self.buckets) + 1), 0.0))
+            counts[index] += 1
+            self._series[key] = (counts, total + value)
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the wall time of the ``with`` block"""
+        if section_hook is not None:
+            # e.g. "chart build: line" for ml_hub_chart_build_seconds{chart="line"}
+            name = self.name.removeprefix('ml_hub_').removesuffix('_seconds').replace('_', ' ')
+            section = section_hook(f"{name}: {', '.join(str(value) for value in labels.values())}")
+        else:
+            section = nullcontext()
+        start = time.perf_counter()
+        try:
+            with section:
+                yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self):
+        with self._lock:
+            series = {key: (list(counts), total) for key, (counts, total) in self._series.items()}
+        lines = []
+        for key, (counts, total) in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, [('le', _format_value(bound))])
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class CallbackMetric(Metric):
+    """Gauge or counter read from ``callback`` at scrape time
+
+    ``callback`` returns a number, or ``{label values tuple: number}`` when
+    the metric has labels.
+    """
+
+    def __init__(self, name, documentation, callback, kind='gauge', labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self.kind = kind
+        self.callback = callback
+
+    def samples(self):
+        values = self.callback()
+        if not self.labelnames:
+            values = {(): values}
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+                for key, value in sorted(values.items())]
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        """Add ``metric``, or return the one already registered under its name"""
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=SECONDS_BUCKETS):
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def callback(self, name, documentation, callback, kind='gauge', labelnames=()):
+        return self.register(CallbackMetric(name, documentation, callback, kind, labelnames))
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            try:
+                samples = metric.samples()
+            except Exception:
+                # A failing callback should not hide the other metrics
+                continue
+            lines.extend(metric.header() + samples)
+        return ('\n'.join(lines) + '\n').encode()
+
+
+REGISTRY = MetricsRegistry()
+
+PAGE_RENDER_SECONDS = REGISTRY.histogram(
+    'ml_hub_page_render_seconds', "Wall time of completed script runs by page", ['page'])
+DATASET_LOAD_SECONDS = REGISTRY.histogram(
+    'ml_hub_dataset_load_seconds', "Time to parse an upload into the columnar store", ['format'])
+DATASET_LOAD_BYTES = REGISTRY.histogram(
+    'ml_hub_dataset_load_bytes', "Size of parsed uploads", ['format'], buckets=BYTES_BUCKETS)
+MODEL_TRAINING_SECONDS = REGISTRY.histogram(
+    'ml_hub_model_training_seconds', "Model fit time", ['model'])
+CHART_BUILD_SECONDS = REGISTRY.histogram(
+    'ml_hub_chart_build_seconds', "Time to build a chart figure, including downsampling", ['chart'])
+MODEL_CACHE_REQUESTS = REGISTRY.counter(
+    'ml_hub_model_cache_requests_total', "Model registry lookups by where the model came from", ['result'])
+
+
+def _add_label(sample, name, value):
+    """Sample line with ``name="value"`` added to its labels"""
+    # Metric names cannot contain "{" or " ", so the first of either ends the name
+    end = min(i for i in (sample.find('{'), sample.find(' ')) if i >= 0)
+    if sample[end] == '{':
+        separator = '' if sample[end + 1] == '}' else ','
+        return f'{sample[:end + 1]}{name}="{value}"{separator}{sample[end + 1:]}'
+    return f'{sample[:end]}{{{name}="{value}"}}{sample[end:]}'
+
+
+def merge_expositions(expositions, label='process'):
+    """One exposition from several processes' ``{source: text}``
+
+    Each sample gets a ``label`` naming its source, and samples of the same
+    metric are grouped under a single HELP/TYPE header as the format requires.
+    """
+    families = {}
+    for source, text in expositions.items():
+        family = None
+        for line in text.splitlines():
+            if line.startswith('# '):
+                _, kind, name, *_ = line.split(' ', 3)
+                family = families.setdefault(name, {'header': {}, 'samples': []})
+                family['header'].setdefault(kind, line)
+            elif line and family is not None:
+                family['samples'].append(_add_label(line, label, source))
+    lines = []
+    for family in families.values():
+        lines.extend(family['header'].values())
+        lines.extend(family['samples'])
+    return ('\n'.join(lines) + '\n').encode()
+
+
+def timed(histogram, **labels):
+    """Decorator observing each call's wall time in ``histogram``"""
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with histogram.time(**labels):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,151 @@
+"""
+Model registry for the ML Hub
+Trains a model once, persists the fitted estimator with its metrics and
+feature importances under the cache directory, and serves later page
+loads from the stored artifact. Artifacts are versioned by a hash of the
+training parameters and the scikit-learn version, so changing either one
+retrains instead of serving a stale model.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from importlib import metadata
+from pathlib import Path
+
+from columnar_store import CACHE_DIR
+from metrics import MODEL_CACHE_REQUESTS, MODEL_TRAINING_SECONDS
+
+REGISTRY_DIR = CACHE_DIR / 'models'
+
+# Bump when the artifact layout or training code changes incompatibly
+REGISTRY_FORMAT = 1
+
+MODEL_FILE = 'model.joblib'
+METRICS_FILE = 'metrics.json'
+
+
+class ModelArtifact:
+    """A fitted estimator together with the metrics recorded at training time"""
+
+    def __init__(self, name, version, model, metrics, from_cache):
+        self.name = name
+        self.version = version
+        self.model = model
+        self.metrics = metrics
+        self.from_cache = from_cache
+
+
+def model_version(name, params):
+    """Version key for a model trained with ``params``"""
+    payload = json.dumps({
+        'format': REGISTRY_FORMAT,
+        'name': name,
+        'params': params,
+        # Read from package metadata so versioning does not import scikit-learn
+        'sklearn': metadata.version('scikit-learn'),
+    }, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode()).hexdigest()[:12]
+
+
+class ModelRegistry:
+    """On-disk store of fitted models, one directory per name and version"""
+
+    def __init__(self, root=REGISTRY_DIR):
+        self.root = Path(root)
+        self._loaded = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def _path(self, name, version):
+        return self.root / name / version
+
+    def load(self, name, version):
+        """Load a stored artifact, memory-mapping its arrays, or return None"""
+        path = self._path(name, version)
+        if not (path / METRICS_FILE).exists():
+            return None
+        import joblib
+        model = joblib.load(path / MODEL_FILE, mmap_mode='r')
+        with open(path / METRICS_FILE) as f:
+            metrics = json.load(f)
+        return ModelArtifact(name, version, model, metrics, from_cache=True)
+
+    def save(self, name, version, model, metrics):
+        """Persist an artifact and drop older versions of the same model"""
+        path = self._path(name, version)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        import joblib
+        staging = Path(tempfile.mkdtemp(prefix=f'.{version}-', dir=path.parent))
+        try:
+            joblib.dump(model, staging / MODEL_FILE)
+            # Metrics are written last; their presence marks a complete artifact
+            with open(staging / METRICS_FILE, 'w') as f:
+                json.dump(metrics, f)
+            os.replace(staging, path)
+        except OSError:
+            if not (path / METRICS_FILE).exists():
+                raise
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+        for stale in path.parent.iterdir():
+            if stale.name != version and not stale.name.startswith('.'):
+                shutil.rmtree(stale, ignore_errors=True)
+
+    def is_warm(self, name, params):
+        """Whether a current artifact exists for ``name`` and ``params``"""
+        return (self._path(name, model_version(name, params)) / METRICS_FILE).exists()
+
+    def get_or_train(self, name, params, train):
+        """Return the artifact for ``params``, calling ``train(**params)`` once
+
+        ``train`` returns ``(model, metrics)``; the training time is added to
+        the metrics before they are stored.
+        """
+        version = model_version(name, params)
+        with self._lock:
+            key_lock = self._locks.setdefault((name, version), threading.Lock())
+
+        with key_lock:
+            artifact = self._loaded.get((name, version))
+            if artifact is not None:
+                MODEL_CACHE_REQUESTS.inc(result='memory')
+                return ModelArtifact(name, version, artifact.model, artifact.metrics, from_cache=True)
+
+            artifact = self.load(name, version)
+            if artifact is None:
+                MODEL_CACHE_REQUESTS.inc(result='trained')
+                start = time.perf_counter()
+                model, metrics = train(**params)
+                metrics['training_seconds'] = time.perf_counter() - start
+                MODEL_TRAINING_SECONDS.observe(metrics['training_seconds'], model=name)
+                metrics['trained_at'] = time.strftime('%Y-%m-%d %H:%M:%S')
+                self.save(name, version, model, metrics)
+                artifact = ModelArtifact(name, version, model, metrics, from_cache=False)
+            else:
+                MODEL_CACHE_REQUESTS.inc(result='disk')
+
+            with self._lock:
+                self._loaded = {
+                    key: value for key, value in self._loaded.items() if key[0] != name
+                }
+                self._loaded[(name, version)] = artifact
+            return artifact
+
+
+_model_registry = None
+_model_registry_lock = threading.Lock()
+
+
+def get_model_registry():
+    """Process-wide registry shared by all Streamlit sessions"""
+    global _model_registry
+    with _model_registry_lock:
+        if _model_registry is None:
+            _model_registry = ModelRegistry()
+        return _model_registry
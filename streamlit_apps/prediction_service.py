@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Prediction service for the ML Hub churn model
+Serves the registry's churn classifier over HTTP. Concurrent requests are
+micro-batched into a single vectorized predict call, and request latency
+and throughput are reported on /stats.
+
+POST /predict  JSON {"rows": [[...], ...]} or CSV (header row optional)
+GET  /stats    p50/p99 latency, rows/s, batch sizes
+GET  /health   liveness
+"""
+
+import argparse
+import collections
+import io
+import json
+import os
+import queue
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from model_registry import get_model_registry
+from training import CLASSIFIER_NAME, CLASSIFIER_PARAMS, train_random_forest
+
+MAX_BATCH_ROWS = int(os.environ.get('PREDICTION_MAX_BATCH_ROWS', 4096))
+MAX_WAIT_MS = float(os.environ.get('PREDICTION_MAX_WAIT_MS', 5))
+MAX_BODY_BYTES = 32 * 1024**2
+
+# Latencies kept for the percentile window on /stats
+LATENCY_WINDOW = 10_000
+
+
+class PendingRequest:
+    """Rows from one HTTP request waiting for their slice of a batch result"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.done = threading.Event()
+        self.predictions = None
+        self.probabilities = None
+        self.error = None
+
+
+class MicroBatcher:
+    """Coalesces concurrent requests into one ``predict_proba`` call
+
+    The worker blocks for the first request, then keeps collecting until
+    ``max_batch_rows`` rows are queued or ``max_wait_ms`` has elapsed.
+    """
+
+    def __init__(self, model, max_batch_rows=MAX_BATCH_ROWS, max_wait_ms=MAX_WAIT_MS):
+        self.model = model
+        self.max_batch_rows = max_batch_rows
+        self.max_wait = max_wait_ms / 1000
+        self.batches = 0
+        self.batched_rows = 0
+        self._queue = queue.Queue()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def predict(self, rows):
+        pending = PendingRequest(rows)
+        self._queue.put(pending)
+        pending.done.wait()
+        if pending.error is not None:
+            raise pending.error
+        return pending.predictions, pending.probabilities
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        rows = len(batch[0].rows)
+        deadline = time.perf_counter() + self.max_wait
+        while rows < self.max_batch_rows:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                pending = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(pending)
+            rows += len(pending.rows)
+        return batch
+
+    def _predict(self, batch):
+        """Run one ``predict_proba`` over ``batch`` and hand each request its slice"""
+        probabilities = self.model.predict_proba(np.vstack([p.rows for p in batch]))
+        predictions = self.model.classes_[probabilities.argmax(axis=1)]
+        offset = 0
+        for pending in batch:
+            end = offset + len(pending.rows)
+            pending.predictions = predictions[offset:end]
+            pending.probabilities = probabilities[offset:end]
+            offset = end
+        self.batches += 1
+        self.batched_rows += offset
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            try:
+                self._predict(batch)
+            except Exception:
+                # Retry one by one, so a bad request only fails itself
+                for pending in batch:
+                    try:
+                        self._predict([pending])
+                    except Exception as e:
+                        pending.error = e
+            for pending in batch:
+                pending.done.set()
+
+
+class LatencyStats:
+    """Rolling request latencies plus lifetime request and row counts"""
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self.latencies = collections.deque(maxlen=window)
+        self.requests = 0
+        self.rows = 0
+        self.started = time.time()
+        self._lock = threading.Lock()
+
+    def record(self, seconds, rows):
+        with self._lock:
+            self.latencies.append(seconds)
+            self.requests += 1
+            self.rows += rows
+
+    def snapshot(self, batcher):
+        with self._lock:
+            latencies = np.array(self.latencies) * 1000
+            uptime = time.time() - self.started
+            return {
+                'requests': self.requests,
+                'rows': self.rows,
+                'rows_per_second': self.rows / uptime if uptime > 0 else 0.0,
+                'latency_ms_p50': float(np.percentile(latencies, 50)) if len(latencies) else None,
+                'latency_ms_p99': float(np.percentile(latencies, 99)) if len(latencies) else None,
+                'batches': batcher.batches,
+                'mean_batch_rows': batcher.batched_rows / batcher.batches if batcher.batches else None,
+                'uptime_seconds': uptime,
+            }
+
+
+def parse_rows(body, content_type, n_features):
+    """Decode a JSON or CSV request body into a 2-D float array"""
+    if 'csv' in content_type:
+        text = body.decode()
+        try:
+            rows = np.loadtxt(io.StringIO(text), delimiter=',', ndmin=2)
+        except ValueError:
+            # The first line is a header row
+            rows = np.loadtxt(io.StringIO(text), delimiter=',', skiprows=1, ndmin=2)
+    else:
+        payload = json.loads(body)
+        rows = np.asarray(payload['rows'] if isinstance(payload, dict) else payload, dtype=np.float64)
+        if rows.ndim == 1:
+            rows = rows.reshape(1, -1)
+
+    if rows.ndim != 2 or rows.shape[1] != n_features:
+        raise ValueError(f"Expected rows of {n_features} features, got shape {rows.shape}")
+    if not np.isfinite(rows).all():
+        raise ValueError("Rows must not contain NaN or infinite values")
+    return rows
+
+
+class PredictionHandler(BaseHTTPRequestHandler):
+    batcher = None
+    stats = None
+    n_features = None
+    model_version = None
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == '/health':
+            self._send_json(200, {'status': 'ok', 'model_version': self.model_version})
+        elif self.path == '/stats':
+            self._send_json(200, self.stats.snapshot(self.batcher))
+        else:
+            self._send_json(404, {'error': 'not found'})
+
+    def do_POST(self):
+        if self.path != '/predict':
+            self._send_json(404, {'error': 'not found'})
+            return
+
+        start = time.perf_counter()
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            if length < 0:
+                raise ValueError("Content-Length must not be negative")
+            if length > MAX_BODY_BYTES:
+                self._send_json(413, {'error': 'request body too large'})
+                return
+            rows = parse_rows(self.rfile.read(length), self.headers.get('Content-Type', ''), self.n_features)
+        except (ValueError, KeyError, TypeError) as e:
+            self._send_json(400, {'error': str(e)})
+            return
+
+        try:
+            predictions, probabilities = self.batcher.predict(rows)
+        except Exception as e:
+            self._send_json(500, {'error': str(e)})
+            return
+
+        self.stats.record(time.perf_counter() - start, len(rows))
+        self._send_json(200, {
+            'model_version': self.model_version,
+            'predictions': predictions.tolist(),
+            'probabilities': probabilities[:, 1].tolist(),
+        })
+
+    def log_message(self, format, *args):
+        # Per-request access logs would dominate the cost of small predictions
+        pass
+
+
+def create_server(port, host='0.0.0.0'):
+    """Load the churn model once and bind the prediction server"""
+    artifact = get_model_registry().get_or_train(CLASSIFIER_NAME, CLASSIFIER_PARAMS, train_random_forest)
+
+    PredictionHandler.batcher = MicroBatcher(artifact.model)
+    PredictionHandler.stats = LatencyStats()
+    PredictionHandler.n_features = artifact.model.n_features_in_
+    PredictionHandler.model_version = artifact.version
+
+    server = ThreadingHTTPServer((host, port), PredictionHandler)
+    server.daemon_threads = True
+    return server
+
+
+def run_prediction_server(port=None):
+    """Serve predictions until interrupted"""
+    port = port or int(os.environ.get('PREDICTION_PORT', 8090))
+    server = create_server(port)
+    print(f"Prediction service running on port {port}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Churn model prediction service")
+    parser.add_argument('--port', type=int, default=None)
+    args = parser.parse_args()
+    run_prediction_server(args.port)
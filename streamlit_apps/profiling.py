@@ -0,0 +1,238 @@
+"""
+Per-rerun profiling for the ML Hub
+Every widget change reruns the whole script, so this times each rerun as
+a tree: top-level phases marked in ``main.py`` (setup, sidebar, the page,
+footer) with nested sections for dataset loads, model fits and chart
+builds, which the ``metrics`` timers report here as well. cProfile and
+tracemalloc can be switched on per rerun for function and allocation
+top-lists.
+
+Off by default. Enable with ``ML_HUB_PROFILE`` or the ``?profile=`` query
+parameter: ``1``/``timers`` for timers only, or a comma-separated list
+such as ``cprofile,tracemalloc``.
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+import pandas as pd
+
+import metrics
+
+PROFILE_ENV = os.environ.get('ML_HUB_PROFILE', '')
+
+# Rows shown in the function and allocation top-lists
+TOP_ROWS = 15
+
+_current = threading.local()
+
+# Unfinished profilers by script thread. A run that ends in st.stop() or a
+# rerun never reaches finish(); it is cleaned up by the next start_rerun.
+_active = {}
+_active_lock = threading.Lock()
+_tracing_users = 0
+
+
+def parse_modes(value):
+    """Profiling modes requested by an env var or query parameter value"""
+    modes = {mode.strip().lower() for mode in (value or '').split(',') if mode.strip()}
+    if not modes or modes <= {'0', 'false', 'off'}:
+        return set()
+    return {'timers'} | (modes & {'cprofile', 'tracemalloc'})
+
+
+class Section:
+    def __init__(self, name, start, depth):
+        self.name = name
+        self.start = start
+        self.end = None
+        self.depth = depth
+        self.children = []
+
+
+class RerunProfiler:
+    """Timers (and optionally cProfile and tracemalloc) for one script run
+
+    Sections time the current thread only. tracemalloc traces the whole
+    process, so allocations of concurrent sessions show up as well.
+    """
+
+    def __init__(self, modes):
+        global _tracing_users
+        self.modes = modes
+        self.start = time.perf_counter()
+        self.root = Section('rerun', self.start, -1)
+        self._stack = [self.root]
+        self._profile = None
+        if 'cprofile' in modes:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        if 'tracemalloc' in modes:
+            with _active_lock:
+                _tracing_users += 1
+                if not tracemalloc.is_tracing():
+                    tracemalloc.start()
+            tracemalloc.reset_peak()
+        self.phase('Setup')
+
+    def _open(self, name):
+        parent = self._stack[-1]
+        section = Section(name, time.perf_counter(), parent.depth + 1)
+        parent.children.append(section)
+        self._stack.append(section)
+        return section
+
+    def _close(self):
+        self._stack.pop().end = time.perf_counter()
+
+    def phase(self, name):
+        """End the running phase and start a top-level one named ``name``"""
+        while len(self._stack) > 1:
+            self._close()
+        self._open(name)
+
+    @contextmanager
+    def section(self, name):
+        """Time the ``with`` block as a child of the open section"""
+        self._open(name)
+        try:
+            yield
+        finally:
+            self._close()
+
+    def _release(self):
+        """Stop cProfile, and tracemalloc once no other run uses it"""
+        global _tracing_users
+        if self._profile is not None:
+            self._profile.disable()
+        if 'tracemalloc' in self.modes:
+            with _active_lock:
+                _tracing_users -= 1
+                if not _tracing_users:
+                    tracemalloc.stop()
+
+    def finish(self):
+        """Stop profiling and return a ``ProfileReport``"""
+        while len(self._stack) > 1:
+            self._close()
+        self.root.end = time.perf_counter()
+        _current.profiler = None
+        with _active_lock:
+            _active.pop(threading.current_thread(), None)
+
+        functions = allocations = peak = None
+        if self._profile is not None:
+            self._profile.disable()
+            functions = function_stats(self._profile)
+        if 'tracemalloc' in self.modes:
+            allocations = allocation_stats(tracemalloc.take_snapshot())
+            _, peak = tracemalloc.get_traced_memory()
+        self._release()
+        return ProfileReport(self.root, functions, allocations, peak)
+
+
+class ProfileReport:
+    def __init__(self, root, functions=None, allocations=None, peak_bytes=None):
+        self.root = root
+        self.functions = functions
+        self.allocations = allocations
+        self.peak_bytes = peak_bytes
+
+    @property
+    def seconds(self):
+        return self.root.end - self.root.start
+
+    def sections(self):
+        """One row per section: name, depth, start and duration in ms"""
+        rows = []
+
+        def walk(section, path):
+            for child in section.children:
+                rows.append({
+                    'Section': child.name,
+                    'Path': ' › '.join(path + [child.name]),
+                    'Depth': child.depth,
+                    'Start (ms)': (child.start - self.root.start) * 1000,
+                    'Duration (ms)': (child.end - child.start) * 1000,
+                })
+                walk(child, path + [child.name])
+
+        walk(self.root, [])
+        frame = pd.DataFrame(rows, columns=['Section', 'Path', 'Depth', 'Start (ms)', 'Duration (ms)'])
+        frame['Share'] = frame['Duration (ms)'] / max(self.seconds * 1000, 1e-9)
+        return frame
+
+
+def function_stats(profile, top=TOP_ROWS):
+    """Functions with the largest cumulative time in a cProfile run"""
+    stats = pstats.Stats(profile, stream=io.StringIO())
+    rows = [
+        {
+            'Function': f"{func} ({os.path.basename(filename)}:{line})",
+            'Calls': calls,
+            'Own (ms)': own * 1000,
+            'Cumulative (ms)': cumulative * 1000,
+        }
+        for (filename, line, func), (_, calls, own, cumulative, _) in stats.stats.items()
+    ]
+    frame = pd.DataFrame(rows, columns=['Function', 'Calls', 'Own (ms)', 'Cumulative (ms)'])
+    return frame.sort_values('Cumulative (ms)', ascending=False).head(top).reset_index(drop=True)
+
+
+def allocation_stats(snapshot, top=TOP_ROWS):
+    """Source lines holding the most traced memory"""
+    snapshot = snapshot.filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap*>'),
+    ])
+    return pd.DataFrame([
+        {
+            'Location': f"{os.path.basename(stat.traceback[0].filename)}:{stat.traceback[0].lineno}",
+            'Size (KB)': stat.size / 1024,
+            'Blocks': stat.count,
+        }
+        for stat in snapshot.statistics('lineno')[:top]
+    ], columns=['Location', 'Size (KB)', 'Blocks'])
+
+
+def start_rerun(query_value=None):
+    """Profiler for this script run, or None when profiling is off"""
+    thread = threading.current_thread()
+    with _active_lock:
+        stale = [t for t in _active if t is thread or not t.is_alive()]
+        stale = [_active.pop(t) for t in stale]
+    for profiler in stale:
+        profiler._release()
+
+    modes = parse_modes(query_value) or parse_modes(PROFILE_ENV)
+    _current.profiler = RerunProfiler(modes) if modes else None
+    if _current.profiler is not None:
+        with _active_lock:
+            _active[thread] = _current.profiler
+    return _current.profiler
+
+
+def current():
+    """The profiler of the script run on this thread, if any"""
+    return getattr(_current, 'profiler', None)
+
+
+def phase(name):
+    profiler = current()
+    if profiler is not None:
+        profiler.phase(name)
+
+
+def section(name):
+    """``RerunProfiler.section`` on this thread's profiler, or a no-op"""
+    profiler = current()
+    return profiler.section(name) if profiler is not None else nullcontext()
+
+
+metrics.section_hook = section
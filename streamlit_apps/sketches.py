@@ -0,0 +1,212 @@
+"""
+One-pass value sketches for non-numeric columns
+Space-Saving keeps the heavy hitters, a Count-Min sketch tightens their
+counts and HyperLogLog estimates the number of distinct values, all in
+memory that does not grow with the column's cardinality. Each chunk is
+factorized once and its distinct values hashed with
+``pandas.util.hash_pandas_object``, so every update is vectorized.
+"""
+
+import numpy as np
+import pandas as pd
+
+TOP_K = 20
+
+# Space-Saving monitors this many candidates per requested top value
+SPACE_SAVING_FACTOR = 10
+
+COUNT_MIN_WIDTH = 2 ** 14
+COUNT_MIN_DEPTH = 4
+
+# 2 ** HLL_PRECISION registers; relative error about 1.04 / sqrt(registers)
+HLL_PRECISION = 14
+
+
+def hash_values(values):
+    """64-bit hashes of a Series of values"""
+    return pd.util.hash_pandas_object(values, index=False).to_numpy()
+
+
+def _distinct_counts(values):
+    """Distinct values of one chunk with their exact counts, most frequent first
+
+    Values are factorized once; only the distinct values are hashed.
+    """
+    codes, uniques = pd.factorize(values)
+    # Plain arrays, so categoricals hash and merge like their string values
+    uniques = pd.Index(np.asarray(uniques))
+    counts = pd.Series(np.bincount(codes, minlength=len(uniques)), index=uniques)
+    return counts.sort_values(ascending=False, kind='stable')
+
+
+class SpaceSaving:
+    """Mergeable Space-Saving summary of the most frequent values
+
+    Each chunk is counted exactly, cut to ``capacity`` values and merged
+    into the summary. Monitored counts never underestimate; ``floor`` bounds
+    the count of any value that is not monitored, and ``errors`` the
+    overestimate of each monitored count.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.counts = pd.Series(dtype=np.int64)
+        self.errors = pd.Series(dtype=np.int64)
+        self.floor = 0
+
+    @property
+    def exact(self):
+        return self.floor == 0
+
+    def update(self, counts):
+        """Merge exact ``counts`` of a chunk (sorted, most frequent first)"""
+        chunk_floor = int(counts.iloc[self.capacity]) if len(counts) > self.capacity else 0
+        counts = counts.iloc[:self.capacity]
+
+        index = self.counts.index.union(counts.index, sort=False)
+        in_chunk = index.isin(counts.index)
+        merged = (self.counts.reindex(index, fill_value=self.floor)
+                  + counts.reindex(index, fill_value=chunk_floor))
+        errors = self.errors.reindex(index, fill_value=self.floor) + np.where(in_chunk, 0, chunk_floor)
+
+        order = merged.sort_values(ascending=False, kind='stable')
+        dropped = int(order.iloc[self.capacity]) if len(order) > self.capacity else 0
+        keep = order.index[:self.capacity]
+        self.counts = merged[keep].astype(np.int64)
+        self.errors = errors[keep].astype(np.int64)
+        self.floor = max(self.floor + chunk_floor, dropped)
+
+
+class CountMinSketch:
+    """Count-Min sketch over 64-bit value hashes
+
+    Estimates never underestimate, and exceed the true count by more than
+    ``e / width`` of the total with probability at most ``exp(-depth)``.
+    """
+
+    def __init__(self, width=COUNT_MIN_WIDTH, depth=COUNT_MIN_DEPTH, seed=0):
+        self.width = width
+        self.shift = np.uint64(64 - int(np.log2(width)))
+        self.table = np.zeros((depth, width), dtype=np.int64)
+        rng = np.random.default_rng(seed)
+        # Odd multipliers for multiply-shift hashing, one per row
+        self.multipliers = rng.integers(1, 2 ** 63, size=depth, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+
+    def _columns(self, hashes):
+        with np.errstate(over='ignore'):
+            return ((hashes[None, :] * self.multipliers[:, None]) >> self.shift).astype(np.intp)
+
+    def update(self, hashes, counts=None):
+        for row, columns in zip(self.table, self._columns(hashes)):
+            row += np.bincount(columns, weights=counts, minlength=self.width).astype(np.int64)
+
+    def estimate(self, hashes):
+        columns = self._columns(hashes)
+        return np.min(np.take_along_axis(self.table, columns, axis=1), axis=0)
+
+
+class HyperLogLog:
+    """HyperLogLog distinct-count estimator over 64-bit value hashes"""
+
+    def __init__(self, precision=HLL_PRECISION):
+        self.precision = precision
+        self.registers = np.zeros(2 ** precision, dtype=np.uint8)
+
+    def update(self, hashes):
+        bits = 64 - self.precision
+        index = (hashes >> np.uint64(bits)).astype(np.intp)
+        rest = hashes & np.uint64((1 << bits) - 1)
+        # Rank is the position of the leftmost 1-bit in the remaining bits
+        _, exponent = np.frexp(rest.astype(np.float64))
+        rank = np.where(rest > 0, bits - exponent + 1, bits + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def estimate(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            # Linear counting is more accurate for small cardinalities
+            return m * np.log(m / zeros)
+        return raw
+
+
+class ColumnSketch:
+    """Top values and distinct count of one column, built chunk by chunk"""
+
+    def __init__(self, top_k=TOP_K, capacity_factor=SPACE_SAVING_FACTOR):
+        self.top_k = top_k
+        self.count = 0
+        self.space_saving = SpaceSaving(top_k * capacity_factor)
+        self.count_min = CountMinSketch()
+        self.hll = HyperLogLog()
+
+    @property
+    def exact(self):
+        """Whether every distinct value is monitored, so counts are exact"""
+        return self.space_saving.exact
+
+    @property
+    def error_bound(self):
+        """Largest possible overestimate of a reported count"""
+        return int(self.space_saving.errors.max()) if len(self.space_saving.errors) else 0
+
+    def update(self, values):
+        """Add a chunk of non-null values"""
+        if not len(values):
+            return
+        counts = _distinct_counts(values)
+        hashes = hash_values(pd.Series(counts.index.to_numpy()))
+        self.count_min.update(hashes, counts.to_numpy())
+        self.hll.update(hashes)
+        self.space_saving.update(counts)
+        self.count += len(values)
+
+    @property
+    def distinct(self):
+        if self.exact:
+            return len(self.space_saving.counts)
+        return int(round(self.hll.estimate()))
+
+    def top(self, k=None):
+        """``(value, count)`` pairs of the ``k`` most frequent values
+
+        Both sketches overestimate, so each count is the smaller of the two.
+        """
+        counts = self.space_saving.counts
+        if not len(counts):
+            return []
+        if not self.exact:
+            # Re-infer the dtype the values were hashed with (e.g. datetimes)
+            candidates = pd.Series(counts.index.to_numpy()).infer_objects()
+            counts = pd.Series(
+                np.minimum(counts.to_numpy(), self.count_min.estimate(hash_values(candidates))),
+                index=counts.index,
+            ).sort_values(ascending=False, kind='stable')
+        return list(counts.head(k or self.top_k).items())
+
+    def top_frame(self, k=None):
+        """Top ``k`` values with the remaining rows folded into one "Other" bar"""
+        top = self.top(k)
+        other = self.count - sum(count for _, count in top)
+        frame = pd.DataFrame({
+            'Value': [str(value) for value, _ in top],
+            'Count': [count for _, count in top],
+        })
+        if other > 0:
+            remaining = max(self.distinct - len(top), 1)
+            approx = '' if self.exact else '~'
+            frame.loc[len(frame)] = [f"Other ({approx}{remaining:,} value{'s' if remaining > 1 else ''})", other]
+        return frame
+
+    def describe(self, name):
+        """Summary in the shape of ``Series.describe()`` for a string column"""
+        top = self.top(1)
+        top_value, top_freq = top[0] if top else (None, 0)
+        return pd.Series({
+            'count': self.count,
+            'unique' if self.exact else 'unique (approx.)': self.distinct,
+            'top': top_value,
+            'freq': top_freq,
+        }, name=name)
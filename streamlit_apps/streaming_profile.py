@@ -0,0 +1,186 @@
+"""
+Streaming dataset profile for the ML Hub Data Analytics page
+Reads an upload in bounded-size chunks and accumulates the overview
+statistics incrementally, so peak memory follows the chunk size rather
+than the file size.
+"""
+
+import numpy as np
+import pandas as pd
+
+from correlation import CorrelationAccumulator
+from loaders import DEFAULT_CHUNK_ROWS, iter_chunks
+from sketches import TOP_K, ColumnSketch
+
+HISTOGRAM_BINS = 30
+
+
+class ColumnMoments:
+    """Running count, mean, variance, min and max for a numeric column
+
+    ``min`` and ``max`` cover the finite values only, and stay infinite if
+    there are none.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, values):
+        """Merge a chunk of non-null values (Chan et al. parallel update)"""
+        n = len(values)
+        if n == 0:
+            return
+        total = self.count + n
+        # Infinite values make the mean infinite and the variance NaN, as in pandas
+        with np.errstate(invalid='ignore'):
+            chunk_mean = values.mean()
+            chunk_m2 = ((values - chunk_mean) ** 2).sum()
+            delta = chunk_mean - self.mean
+            self.mean += delta * n / total
+            self.m2 += chunk_m2 + delta ** 2 * self.count * n / total
+        self.count = total
+        # Infinities would make the histogram range unusable; min/max are over finite values
+        finite = values[np.isfinite(values)]
+        if len(finite):
+            self.min = min(self.min, finite.min())
+            self.max = max(self.max, finite.max())
+
+    @property
+    def std(self):
+        if self.count < 2:
+            return np.nan
+        return np.sqrt(self.m2 / (self.count - 1))
+
+
+class DatasetProfile:
+    """Overview statistics accumulated over a chunked read"""
+
+    def __init__(self):
+        self.rows = 0
+        self.chunks = 0
+        self.columns = []
+        self.dtypes = {}
+        self.null_counts = {}
+        self.moments = {}
+        self.top_values = {}
+        self.histograms = {}
+        self.correlation = None
+        self.peak_chunk_bytes = 0
+
+    @property
+    def numeric_columns(self):
+        return [col for col in self.columns if col in self.moments]
+
+    def dtype_summary(self):
+        """Column count per dtype, matching ``df.dtypes.value_counts()``"""
+        return pd.Series(self.dtypes).astype(str).value_counts()
+
+    def missing_values(self):
+        return int(sum(self.null_counts.values()))
+
+    def describe(self, column):
+        """Summary for one column in the shape of ``Series.describe()``"""
+        if column in self.moments:
+            moments = self.moments[column]
+            return pd.Series({
+                'count': moments.count,
+                'mean': moments.mean,
+                'std': moments.std,
+                'min': moments.min,
+                'max': moments.max,
+            }, name=column)
+
+        return self.top_values[column].describe(column)
+
+
+def _is_numeric(dtype):
+    return pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)
+
+
+def _merge_dtype(previous, current):
+    """Dtype a column would get if all chunks were parsed together"""
+    if previous is None or previous == current:
+        return current
+    if _is_numeric(previous) and _is_numeric(current):
+        return np.promote_types(previous, current)
+    return np.dtype(object)
+
+
+def profile_table(source, fmt='csv', sheet=None, chunk_rows=DEFAULT_CHUNK_ROWS,
+                  bins=HISTOGRAM_BINS, top_k=TOP_K):
+    """Profile a CSV/Excel path or seekable file object in two chunked passes
+
+    The first pass collects row/null counts, dtypes, moments and value
+    sketches; the second bins the numeric columns into histograms over the
+    observed range and accumulates the correlation matrix.
+    """
+    profile = DatasetProfile()
+    numeric = {}
+
+    for chunk in iter_chunks(source, fmt, sheet=sheet, chunk_rows=chunk_rows):
+        if not profile.columns:
+            profile.columns = list(chunk.columns)
+            for col in profile.columns:
+                profile.null_counts[col] = 0
+                numeric[col] = True
+
+        profile.rows += len(chunk)
+        profile.chunks += 1
+        profile.peak_chunk_bytes = max(profile.peak_chunk_bytes, int(chunk.memory_usage(deep=True).sum()))
+
+        for col in profile.columns:
+            series = chunk[col]
+            profile.null_counts[col] += int(series.isna().sum())
+            if not _is_numeric(series.dtype) and not series.isna().all():
+                numeric[col] = False
+            profile.dtypes[col] = _merge_dtype(profile.dtypes.get(col), series.dtype)
+
+            values = series.dropna()
+            if numeric[col]:
+                profile.moments.setdefault(col, ColumnMoments()).update(values.to_numpy(dtype=np.float64))
+            else:
+                profile.top_values.setdefault(col, ColumnSketch(top_k)).update(values)
+
+    # Columns that turned non-numeric part-way through are recounted as categoricals
+    mixed = [col for col in profile.columns if not numeric[col] and col in profile.moments]
+    for col in mixed:
+        del profile.moments[col]
+        profile.top_values[col] = ColumnSketch(top_k)
+
+    numeric_cols = profile.numeric_columns
+    if not numeric_cols and not mixed:
+        return profile
+
+    histograms = {}
+    for col in numeric_cols:
+        moments = profile.moments[col]
+        if np.isfinite(moments.min):
+            edges = np.histogram_bin_edges([], bins=bins, range=(moments.min, moments.max))
+            histograms[col] = (np.zeros(bins, dtype=np.int64), edges)
+
+    correlation = CorrelationAccumulator(
+        numeric_cols, shift=[profile.moments[col].mean for col in numeric_cols]
+    )
+
+    for chunk in iter_chunks(source, fmt, sheet=sheet, chunk_rows=chunk_rows, usecols=numeric_cols + mixed):
+        for col in mixed:
+            profile.top_values[col].update(chunk[col].dropna().astype(str))
+
+        if not numeric_cols:
+            continue
+
+        for col, (counts, edges) in histograms.items():
+            values = chunk[col].to_numpy(dtype=np.float64)
+            counts += np.histogram(values[np.isfinite(values)], bins=edges)[0]
+
+        correlation.update(chunk[numeric_cols].to_numpy(dtype=np.float64))
+
+    profile.histograms = histograms
+    if len(numeric_cols) > 1:
+        profile.correlation = correlation
+
+    return profile
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Multi-worker supervisor for the ML Hub
+Runs N Streamlit processes on their own ports so sessions do not share one
+interpreter and GIL, restarts any that exit, and puts a sticky TCP proxy
+on the public port. A session's websocket, file uploads and reconnects
+must reach the process that holds its state, so the first response sets a
+worker cookie; clients without it are placed by rendezvous hashing of
+their address over the healthy workers.
+
+Each worker serves its own health and metrics on its port plus
+WORKER_HEALTH_PORT_OFFSET once its first session has run; the
+supervisor's /metrics merges them with a ``process`` label.
+"""
+
+import os
+import secrets
+import signal
+import socket
+import socketserver
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+import zlib
+
+from metrics import REGISTRY, merge_expositions
+
+WORKERS = int(os.environ.get('ML_HUB_WORKERS', 1))
+WORKER_BASE_PORT = int(os.environ.get('ML_HUB_WORKER_PORT', 8501))
+BASE_URL_PATH = 'ml'
+WORKER_HEALTH_PORT_OFFSET = 1000
+
+# Seconds between worker health probes
+PROBE_INTERVAL = 5
+PROBE_TIMEOUT = 2
+
+# Restart backoff doubles per consecutive crash; a worker that stayed up
+# this long counts as stable again
+MAX_RESTART_DELAY = 30
+STABLE_SECONDS = 60
+
+WORKER_COOKIE = 'ml_hub_worker'
+MAX_HEAD_BYTES = 64 * 1024
+BUFFER_BYTES = 64 * 1024
+
+
+class Worker:
+    """One Streamlit process and its restart bookkeeping"""
+
+    def __init__(self, index, port, env, address='127.0.0.1'):
+        self.index = index
+        self.port = port
+        self.env = env
+        self.address = address
+        self.health_port = port + WORKER_HEALTH_PORT_OFFSET
+        self.process = None
+        self.started_at = None
+        self.restarts = 0
+        self.crashes = 0
+        self.last_exit = None
+        self.healthy = False
+        self.next_start = 0.0
+
+    def command(self):
+        return [
+            sys.executable, "-m", "streamlit", "run", "main.py",
+            "--server.port", str(self.port),
+            "--server.address", self.address,
+            "--server.baseUrlPath", BASE_URL_PATH,
+            "--server.headless", "true",
+        ]
+
+    def start(self):
+        cmd = self.command()
+        print(f"Starting worker {self.index}: {' '.join(cmd)}")
+        self.process = subprocess.Popen(cmd, env=self.env)
+        self.started_at = time.monotonic()
+        self.healthy = False
+
+    @property
+    def running(self):
+        return self.process is not None and self.process.poll() is None
+
+    def probe(self):
+        """Ask Streamlit's own health endpoint whether the worker serves"""
+        url = f"http://127.0.0.1:{self.port}/{BASE_URL_PATH}/_stcore/health"
+        try:
+            with urllib.request.urlopen(url, timeout=PROBE_TIMEOUT) as response:
+                self.healthy = response.status == 200
+        except OSError:
+            self.healthy = False
+        return self.healthy
+
+    def scrape(self):
+        """The worker's /metrics text, or None if it does not answer"""
+        url = f"http://127.0.0.1:{self.health_port}/metrics"
+        try:
+            with urllib.request.urlopen(url, timeout=PROBE_TIMEOUT) as response:
+                return response.read().decode()
+        except OSError:
+            return None
+
+    def stop(self, timeout=10):
+        if not self.running:
+            return
+        self.process.terminate()
+        try:
+            self.process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+    def status(self):
+        return {
+            'worker': self.index,
+            'port': self.port,
+            'pid': self.process.pid if self.running else None,
+            'running': self.running,
+            'healthy': self.healthy,
+            'uptime_seconds': round(time.monotonic() - self.started_at, 1) if self.running else 0,
+            'restarts': self.restarts,
+            'last_exit': self.last_exit,
+        }
+
+
+class Supervisor:
+    """Starts the workers and keeps them running until shutdown"""
+
+    def __init__(self, workers=WORKERS, base_port=WORKER_BASE_PORT, public_port=None):
+        env = dict(os.environ)
+        # One cookie secret for all workers, so XSRF tokens survive a restart
+        env.setdefault('STREAMLIT_SERVER_COOKIE_SECRET', secrets.token_hex(32))
+        if workers == 1:
+            # A single worker serves the public port directly, without the proxy
+            ports = [public_port or base_port]
+        else:
+            ports = [base_port + i for i in range(workers)]
+        self.workers = [
+            Worker(i, port, {
+                **env, 'ML_HUB_WORKER': str(i),
+                'HEALTH_CHECK': 'true', 'HEALTH_CHECK_PORT': str(port + WORKER_HEALTH_PORT_OFFSET),
+            }, address='0.0.0.0' if workers == 1 else '127.0.0.1')
+            for i, port in enumerate(ports)
+        ]
+        self._stopping = threading.Event()
+        REGISTRY.callback('ml_hub_worker_up', "Whether the worker answers its health probe",
+                          lambda: {(str(w.index),): int(w.running and w.healthy) for w in self.workers},
+                          labelnames=['worker'])
+        REGISTRY.callback('ml_hub_worker_restarts_total', "Times the worker was restarted",
+                          lambda: {(str(w.index),): w.restarts for w in self.workers},
+                          kind='counter', labelnames=['worker'])
+
+    def healthy_workers(self):
+        return [worker for worker in self.workers if worker.running and worker.healthy]
+
+    def _check(self, worker):
+        now = time.monotonic()
+        if worker.running:
+            worker.probe()
+            return
+        if worker.process is not None and worker.next_start == 0.0:
+            # Just exited: schedule a restart with backoff
+            worker.last_exit = worker.process.returncode
+            worker.healthy = False
+            if now - worker.started_at >= STABLE_SECONDS:
+                worker.crashes = 0
+            delay = min(2 ** worker.crashes, MAX_RESTART_DELAY)
+            worker.crashes += 1
+            worker.next_start = now + delay
+            print(f"Worker {worker.index} exited with {worker.last_exit}, restarting in {delay}s")
+        if now >= worker.next_start:
+            if worker.process is not None:
+                worker.restarts += 1
+            worker.next_start = 0.0
+            worker.start()
+
+    def run(self):
+        """Start every worker and supervise them until ``stop``"""
+        for worker in self.workers:
+            worker.start()
+        while not self._stopping.wait(PROBE_INTERVAL if self.healthy_workers() else 1):
+            for worker in self.workers:
+                self._check(worker)
+
+    def stop(self):
+        self._stopping.set()
+        for worker in self.workers:
+            worker.stop()
+
+    def status(self):
+        healthy = len(self.healthy_workers())
+        return {
+            'healthy': healthy > 0,
+            'healthy_workers': healthy,
+            'workers': [worker.status() for worker in self.workers],
+        }
+
+    def metrics(self):
+        """This process's metrics merged with every worker's, labelled by process"""
+        expositions = {'supervisor': REGISTRY.render().decode()}
+        for worker in self.workers:
+            text = worker.scrape() if worker.running else None
+            if text is not None:
+                expositions[f'worker-{worker.index}'] = text
+        return merge_expositions(expositions)
+
+    def choose(self, client, cookie_index=None):
+        """Worker for a client: its cookie's worker if healthy, else by address hash"""
+        candidates = self.healthy_workers() or [w for w in self.workers if w.running]
+        if not candidates:
+            return None
+        for worker in candidates:
+            if worker.index == cookie_index:
+                return worker
+        return max(candidates, key=lambda w: zlib.crc32(f"{client}/{w.index}".encode()))
+
+
+def _header(head, name):
+    """Value of header ``name`` in a raw request head, or None"""
+    prefix = name.lower().encode() + b':'
+    for line in head.split(b'\r\n')[1:]:
+        if line.lower().startswith(prefix):
+            return line[len(prefix):].strip().decode('latin-1')
+    return None
+
+
+def _cookie_index(head):
+    for part in (_header(head, 'Cookie') or '').split(';'):
+        name, _, value = part.strip().partition('=')
+        if name == WORKER_COOKIE and value.isdigit():
+            return int(value)
+    return None
+
+
+def _read_head(sock):
+    """Bytes up to and including the end of the first HTTP head"""
+    data = b''
+    while b'\r\n\r\n' not in data and len(data) < MAX_HEAD_BYTES:
+        chunk = sock.recv(BUFFER_BYTES)
+        if not chunk:
+            break
+        data += chunk
+    return data
+
+
+def _pipe(source, target):
+    """Copy bytes from ``source`` to ``target`` until either side closes"""
+    try:
+        while True:
+            chunk = source.recv(BUFFER_BYTES)
+            if not chunk:
+                break
+            target.sendall(chunk)
+    except OSError:
+        pass
+    finally:
+        try:
+            target.shutdown(socket.SHUT_WR)
+        except OSError:
+            pass
+
+
+class StickyProxyHandler(socketserver.BaseRequestHandler):
+    """Routes one client connection to a worker and relays it both ways"""
+
+    def handle(self):
+        client = self.request
+        head = _read_head(client)
+        if not head:
+            return
+        cookie_index = _cookie_index(head)
+        # Behind the platform's load balancer the peer is the balancer itself
+        address = (_header(head, 'X-Forwarded-For') or self.client_address[0]).split(',')[0].strip()
+        worker = self.server.supervisor.choose(address, cookie_index)
+        if worker is None:
+            client.sendall(b'HTTP/1.1 503 Service Unavailable\r\nContent-Length: 0\r\nConnection: close\r\n\r\n')
+            return
+
+        try:
+            upstream = socket.create_connection(('127.0.0.1', worker.port), timeout=PROBE_TIMEOUT)
+        except OSError:
+            client.sendall(b'HTTP/1.1 502 Bad Gateway\r\nContent-Length: 0\r\nConnection: close\r\n\r\n')
+            return
+        upstream.settimeout(None)
+        with upstream:
+            upstream.sendall(head)
+            if cookie_index != worker.index:
+                # Pin the browser to this worker from its next request on
+                response = _read_head(upstream)
+                end = response.find(b'\r\n')
+                if end > 0:
+                    cookie = f"\r\nSet-Cookie: {WORKER_COOKIE}={worker.index}; Path=/; HttpOnly; SameSite=Lax"
+                    response = response[:end] + cookie.encode() + response[end:]
+                client.sendall(response)
+            replies = threading.Thread(target=_pipe, args=(upstream, client), daemon=True)
+            replies.start()
+            _pipe(client, upstream)
+            replies.join()
+
+
+class StickyProxy(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, port, supervisor, host='0.0.0.0'):
+        self.supervisor = supervisor
+        super().__init__((host, port), StickyProxyHandler)
+
+
+def run_workers(supervisor, public_port):
+    """Supervise the Streamlit workers, proxying ``public_port`` when there are several"""
+    def shutdown(signum, frame):
+        supervisor.stop()
+        sys.exit(0)
+
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+
+    if len(supervisor.workers) > 1:
+        proxy = StickyProxy(public_port, supervisor)
+        threading.Thread(target=proxy.serve_forever, daemon=True).start()
+        print(f"Sticky proxy on port {public_port} for {len(supervisor.workers)} workers")
+    supervisor.run()
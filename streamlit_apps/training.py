@@ -0,0 +1,62 @@
+"""
+Model training routines for the ML Hub
+Each trainer takes plain keyword parameters and returns the fitted model
+with a JSON-serializable metrics dict, so results can be stored by the
+model registry.
+"""
+
+CLASSIFIER_NAME = 'churn-random-forest'
+
+CLASSIFIER_PARAMS = {
+    'n_samples': 1000,
+    'n_features': 20,
+    'n_informative': 15,
+    'n_redundant': 5,
+    'n_estimators': 100,
+    'random_state': 42,
+}
+
+
+# Trees added per warm-start step when reporting training progress
+PROGRESS_STEPS = 10
+
+
+def train_random_forest(n_samples, n_features, n_informative, n_redundant, n_estimators, random_state,
+                        n_jobs=None, progress=None):
+    """Fit the demo churn classifier on synthetic data
+
+    With ``progress`` the forest is grown in warm-start steps and
+    ``progress(fraction)`` is called after each one; the fitted trees are
+    identical to a single fit with the same ``random_state``.
+    """
+    from sklearn.datasets import make_classification
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.metrics import accuracy_score, classification_report
+    from sklearn.model_selection import train_test_split
+
+    X, y = make_classification(n_samples=n_samples, n_features=n_features, n_informative=n_informative,
+                               n_redundant=n_redundant, random_state=random_state)
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=random_state)
+
+    model = RandomForestClassifier(n_estimators=n_estimators, random_state=random_state, n_jobs=n_jobs)
+    if progress is None:
+        model.fit(X_train, y_train)
+    else:
+        model.set_params(warm_start=True)
+        step = max(1, n_estimators // PROGRESS_STEPS)
+        for trees in range(step, n_estimators + step, step):
+            model.set_params(n_estimators=min(trees, n_estimators))
+            model.fit(X_train, y_train)
+            progress(model.n_estimators / n_estimators)
+        model.set_params(warm_start=False)
+    y_pred = model.predict(X_test)
+
+    metrics = {
+        'accuracy': float(accuracy_score(y_test, y_pred)),
+        'classification_report': classification_report(y_test, y_pred),
+        'train_samples': len(X_train),
+        'test_samples': len(X_test),
+        'feature_names': [f'Feature_{i}' for i in range(X.shape[1])],
+        'feature_importances': model.feature_importances_.tolist(),
+    }
+    return model, metrics
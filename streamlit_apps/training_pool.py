@@ -0,0 +1,173 @@
+"""
+Background training pool for the ML Hub
+Model fits run in a pool of spawned worker processes, each using several
+cores through ``n_jobs``, so a training job never holds the GIL of the
+Streamlit process that serves every session. Workers write the fitted
+model to the model registry and stream progress back over a queue.
+"""
+
+import atexit
+import functools
+import itertools
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from metrics import MODEL_TRAINING_SECONDS
+from model_registry import get_model_registry, model_version
+
+POOL_WORKERS = int(os.environ.get('ML_HUB_TRAINING_WORKERS', 2))
+
+# Cores given to each job so concurrent jobs do not oversubscribe the CPU
+JOB_CORES = max(1, (os.cpu_count() or 1) // POOL_WORKERS)
+
+# Finished job ids remembered to drop their late progress messages
+FINISHED_JOBS_KEPT = 1024
+
+_progress_queue = None
+
+
+def _init_worker(queue):
+    global _progress_queue
+    _progress_queue = queue
+
+
+def _report_progress(job_id, fraction):
+    _progress_queue.put((job_id, fraction))
+
+
+def _train_and_register(job_id, name, params, train):
+    """Worker entry point: fit the model and store it in the registry
+
+    Returns the version and the fit time, or None if it was already stored.
+    """
+    trainer = functools.partial(
+        train, n_jobs=JOB_CORES, progress=functools.partial(_report_progress, job_id)
+    )
+    artifact = get_model_registry().get_or_train(name, params, trainer)
+    _report_progress(job_id, 1.0)
+    return artifact.version, None if artifact.from_cache else artifact.metrics['training_seconds']
+
+
+def _record_training_time(name, future):
+    # Workers are separate processes; their own metrics are never scraped
+    if not future.cancelled() and future.exception() is None:
+        _, seconds = future.result()
+        if seconds is not None:
+            MODEL_TRAINING_SECONDS.observe(seconds, model=name)
+
+
+class TrainingJob:
+    """Handle on a submitted fit, polled by the page for progress and result"""
+
+    def __init__(self, job_id, name, version, future, pool):
+        self.id = job_id
+        self.name = name
+        self.version = version
+        self.future = future
+        self._pool = pool
+
+    @property
+    def progress(self):
+        return self._pool.progress.get(self.id, 0.0)
+
+    def done(self):
+        return self.future.done()
+
+    def wait(self, timeout=None):
+        """Block until the job finishes or ``timeout`` seconds pass; True if it finished"""
+        done, _ = wait([self.future], timeout=timeout)
+        return bool(done)
+
+    def result(self, timeout=None):
+        version, _ = self.future.result(timeout)
+        return version
+
+
+class TrainingPool:
+    """Process pool that deduplicates jobs for the same model version"""
+
+    def __init__(self, workers=POOL_WORKERS):
+        self.workers = workers
+        self.progress = {}
+        # Most recently finished job ids (as keys), under _progress_lock
+        self._finished = OrderedDict()
+        self._progress_lock = threading.Lock()
+        self._jobs = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._context = multiprocessing.get_context('spawn')
+        self._queue = self._context.Queue()
+        self._executor = None
+        threading.Thread(target=self._drain_progress, daemon=True).start()
+
+    def _drain_progress(self):
+        while True:
+            job_id, fraction = self._queue.get()
+            with self._progress_lock:
+                # Updates still queued when a job finishes must not bring its entry back
+                if job_id not in self._finished:
+                    self.progress[job_id] = fraction
+                elif fraction >= 1.0:
+                    # A worker's last message for the job; nothing more will come
+                    del self._finished[job_id]
+
+    def _finish(self, job_id, future):
+        with self._progress_lock:
+            self._finished[job_id] = None
+            if len(self._finished) > FINISHED_JOBS_KEPT:
+                self._finished.popitem(last=False)
+            self.progress.pop(job_id, None)
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=self._context,
+                initializer=_init_worker,
+                initargs=(self._queue,),
+            )
+        return self._executor
+
+    def submit(self, name, params, train):
+        """Queue a fit of ``train(**params)``, or return the job already running"""
+        version = model_version(name, params)
+        with self._lock:
+            job = self._jobs.get((name, version))
+            if job is not None and not job.done():
+                return job
+
+            job_id = next(self._ids)
+            try:
+                future = self._get_executor().submit(_train_and_register, job_id, name, params, train)
+            except BrokenProcessPool:
+                # A worker died (e.g. OOM-killed); start a fresh pool
+                self._executor = None
+                future = self._get_executor().submit(_train_and_register, job_id, name, params, train)
+
+            job = TrainingJob(job_id, name, version, future, self)
+            self._jobs[(name, version)] = job
+            future.add_done_callback(functools.partial(self._finish, job_id))
+            future.add_done_callback(functools.partial(_record_training_time, name))
+            return job
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_training_pool = None
+_training_pool_lock = threading.Lock()
+
+
+def get_training_pool():
+    """Process-wide pool shared by all Streamlit sessions"""
+    global _training_pool
+    with _training_pool_lock:
+        if _training_pool is None:
+            _training_pool = TrainingPool()
+            atexit.register(_training_pool.shutdown)
+        return _training_pool
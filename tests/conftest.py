@@ -0,0 +1,24 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# The deployment scripts are top-level modules in the project root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import do_client  # noqa: E402
+from do_fake_api import FakeDigitalOceanAPI  # noqa: E402
+
+
+@pytest.fixture
+def api():
+    with FakeDigitalOceanAPI(scale=0.01, retry_after=0.2) as api:
+        yield api
+
+
+@pytest.fixture
+def client(api, monkeypatch):
+    monkeypatch.setattr(do_client, "BACKOFF_BASE", 0.01)
+    client = do_client.DigitalOceanClient("test", base_url=api.url, max_retries=3)
+    yield client
+    client.close()
@@ -0,0 +1,192 @@
+import json
+import socket
+import time
+
+import pytest
+import requests
+
+import do_client
+from do_client import DigitalOceanClient
+from do_fake_api import FakeDigitalOceanAPI
+
+SPEC = {"name": "retry-test", "services": []}
+
+
+def unused_url():
+    """API URL on a port nothing listens on, so connections are refused"""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    return f"http://127.0.0.1:{port}/v2"
+
+
+def test_retry_after_is_honoured_on_429(api, client):
+    api.inject(429, 429)
+    start = time.monotonic()
+    response = client.get("/apps")
+    assert response.status_code == 200
+    assert api.requests["list_apps"] == 3
+    # Two waits of the fake's Retry-After: 0.2
+    assert time.monotonic() - start >= 0.4
+    assert client.stats()["GET /apps"]["retries"] == 2
+
+
+def test_post_is_retried_after_429(api, client):
+    # The API did not act on a rate-limited request, so any method may retry
+    api.inject(429)
+    response = client.post("/apps", json={"spec": SPEC})
+    assert response.status_code == 201
+    assert api.requests["create_app"] == 2
+    assert len(api.apps) == 1
+
+
+def test_get_is_retried_on_5xx(api, client):
+    api.inject(503, 502, 500)
+    response = client.get("/apps")
+    assert response.status_code == 200
+    assert api.requests["list_apps"] == 4
+
+
+def test_retries_give_up_with_the_last_response(api, client):
+    api.inject(*[503] * 10)
+    response = client.get("/apps")
+    assert response.status_code == 503
+    # The first attempt and max_retries more
+    assert api.requests["list_apps"] == 4
+
+
+def test_post_is_not_retried_on_5xx(api, client):
+    api.inject(503)
+    response = client.post("/apps", json={"spec": SPEC})
+    assert response.status_code == 503
+    assert api.requests["create_app"] == 1
+
+
+def test_get_is_retried_when_the_connection_drops(api, client):
+    api.inject("drop", "drop")
+    response = client.get("/apps")
+    assert response.status_code == 200
+    assert api.requests["list_apps"] == 3
+
+
+def test_post_is_not_duplicated_when_the_response_is_lost(api, client):
+    api.inject("drop")
+    with pytest.raises(requests.ConnectionError):
+        client.post("/apps", json={"spec": SPEC})
+    assert api.requests["create_app"] == 1
+    assert len(api.apps) == 1
+    stats = client.stats()["POST /apps"]
+    assert (stats["count"], stats["errors"]) == (1, 1)
+
+
+def test_post_is_retried_when_never_sent(monkeypatch):
+    monkeypatch.setattr(do_client, "BACKOFF_BASE", 0.01)
+    client = DigitalOceanClient("test", base_url=unused_url(), max_retries=2)
+    with pytest.raises(requests.ConnectionError):
+        client.post("/apps", json={"spec": SPEC})
+    stats = client.stats()["POST /apps"]
+    assert stats["count"] == 3
+    assert stats["retries"] == 2
+    assert stats["errors"] == 3
+
+
+@pytest.fixture
+def fast_polls(monkeypatch):
+    monkeypatch.setattr(do_client, "POLL_MIN_INTERVAL", 0.02)
+    monkeypatch.setattr(do_client, "POLL_MAX_INTERVAL", 0.05)
+
+
+@pytest.fixture
+def timings(tmp_path, monkeypatch):
+    path = tmp_path / "deploy_timings.jsonl"
+    monkeypatch.setattr(do_client, "DEPLOY_TIMINGS_FILE", str(path))
+    return path
+
+
+def create_app(client):
+    app = client.post("/apps", json={"spec": SPEC}).json()["app"]
+    return app["id"], app["pending_deployment"]["id"]
+
+
+def test_unchanged_get_reuses_the_cached_body(api, client):
+    app_id, _ = create_app(client)
+    status, body = client.get_json(f"/apps/{app_id}")
+    assert status == 200
+    again = client.get_json(f"/apps/{app_id}")
+    assert again == (304, body)
+    assert api.requests["get_app"] == 2
+
+
+def test_poll_interval_grows_and_is_capped(monkeypatch):
+    monkeypatch.setattr(do_client.random, "uniform", lambda low, high: 1.0)
+    intervals = [do_client.poll_interval(n) for n in range(10)]
+    assert intervals[:3] == [1.0, 1.5, 2.25]
+    assert intervals == sorted(intervals)
+    assert intervals[-1] == do_client.POLL_MAX_INTERVAL
+    # Polls slow down to the maximum when the quota runs low
+    assert do_client.poll_interval(0, do_client.LOW_RATE_LIMIT - 1) == do_client.POLL_MAX_INTERVAL
+
+
+class ScriptedClient:
+    """Answers deployment polls with ``phases`` in turn"""
+
+    rate_limit_remaining = None
+
+    def __init__(self, phases):
+        self.phases = list(phases)
+
+    def get_json(self, path):
+        return 200, {"deployment": {"phase": self.phases.pop(0)}}
+
+
+def test_poll_interval_resets_on_phase_change(monkeypatch, timings):
+    monkeypatch.setattr(do_client.random, "uniform", lambda low, high: 1.0)
+    sleeps = []
+    monkeypatch.setattr(do_client.time, "sleep", sleeps.append)
+    client = ScriptedClient(["PENDING_BUILD"] * 3 + ["BUILDING"] * 2 + ["ACTIVE"])
+    seen = []
+
+    phase, record = do_client.wait_for_deployment(client, "app", "deployment", 60, on_phase=seen.append)
+    assert phase == "ACTIVE"
+    assert seen == ["PENDING_BUILD", "BUILDING", "ACTIVE"]
+    assert sleeps == [1.0, 1.5, 2.25, 1.0, 1.5]
+    assert record["polls"] == 6
+
+
+def test_timing_record_is_written(api, client, fast_polls, timings):
+    app_id, deployment_id = create_app(client)
+    phase, record = do_client.wait_for_deployment(client, app_id, deployment_id, 10, component="backend")
+    assert phase == "ACTIVE"
+    assert record["result"] == "ACTIVE"
+    assert record["component"] == "backend"
+    assert record["not_modified"] > 0
+    names = [entry["phase"] for entry in record["phases"]]
+    assert names[-1] == "ACTIVE"
+    assert names == [name for name, _ in api.phases if name in names]
+    assert record["phases"][-1]["seconds"] == 0.0
+    assert sum(entry["seconds"] for entry in record["phases"]) == pytest.approx(record["total_s"], abs=0.05)
+    assert [json.loads(line) for line in timings.read_text().splitlines()] == [record]
+
+
+def test_timeout_returns_the_last_phase(client, fast_polls, timings):
+    api = FakeDigitalOceanAPI(scale=1.0).start()
+    try:
+        client.base_url = api.url
+        app_id, deployment_id = create_app(client)
+        start = time.monotonic()
+        phase, record = do_client.wait_for_deployment(client, app_id, deployment_id, 0.3)
+    finally:
+        api.stop()
+    assert time.monotonic() - start < 1
+    assert phase == "PENDING_BUILD"
+    assert record["result"] == "TIMEOUT"
+    assert record["phases"][-1]["seconds"] > 0
+    assert json.loads(timings.read_text())["result"] == "TIMEOUT"
+
+
+def test_polling_continues_through_connection_errors(fast_polls, timings):
+    client = DigitalOceanClient("test", base_url=unused_url(), max_retries=0)
+    phase, record = do_client.wait_for_deployment(client, "app", "deployment", 0.3)
+    assert phase is None
+    assert record["result"] == "TIMEOUT"
+    assert record["errors"] == record["polls"] > 1
@@ -0,0 +1,72 @@
+import zipfile
+
+import pytest
+
+import source_archive
+from source_archive import IncrementalArchiver
+
+FILES = {
+    "src/app.js": b"console.log('hello');\n" * 200,
+    "src/logo.png": bytes(range(256)) * 40,
+    "README.md": b"# DataWeb\n",
+}
+
+
+@pytest.fixture
+def project(tmp_path):
+    root = tmp_path / "project"
+    for name, data in FILES.items():
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+    return root
+
+
+def contents(archive_path):
+    with zipfile.ZipFile(archive_path) as archive:
+        assert archive.testzip() is None
+        return {info.filename: (info.compress_type, archive.read(info)) for info in archive.infolist()}
+
+
+def build(project, archive_path):
+    return IncrementalArchiver(project, patterns=[]).build(archive_path, ["src", "README.md"])
+
+
+def test_zipfile_internals_for_raw_copies_are_present(tmp_path):
+    # Pins the private zipfile behaviour _copy_raw_entry depends on
+    with zipfile.ZipFile(tmp_path / "probe.zip", "w") as target:
+        assert source_archive.raw_copy_supported(target)
+
+
+@pytest.mark.parametrize("raw", [True, False])
+def test_rebuild_reuses_unchanged_entries(project, tmp_path, monkeypatch, raw):
+    monkeypatch.setattr(source_archive, "raw_copy_supported", lambda target: raw)
+    archive_path = tmp_path / "source.zip"
+    assert build(project, archive_path)["compressed"] == 3
+    first = contents(archive_path)
+    assert {name: data for name, (_, data) in first.items()} == FILES
+    assert first["src/logo.png"][0] == zipfile.ZIP_STORED
+
+    (project / "README.md").write_bytes(b"# DataWeb, edited\n")
+    counts = build(project, archive_path)
+    assert (counts["reused"], counts["compressed"]) == (2, 1)
+    second = contents(archive_path)
+    assert second["README.md"][1] == b"# DataWeb, edited\n"
+    assert {name: second[name] for name in ("src/app.js", "src/logo.png")} == {
+        name: first[name] for name in ("src/app.js", "src/logo.png")}
+
+
+def test_failed_build_leaves_no_staging_zip(project, tmp_path, monkeypatch):
+    archive_path = tmp_path / "source.zip"
+    build(project, archive_path)
+    before = archive_path.read_bytes()
+    (project / "README.md").write_bytes(b"changed")
+
+    def fail(*args):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(IncrementalArchiver, "_write_new", fail)
+    with pytest.raises(OSError):
+        build(project, archive_path)
+    assert not archive_path.with_name("source.zip.tmp").exists()
+    assert archive_path.read_bytes() == before
@@ -0,0 +1,132 @@
+"""
+Parallel directory copies for the DataWeb deployment scripts
+Files are copied kernel-side with copy_file_range or sendfile where the
+platform has them, and otherwise streamed through a fixed-size buffer,
+so memory stays flat however large the assets are. Copies run on a
+thread pool (the system calls release the GIL), and a destination with
+the source's size and mtime is taken as unchanged and skipped.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from source_archive import is_ignored
+
+BUFFER_SIZE = 1024 * 1024
+# Largest request per copy_file_range/sendfile call
+ZERO_COPY_CHUNK = 64 * 1024 * 1024
+WORKERS = min(32, (os.cpu_count() or 1) + 4)
+
+
+def _zero_copy(src, dst, size):
+    """Copy with copy_file_range, then sendfile; False if neither works here"""
+    for name in ("copy_file_range", "sendfile"):
+        function = getattr(os, name, None)
+        if function is None:
+            continue
+        copied = 0
+        try:
+            while copied < size:
+                if name == "sendfile":
+                    sent = function(dst, src, copied, min(ZERO_COPY_CHUNK, size - copied))
+                else:
+                    sent = function(src, dst, min(ZERO_COPY_CHUNK, size - copied), copied, copied)
+                if sent == 0:
+                    break
+                copied += sent
+        except OSError:
+            # Unsupported between these file systems: rewind and try the next way
+            if copied:
+                os.lseek(dst, 0, os.SEEK_SET)
+                os.ftruncate(dst, 0)
+            continue
+        if copied == size:
+            return True
+    return False
+
+
+def _buffered_copy(src, dst):
+    buffer = bytearray(BUFFER_SIZE)
+    view = memoryview(buffer)
+    with open(src, "rb", buffering=0, closefd=False) as reader, open(dst, "wb", buffering=0, closefd=False) as writer:
+        while True:
+            n = reader.readinto(buffer)
+            if not n:
+                break
+            written = 0
+            while written < n:
+                written += writer.write(view[written:n])
+
+
+def copy_file(source, destination, stat=None):
+    """Copy one file and its mtime; returns the bytes copied"""
+    stat = stat or os.stat(source)
+    src = os.open(source, os.O_RDONLY)
+    try:
+        dst = os.open(destination, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, stat.st_mode & 0o777)
+        try:
+            if not _zero_copy(src, dst, stat.st_size):
+                os.lseek(src, 0, os.SEEK_SET)
+                os.lseek(dst, 0, os.SEEK_SET)
+                os.ftruncate(dst, 0)
+                _buffered_copy(src, dst)
+        finally:
+            os.close(dst)
+    finally:
+        os.close(src)
+    # Same mtime as the source, so the next copy can tell it is unchanged
+    os.utime(destination, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    return stat.st_size
+
+
+def is_unchanged(stat, destination):
+    try:
+        existing = os.stat(destination)
+    except FileNotFoundError:
+        return False
+    return existing.st_size == stat.st_size and existing.st_mtime_ns == stat.st_mtime_ns
+
+
+def copy_tree(source, destination, patterns=(), workers=WORKERS, prefix=None):
+    """Copy ``source`` into ``destination``, skipping unchanged files and ignored paths
+
+    ``patterns`` are globs as in ``source_archive.is_ignored``, matched
+    against paths relative to ``source``, or against ``prefix/...`` when
+    ``prefix`` gives the project-relative path of ``source``; ``source``
+    itself is tested as ``prefix``. Returns ``{copied, skipped, bytes}``.
+    """
+    source, destination = Path(source), Path(destination)
+    counts = {"copied": 0, "skipped": 0, "bytes": 0}
+    prefix = prefix.strip("/") if prefix else ""
+    if prefix and is_ignored(prefix, patterns):
+        return counts
+
+    def copy(path, target, stat):
+        if is_unchanged(stat, target):
+            return 0, False
+        return copy_file(path, target, stat), True
+
+    futures = []
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tree-copy") as pool:
+        if source.is_file():
+            destination.parent.mkdir(parents=True, exist_ok=True)
+            futures.append(pool.submit(copy, source, destination, source.stat()))
+        pending = [""] if source.is_dir() else []
+        while pending:
+            relative = pending.pop()
+            (destination / relative).mkdir(parents=True, exist_ok=True)
+            with os.scandir(source / relative) as entries:
+                for entry in entries:
+                    child = f"{relative}/{entry.name}" if relative else entry.name
+                    if is_ignored(f"{prefix}/{child}" if prefix else child, patterns):
+                        continue
+                    if entry.is_dir():
+                        pending.append(child)
+                    elif entry.is_file():
+                        futures.append(pool.submit(copy, entry.path, destination / child, entry.stat()))
+        for future in futures:
+            copied_bytes, copied = future.result()
+            counts["copied" if copied else "skipped"] += 1
+            counts["bytes"] += copied_bytes
+    return counts